@@ -5,6 +5,9 @@
 
 from __future__ import annotations
 
+from contextlib import ExitStack
+from contextlib import nullcontext
+from pathlib import Path
 from pprint import pprint as pp
 from typing import TYPE_CHECKING
 import warnings
@@ -14,17 +17,28 @@ import pytest
 from teselagen.api.client import TeselaGenClient
 from teselagen.utils import get_test_configuration_path, get_default_host_name
 from teselagen.utils import load_from_json
+from teselagen.utils.cassettes import set_cassette
+from teselagen.utils.cassettes import use_cassette
+from teselagen.utils.fake_server import FakeTeselaGenServer
 
 TEST_API_TOKEN_EXPIRATION_TIME = '30m'
 
+# Cassettes of the HTTP interactions of the API tests (see `teselagen.utils.cassettes`), one per test module.
+API_TESTS_DIR: Path = Path(__file__).parent / 'teselagen' / 'api' / 'tests'
+CASSETTES_DIR: Path = API_TESTS_DIR / 'cassettes'
+
 if TYPE_CHECKING:
-    from typing import Any, Dict, List, Literal, Optional, Set, TypedDict, Union
+    from typing import Any, Callable, ContextManager, Dict, List, Literal, Optional, Set, Tuple, TypedDict, Union
     import typing
 
+    from _pytest.config import Config
     from _pytest.config import ExitCode
+    from _pytest.config.argparsing import Parser
+    from _pytest.fixtures import FixtureRequest
+
+    from teselagen.utils.fake_server import FakeServerConfig
 
     # from _pytest.config.argparsing import OptionGroup
-    # from _pytest.config.argparsing import Parser
 
     ImportStatusValue = Union[str, Literal['FINISHED', 'INPROGRESS']]
 
@@ -53,11 +67,74 @@ if TYPE_CHECKING:
         assay: Optional[Assay]  # None
 
     Files = Union[List[File], List[Dict[str, Any]]]
+    FakeTeselaGenClient = Callable[..., Tuple[FakeTeselaGenServer, TeselaGenClient]]
     Assays = Union[List[Assay], List[AssayWithExperiment], List[Dict[str, Any]]]
 
 # https://pypi.org/project/pytest-xdist/#making-session-scoped-fixtures-execute-only-once
 
 
+def pytest_addoption(parser: Parser) -> None:
+    """A `PyTest` hook, adding the cassettes options.
+
+    With `--cassettes=record`, the HTTP interactions of the API tests are recorded in \
+    `teselagen/api/tests/cassettes/`. With `--cassettes=replay`, they are replayed from there, without a platform (or \
+    credentials), and the waits of polling loops are skipped. `--cassettes=once` replays the existing cassettes and \
+    records the missing ones.
+    """
+    parser.addoption(
+        '--cassettes',
+        default='off',
+        choices=('off', 'once', 'record', 'replay'),
+        help='Record or replay the HTTP interactions of the API tests (default: off, i.e. use the live platform).',
+    )
+    parser.addoption(
+        '--cassette-latency',
+        default=0.0,
+        type=float,
+        help='Factor of the recorded latency simulated when replaying cassettes (default: 0, no latency).',
+    )
+
+
+def is_replay_without_cassette(config: Config, name: str) -> bool:
+    """Whether cassettes are replayed, but the cassette `name` was not recorded."""
+    return config.getoption('--cassettes') == 'replay' and not (CASSETTES_DIR / f'{name}.json').is_file()
+
+
+def cassette_context(config: Config, name: str) -> ContextManager[Any]:
+    """Records or replays the HTTP interactions of the block in the cassette `name`, if cassettes are enabled (and \
+    the cassette was recorded, when replaying)."""
+    mode: str = config.getoption('--cassettes')
+    if mode == 'off' or is_replay_without_cassette(config=config, name=name):
+        return nullcontext()
+    return use_cassette(
+        path=CASSETTES_DIR / f'{name}.json',
+        mode=mode,
+        latency=config.getoption('--cassette-latency'),
+    )
+
+
+def pytest_collection_modifyitems(config: Config, items: List[pytest.Item]) -> None:
+    """A `PyTest` hook, skipping the tests that need the platform (i.e. the `test_configuration` fixture) when \
+    replaying cassettes, if the cassette of their module was not recorded. The offline tests still run."""
+    for item in items:
+        module_path = Path(str(item.fspath))
+        if API_TESTS_DIR in module_path.parents and 'test_configuration' in getattr(item, 'fixturenames', ()) \
+                and is_replay_without_cassette(config=config, name=module_path.stem):
+            item.add_marker(pytest.mark.skip(reason=f'No recorded cassette of {module_path.name} to replay.'))
+
+
+@pytest.fixture(scope='module', autouse=True)
+def cassette(request: FixtureRequest) -> typing.Generator[None, None, None]:
+    """Records or replays the HTTP interactions of each API test module in its own cassette."""
+    module_path = Path(request.module.__file__)
+    if API_TESTS_DIR not in module_path.parents:
+        yield None
+        return
+
+    with cassette_context(config=request.config, name=module_path.stem):
+        yield None
+
+
 def get_test_configuration() -> dict[str, str]:
     """Loads test configuration and updates with it the default conf.
 
@@ -208,6 +285,32 @@ def logged_client(
     client.logout()
 
 
+@pytest.fixture
+def fake_teselagen_client() -> typing.Generator[FakeTeselaGenClient, None, None]:
+    """Starts fake TeselaGen servers (see `teselagen.utils.fake_server`), each one with a client logged into it.
+
+    Returns:
+        (Callable[..., Tuple[FakeTeselaGenServer, TeselaGenClient]]) : A function starting a server with the given \
+            `FakeServerConfig` (defaults to the default configuration), and returning it (with its statistics reset) \
+            together with a client logged into it, created with the given keyword arguments. The servers are \
+            stopped on tear-down. Requests are not recorded nor replayed by the cassette of the module, if any.
+    """
+    with ExitStack() as stack:
+        stack.callback(set_cassette, set_cassette(None))
+
+        def start(
+            config: Optional[FakeServerConfig] = None,
+            **client_kwargs: Any,
+        ) -> Tuple[FakeTeselaGenServer, TeselaGenClient]:
+            server: FakeTeselaGenServer = stack.enter_context(FakeTeselaGenServer(config))
+            client = TeselaGenClient(host_url=server.host_url, **client_kwargs)
+            client.update_token(token=client.create_token('user', 'password', '1d'), save_to_storage=False)
+            server.reset_stats()
+            return server, client
+
+        yield start
+
+
 def clean_test_module_used_for_testing() -> None:
     """Cleanup files and assays."""
     print("Starting clean_test_module_used_for_testing")
@@ -322,8 +425,10 @@ def pytest_sessionstart(session: pytest.Session) -> None:
     References:
         https://pytest.org/en/6.2.x/reference.html#pytest.hookspec.pytest_sessionstart
     """
+    # NOTE: When replaying, there is no platform to clean up (nor credentials to log into it).
+    if session.config.getoption('--cassettes') == 'replay':
+        return
     clean_test_module_used_for_testing()
-    pass
 
 
 def pytest_sessionfinish(
@@ -341,7 +446,8 @@ def pytest_sessionfinish(
     References:
         https://docs.pytest.org/en/6.2.x/reference.html#pytest.hookspec.pytest_sessionfinish
     """
-    clean_test_module_used_for_testing()
+    if session.config.getoption('--cassettes') != 'replay':
+        clean_test_module_used_for_testing()
 
     print()  # noqa: T001
     print('run status code:', exitstatus)  # noqa: T001
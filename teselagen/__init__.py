@@ -5,7 +5,19 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from single_version import get_version
+if TYPE_CHECKING:
+    from typing import Any
 
-__version__ = get_version('teselagen', Path(__file__).parent.parent)
+
+def __getattr__(name: str) -> Any:
+    # The version is read (from the package metadata or `pyproject.toml`) on first access, not on import.
+    if name != '__version__':
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    from single_version import get_version
+
+    global __version__  # pylint: disable=global-statement
+    __version__ = get_version('teselagen', Path(__file__).parent.parent)
+    return __version__
@@ -1,11 +1,47 @@
 #!/usr/bin/env python3
 # Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
 # License: MIT
+"""TeselaGen API clients.
+
+The clients are imported on first access (e.g. `from teselagen.api import TeselaGenClient`), so that importing one of
+them does not import the others (e.g. `asyncio` for `AsyncTeselaGenClient`).
+"""
 
 from __future__ import annotations
 
-from .build_client import BUILDClient  # noqa: F401, TC002 # pylint: disable=unused-import
-from .client import TeselaGenClient  # noqa: F401, TC002 # pylint: disable=unused-import
-from .design_client import DESIGNClient  # noqa: F401, TC002 # pylint: disable=unused-import
-from .discover_client import DISCOVERClient  # noqa: F401, TC002 # pylint: disable=unused-import
-from .test_client import TESTClient  # noqa: F401, TC002 # pylint: disable=unused-import
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, List
+
+    from .async_client import AsyncTeselaGenClient  # noqa: F401, TC002 # pylint: disable=unused-import
+    from .build_client import BUILDClient  # noqa: F401, TC002 # pylint: disable=unused-import
+    from .client import TeselaGenClient  # noqa: F401, TC002 # pylint: disable=unused-import
+    from .design_client import DESIGNClient  # noqa: F401, TC002 # pylint: disable=unused-import
+    from .discover_client import DISCOVERClient  # noqa: F401, TC002 # pylint: disable=unused-import
+    from .test_client import TESTClient  # noqa: F401, TC002 # pylint: disable=unused-import
+
+# Module of each client.
+_CLIENT_MODULES: Dict[str, str] = {
+    'AsyncTeselaGenClient': 'async_client',
+    'BUILDClient': 'build_client',
+    'TeselaGenClient': 'client',
+    'DESIGNClient': 'design_client',
+    'DISCOVERClient': 'discover_client',
+    'TESTClient': 'test_client',
+}
+
+__all__: List[str] = list(_CLIENT_MODULES)
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _CLIENT_MODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(f'.{_CLIENT_MODULES[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Asyncio TeselaGen Client Module.
+
+`AsyncTeselaGenClient` mirrors `TeselaGenClient` and its DESIGN, BUILD, TEST and DISCOVER module clients: every public
+method keeps its name, arguments and return value, but it is a coroutine function that must be awaited. Generator
+methods (such as `iter_aliquots`) are exposed as asynchronous generators, to be used with `async for`.
+
+Calls run on the thread of the event loop, and their requests are sent by an `httpx.AsyncClient` (see
+`teselagen.utils.async_transport`): a call waiting for a response lets the event loop run the other ones, so hundreds
+of requests can be in flight from one event loop, without a thread per call. The `max_concurrency` argument limits how
+many of them are in flight at the same time (100 by default). `httpx` and `greenlet` are required (install the
+`async` extra).
+
+Example:
+    >>> async def main():
+    ...     async with AsyncTeselaGenClient(host_url=host_url, max_concurrency=16) as client:
+    ...         await client.login()
+    ...         await client.select_laboratory(lab_name='The Test Lab')
+    ...         assays = await client.test.get_assays()
+    ...         return await asyncio.gather(*(client.test.get_assay_results(assay_id=a['id']) for a in assays))
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+from typing import Literal, TYPE_CHECKING
+
+from teselagen.api.client import TeselaGenClient
+from teselagen.utils import DEFAULT_API_TOKEN_NAME
+from teselagen.utils import get_default_host_name
+from teselagen.utils.async_transport import AsyncHTTPAdapter
+from teselagen.utils.async_transport import DEFAULT_ASYNC_MAX_CONCURRENCY
+from teselagen.utils.async_transport import run_in_greenlet
+
+if TYPE_CHECKING:
+    from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+    from typing_extensions import TypeAlias
+
+    from teselagen.utils.cache import ResponseCache
+    from teselagen.utils.disk_cache import PersistentCache
+    from teselagen.utils.metrics import MetricsRegistry
+
+    ModuleName: TypeAlias = Literal['design', 'build', 'test', 'discover']
+
+DEFAULT_MAX_CONCURRENCY: Literal[100] = DEFAULT_ASYNC_MAX_CONCURRENCY
+
+# Returned by `next` when a generator is exhausted (`StopIteration` cannot be raised through a greenlet).
+_EXHAUSTED: Any = object()
+
+
+class AsyncModuleClient:
+    """Asyncio counterpart of a module client (or of the `TeselaGenClient` itself).
+
+    Public methods of the wrapped client are exposed as coroutine functions (or asynchronous generator functions, for
+    generator methods) with the same name and signature. Other attributes (such as endpoint URLs or headers) are
+    returned as they are.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+    ) -> None:
+        """Initialize the Client.
+
+        Args:
+            client (Any): The (synchronous) client to wrap. Its session must send requests with an \
+                `AsyncHTTPAdapter`, for the calls not to block the event loop.
+        """
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        if inspect.isgeneratorfunction(inspect.unwrap(attribute)):
+
+            @functools.wraps(attribute)
+            async def generator(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+                iterator: Iterator[Any] = await self._run(attribute, *args, **kwargs)
+                try:
+                    while True:
+                        # Each item (and the requests it needs) is produced on the event loop.
+                        item = await self._run(next, iterator, _EXHAUSTED)
+                        if item is _EXHAUSTED:
+                            return
+                        yield item
+                finally:
+                    await self._run(iterator.close)
+
+            return generator
+
+        @functools.wraps(attribute)
+        async def method(*args: Any, **kwargs: Any) -> Any:
+            return await self._run(attribute, *args, **kwargs)
+
+        return method
+
+    async def _run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Runs `func` on the event loop, which runs other tasks while it waits for responses."""
+        return await run_in_greenlet(func, *args, **kwargs)
+
+
+class AsyncTeselaGenClient(AsyncModuleClient):
+    """Asyncio TeselaGen Client."""
+
+    def __init__(
+        self,
+        host_url: str = get_default_host_name(),
+        api_token_name: str = DEFAULT_API_TOKEN_NAME,
+        module_name: ModuleName = TeselaGenClient.DEFAULT_MODULE_NAME,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        teselagen_client: Optional[TeselaGenClient] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        cache: Optional[ResponseCache] = None,
+        persistent_cache: Optional[PersistentCache] = None,
+    ) -> None:
+        """A Client to use for asynchronous communication with the TeselaGen modules.
+
+        Args:
+            host_url (str) : The Host URL of the API.
+
+            api_token_name (str) : The name of the API token to use. Defaults to "x-tg-api-token"
+
+            module_name (str) : The module name to use for communication. \
+                Available Modules are: "test", "discover", "design", "build"
+
+            max_concurrency (int) : Maximum number of requests in flight at the same time. Defaults to 100.
+
+            teselagen_client (Optional[TeselaGenClient]) : An existing (synchronous) client to wrap. If given, \
+                `host_url`, `api_token_name` and `module_name` are ignored and its HTTP session and login state are \
+                reused. It cannot have a governor, hedging policy nor request coalescing, whose waits would block \
+                the event loop. Defaults to None.
+
+            metrics (Optional[MetricsRegistry]) : Registry where the requests are recorded (see `TeselaGenClient`). \
+                Defaults to a new registry. Cannot be given with `teselagen_client`.
+
+            cache (Optional[ResponseCache]) : Opt-in in-memory cache of responses (see `TeselaGenClient`). \
+                Defaults to None. Cannot be given with `teselagen_client`.
+
+            persistent_cache (Optional[PersistentCache]) : Opt-in on-disk cache of responses (see \
+                `TeselaGenClient`). Defaults to None. Cannot be given with `teselagen_client`.
+
+        Raises:
+            ValueError: If `max_concurrency` is not positive, if session components are given together with \
+                `teselagen_client`, or if the session of `teselagen_client` has a governor, hedging policy or request \
+                coalescing.
+        """
+        if max_concurrency < 1:
+            raise ValueError(f'max_concurrency must be a positive integer, got {max_concurrency}')
+
+        self._owns_client: bool = teselagen_client is None
+        if teselagen_client is None:
+            teselagen_client = TeselaGenClient(
+                host_url=host_url,
+                api_token_name=api_token_name,
+                module_name=module_name,
+                metrics=metrics,
+                cache=cache,
+                persistent_cache=persistent_cache,
+            )
+        elif metrics is not None or cache is not None or persistent_cache is not None:
+            raise ValueError('metrics, cache and persistent_cache cannot be given with teselagen_client (the ones of '
+                             'its session are used)')
+
+        session = teselagen_client.http_session
+        # NOTE: They wait for other threads (and sleep) on the thread of the event loop, which would block it.
+        for name in ('governor', 'hedging', 'single_flight'):
+            if getattr(session, name) is not None:
+                raise ValueError(f'The asyncio client does not support the {name} of the session of teselagen_client')
+
+        # Requests sent from the coroutines are sent by an `httpx.AsyncClient`, others by the current adapter.
+        adapter = AsyncHTTPAdapter(max_concurrency=max_concurrency, fallback=session.get_adapter('https://'))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self._adapter: AsyncHTTPAdapter = adapter
+        self.max_concurrency: int = max_concurrency
+
+        super().__init__(client=teselagen_client)
+
+        self._design: Optional[AsyncModuleClient] = None
+        self._build: Optional[AsyncModuleClient] = None
+        self._test: Optional[AsyncModuleClient] = None
+        self._discover: Optional[AsyncModuleClient] = None
+
+    @property
+    def client(self) -> TeselaGenClient:
+        """The wrapped (synchronous) `TeselaGenClient`."""
+        return self._client
+
+    @property
+    def design(self) -> AsyncModuleClient:
+        """Asyncio counterpart of the client's 'design' property, which provides TeselaGen DESIGN API methods."""
+        if self._design is None:
+            self._design = AsyncModuleClient(client=self._client.design)
+        return self._design
+
+    @property
+    def build(self) -> AsyncModuleClient:
+        """Asyncio counterpart of the client's 'build' property, which provides TeselaGen BUILD API methods."""
+        if self._build is None:
+            self._build = AsyncModuleClient(client=self._client.build)
+        return self._build
+
+    @property
+    def discover(self) -> AsyncModuleClient:
+        """Asyncio counterpart of the client's 'discover' property, which provides TeselaGen DISCOVER API methods."""
+        if self._discover is None:
+            self._discover = AsyncModuleClient(client=self._client.discover)
+        return self._discover
+
+    @property
+    def test(self) -> AsyncModuleClient:
+        """Asyncio counterpart of the client's 'test' property, which provides TeselaGen TEST API methods."""
+        if self._test is None:
+            self._test = AsyncModuleClient(client=self._client.test)
+        return self._test
+
+    async def for_laboratory(
+        self,
+        lab_id: Optional[int] = None,
+        lab_name: Optional[str] = None,
+    ) -> AsyncTeselaGenClient:
+        """Returns a view of the client scoped to a laboratory (see `TeselaGenClient.for_laboratory`), which shares \
+        its connections. Close the client, not its views."""
+        view: AsyncTeselaGenClient = object.__new__(AsyncTeselaGenClient)
+        view.__dict__.update(self.__dict__)
+        view._client = await self._run(self._client.for_laboratory, lab_id=lab_id, lab_name=lab_name)
+        view._design, view._build, view._test, view._discover = None, None, None, None
+        return view
+
+    async def aclose(self) -> None:
+        """Closes the connections of the client. The session of a wrapped `teselagen_client` gets new (synchronous) \
+        connection pools, and can still be used by it."""
+        await self._adapter.aclose()
+        if self._owns_client:
+            self._client.http_session.close()
+        else:
+            self._client.http_session.mount_adapters()
+
+    async def __aenter__(self) -> AsyncTeselaGenClient:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
@@ -5,42 +5,71 @@
 
 from __future__ import annotations
 
+from collections import deque
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
 import itertools
 import json
-from typing import cast, List, Literal, TYPE_CHECKING, TypedDict
+import threading
+from typing import cast, List, Literal, MutableMapping, TYPE_CHECKING, TypedDict
+from urllib.parse import quote_plus
 import warnings
 
+import requests
 from tenacity import retry
-from tenacity.retry import retry_if_exception_type
+from tenacity.retry import retry_if_exception
 from tenacity.stop import stop_after_delay
 from tenacity.wait import wait_fixed
 
+from teselagen.api.build_client_models import ALIQUOT_COLUMNS
 from teselagen.api.build_client_models import AliquotNotFoundError
+from teselagen.api.build_client_models import AliquotsByIDs
 from teselagen.api.build_client_models import AliquotRecord
 from teselagen.api.build_client_models import GetAliquotsFormatType
 from teselagen.api.build_client_models import GetAliquotsQueryParams
 from teselagen.api.build_client_models import GetPlatesQueryParams
 from teselagen.api.build_client_models import GetSamplesQueryParams
+from teselagen.api.build_client_models import PLATE_COLUMNS
 from teselagen.api.build_client_models import PlateLibraryRecord
 from teselagen.api.build_client_models import PlateRecord
 from teselagen.api.build_client_models import WorkflowRunRecord
 from teselagen.api.build_client_models import RecordNotFoundError
+from teselagen.api.build_client_models import SAMPLE_COLUMNS
 from teselagen.api.build_client_models import SampleRecord
+from teselagen.api.build_client_models import SamplesByIDs
+from teselagen.utils import async_transport
 from teselagen.utils import delete  # noqa: F401 # pylint: disable=unused-import
 from teselagen.utils import get  # pylint: disable=unused-import
 from teselagen.utils import get_func_name
 from teselagen.utils import post  # noqa: F401 # pylint: disable=unused-import
 from teselagen.utils import put  # noqa: F401 # pylint: disable=unused-import
 from teselagen.utils import wrapped_partial
+from teselagen.utils.columnar import DEFAULT_EXPORT_BATCH_SIZE
+from teselagen.utils.columnar import DEFAULT_EXPORT_COMPRESSION
+from teselagen.utils.columnar import write_records
+from teselagen.utils.paging import iter_pages
+from teselagen.utils.tracing import span
+from teselagen.utils.tracing import trace_public_methods
 
 if TYPE_CHECKING:
-    from typing import Any, Callable, Dict, Iterable, Iterator, Literal, Mapping, TypeVar, Union
+    from concurrent.futures import Executor, Future
+    from pathlib import Path
+    from typing import (Any, Callable, Deque, Dict, Iterable, Iterator, Literal, Mapping, Optional, Sequence, Tuple,
+                        TypeVar, Union)
     import typing
 
     from typing_extensions import TypeAlias
 
+    import pandas as pd
+
     from teselagen.api import TeselaGenClient
     from teselagen.utils import ParsedJSONResponse
+    from teselagen.utils.columnar import Column
+    from teselagen.utils.columnar import FileFormat
+    from teselagen.utils.paging import AdaptivePageSize
+    from teselagen.utils.sync import InventoryMirror
+    from teselagen.utils.sync import SyncResult
 
     T = TypeVar('T', bound=Mapping[str, Any])
     F = TypeVar('F', bound=Callable[..., Any])
@@ -52,12 +81,44 @@ if TYPE_CHECKING:
     SampleID = TypeVar('SampleID', str, int)
 
     ResponseDict: TypeAlias = Union[ParsedJSONResponse, Dict[str, Any]]
+    InventoryCollection: TypeAlias = Literal['aliquots', 'samples', 'plates']
 
 # NOTE : Related to Postman and Python requests
 #           "body" goes into the "json" argument
 #           "Query Params" goes into "params" argument
 
 DEFAULT_PAGE_SIZE: Literal[100] = 100
+# Number of pages fetched concurrently by the fallback lookups of `get_aliquot` and `get_sample`.
+DEFAULT_LOOKUP_PREFETCH: Literal[4] = 4
+# Maximum number of records kept by the fallback lookups of `get_aliquot` and `get_sample` (see `RecordIndex`).
+DEFAULT_LOOKUP_INDEX_MAXSIZE: Literal[10000] = 10000
+# Number of chunks of ids fetched concurrently by `get_aliquots_by_ids` and `get_samples_by_ids`.
+DEFAULT_BATCH_MAX_WORKERS: Literal[8] = 8
+# Maximum length of the (URL-encoded) `gqlFilter` of a chunk of ids, to keep URLs within the limits of proxies.
+MAX_ID_FILTER_LENGTH: Literal[2000] = 2000
+
+_LAB_HEADER: str = 'tg-active-lab-id'
+
+# Columns of the wells of expanded plates (see `BUILDClient.expand_plates`), indexed by plate and well.
+PLATE_WELL_INDEX: List[str] = ['plate_id', 'well']
+PLATE_WELL_COLUMNS: List[str] = [
+    'plate_id',
+    'well',
+    'plate_name',
+    'plate_barcode',
+    'row_position',
+    'column_position',
+    'aliquot_container_id',
+    'aliquot_id',
+    'volume',
+    'volumetric_unit_code',
+    'concentration',
+    'concentration_unit_code',
+    'sample_id',
+    'sample_name',
+    'material_id',
+    'material_name',
+]
 
 # NOTE: when page number value is greater than the existing pages, the endpoint returns an empty list.
 
@@ -69,6 +130,8 @@ def get_documents(
     exhaustion_criteria: Callable[[Page[T]], bool] = lambda page: len(page) == 0 or page is None,
     # document matching criteria
     match_criteria: Callable[[T], bool] = lambda document: True,
+    prefetch: int = 0,
+    executor: Optional[Executor] = None,
 ) -> typing.Generator[T, None, None]:
     """This function returns a generator that yields documents from a page by page basis.
 
@@ -84,11 +147,23 @@ def get_documents(
         match_criteria (Callable[[T], bool]): A function that given a document returns `True` if the document meets \
             the desired criteria. Defaults to `lambda document: True` (always `True`).
 
+        prefetch (int): Number of upcoming pages fetched concurrently (on a thread pool) while the documents are \
+            consumed. Pages are still yielded in order, no page is requested after an exhausted page is received, \
+            and pending requests are cancelled when the generator is closed. Defaults to `0` (pages are fetched one \
+            after another, when needed).
+
+        executor (Optional[Executor]): Executor fetching the pages when `prefetch` is set. Defaults to None (a \
+            thread pool of `prefetch` threads, shut down when the generator finishes).
+
     Returns:
         Generator[Page, None, None]: A generator of pages of documents.
     """
     # pager (infinite) iterator
-    pager: Iterator[Page[T]] = iter(map(get_page, itertools.count(start=int(start_page_number), step=1)))
+    pager: Iterator[Page[T]]
+    if prefetch > 0:
+        pager = _prefetch_pages(get_page, int(start_page_number), exhaustion_criteria, prefetch, executor)
+    else:
+        pager = iter(map(get_page, itertools.count(start=int(start_page_number), step=1)))
 
     # pages (finite) iterable
     pages: Iterable[Page[T]] = itertools.takewhile(lambda page: not exhaustion_criteria(page), pager)
@@ -96,19 +171,68 @@ def get_documents(
     # documents (finite) generator
     documents = (document for document in itertools.chain.from_iterable(pages) if match_criteria(document))
 
-    yield from documents
+    try:
+        yield from documents
+    finally:
+        # Cancels the pending requests of the prefetcher when the generator is closed early.
+        close: Optional[Callable[[], None]] = getattr(pager, 'close', None)
+        if close is not None:
+            close()
+
+
+def _prefetch_pages(
+    get_page: Callable[[PageNumber], Page[T]],
+    start_page_number: int,
+    exhaustion_criteria: Callable[[Page[T]], bool],
+    prefetch: int,
+    executor: Optional[Executor] = None,
+) -> Iterator[Page[T]]:
+    """Yields the pages from `start_page_number` on, in order, keeping the next `prefetch` pages in flight (see \
+    `get_documents`). The exhausted page is yielded last."""
+    own_executor: bool = executor is None
+    pool: Executor = executor if executor is not None else ThreadPoolExecutor(
+        max_workers=prefetch, thread_name_prefix='teselagen-prefetch')
+    page_numbers: Iterator[int] = itertools.count(start=start_page_number, step=1)
+    window: Deque[Future[Page[T]]] = deque()
+    # Set as soon as any exhausted page is received (possibly before the pages preceding it).
+    exhausted = threading.Event()
+
+    def on_page(future: Future[Page[T]]) -> None:
+        if not future.cancelled() and future.exception() is None and exhaustion_criteria(future.result()):
+            exhausted.set()
+
+    try:
+        while True:
+            while len(window) < prefetch and not exhausted.is_set():
+                # Requests sent on the pool are traced as children of the current span.
+                future = pool.submit(contextvars.copy_context().run, get_page, next(page_numbers))
+                future.add_done_callback(on_page)
+                window.append(future)
+            if not window:
+                return
+            page: Page[T] = window.popleft().result()
+            yield page
+            if exhaustion_criteria(page):
+                return
+    finally:
+        for pending_future in window:
+            pending_future.cancel()
+        if own_executor:
+            pool.shutdown(wait=False)
 
 
 def get_record(
     get_records: Callable[[PageNumber], List[T]],
     record_id: RecordID,
+    prefetch: int = 0,
+    index: Optional[MutableMapping[str, T]] = None,
 ) -> T | None:
     """Bruteforce implementation.
 
     For a given record id, this function will return the record if it exists. If not, it will return `None`. \
 
-    This function is used to implement a fallback to bruteforce if an error occurs, in case the API is not \
-    responding.
+    This function is used to implement a fallback to bruteforce if the endpoint of single records fails (see \
+    `can_be_looked_up`). Pages are scanned until the record is found (or the pages are exhausted).
 
     This function is not intended to be used directly. It is used by the `get_aliquot` and `get_sample` functions.
 
@@ -118,54 +242,305 @@ def get_record(
 
         record_id (RecordID): The id of the record to return.
 
+        prefetch (int): Number of pages fetched concurrently while scanning (see `get_documents`). Defaults to `0` \
+            (pages are fetched one after another).
+
+        index (Optional[MutableMapping[str, T]]): Records by id. If given, the record is looked up in it first, and \
+            every scanned record is added to it, so later lookups are answered without requests. Defaults to None.
+
     Returns:
         T | None: The record if it exists, `None` otherwise.
     """
+    record: Optional[T] = index.get(str(record_id)) if index is not None else None
+    if record is not None:
+        return record
+
     warnings.warn(f'An error occured while calling {get_func_name(get_records)}, fallback to bruteforce.')
-    output_record: T | None = None
 
-    # select the record that meets the desired criteria
-    match_criteria: Callable[[T], bool] = lambda record: bool(record.get('id', None) == str(record_id))
+    def get_page(page_number: PageNumber) -> List[T]:
+        records: List[T] = get_records(str(page_number))
+        if index is not None and records is not None:
+            index.update((str(record['id']), record) for record in records if 'id' in record)
+        return records
 
     # NOTE: when `page_number` value is greater than the existing pages, the endpoint returns an empty list.
-    # break iteration when exahusion criterion is met
-    exhaustion_criteria: Callable[[List[T]], bool] = lambda records: bool(len(records) == 0 or records is None)
+    documents = get_documents(
+        get_page=get_page,
+        start_page_number=1,
+        exhaustion_criteria=lambda records: records is None or len(records) == 0,
+        # select the record that meets the desired criteria
+        match_criteria=lambda record: bool(record.get('id', None) == str(record_id)),
+        prefetch=prefetch,
+    )
+    try:
+        # stop at the first record that meets the desired criteria
+        return next(documents, None)
+    finally:
+        documents.close()
 
-    page_number: int = 1
 
-    while True:
-        records: List[T] = get_records(str(page_number))
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Returns the status code of the error response of an exception raised by a request, or None otherwise."""
+    response: Optional[requests.Response] = getattr(exc, 'response', None)
+    return response.status_code if isinstance(exc, requests.HTTPError) and response is not None else None
+
+
+def is_server_error(exc: BaseException) -> bool:
+    """Whether an exception was raised by a server error response (5xx), which may not happen again."""
+    status_code: Optional[int] = _status_code(exc)
+    return status_code is not None and status_code >= 500
+
+
+def can_be_looked_up(exc: BaseException) -> bool:
+    """Whether a record whose request raised an exception can still be found in the pages of its collection (see \
+    `get_record`): when its endpoint is not allowed (405) or keeps failing (5xx).
+
+    Missing records (404), rejected credentials (401/403), rate limiting (429), bad requests and connection errors \
+    would fail the scan too (or not find the record), so they are raised instead.
+    """
+    return _status_code(exc) == 405 or is_server_error(exc)
+
+
+class RecordIndex(MutableMapping):
+    """Thread-safe LRU mapping of records by id, used by the fallback lookups of `get_aliquot` and `get_sample` to \
+    keep the records they scanned (see `get_record`)."""
+
+    def __init__(
+        self,
+        maxsize: int = DEFAULT_LOOKUP_INDEX_MAXSIZE,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            maxsize (int): Maximum number of records kept. The least recently used ones are evicted first. Defaults \
+                to 10000.
+        """
+        if maxsize < 1:
+            raise ValueError(f'maxsize must be a positive integer, got {maxsize}')
+
+        self.maxsize: int = maxsize
+        self._records: OrderedDict[str, Mapping[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getitem__(self, record_id: str) -> Mapping[str, Any]:
+        with self._lock:
+            record: Mapping[str, Any] = self._records[record_id]
+            self._records.move_to_end(record_id)
+            return record
+
+    def __setitem__(self, record_id: str, record: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._records[record_id] = record
+            self._records.move_to_end(record_id)
+            while len(self._records) > self.maxsize:
+                self._records.popitem(last=False)
+
+    def __delitem__(self, record_id: str) -> None:
+        with self._lock:
+            del self._records[record_id]
+
+    def __contains__(self, record_id: object) -> bool:
+        with self._lock:
+            return record_id in self._records
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._records))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def clear(self) -> None:
+        """Removes all the records."""
+        with self._lock:
+            self._records.clear()
+
+
+def _iter_records(
+    get_page: Callable[..., Page[T]],
+    page_size: PageNumber,
+    limit: Optional[int] = None,
+    prefetch: int = 0,
+    page_sizer: Optional[AdaptivePageSize] = None,
+) -> typing.Generator[T, None, None]:
+    """Yields the records of all the pages (see `get_documents`), up to `limit` records.
+
+    Args:
+        get_page (Callable[..., Page[T]]): Paged endpoint, called with `pageNumber` and `pageSize` arguments.
+
+        page_size (PageNumber): Size of the pages (ignored if `page_sizer` is set).
+
+        limit (Optional[int]): Maximum number of records to yield. Defaults to None (all the records).
 
-        if exhaustion_criteria(records):
-            break
+        prefetch (int): Number of pages fetched concurrently (see `get_documents`). Defaults to `0`.
 
-        # we return the first record that meets the desired criteria
-        for record in records:
-            if match_criteria(record):
-                output_record = record
-                break
+        page_sizer (Optional[AdaptivePageSize]): Controller adapting the size of each page (see \
+            `teselagen.utils.paging`). Defaults to None (all the pages have `page_size` records).
+    """
+    # Generator of pages (or of documents), closed when the records are no longer consumed.
+    source: typing.Generator[Any, None, None]
+    documents: Iterator[T]
+    if page_sizer is not None:
+        if prefetch > 0:
+            raise ValueError('prefetch cannot be used with page_sizer (page sizes depend on the previous pages)')
+        source = iter_pages(lambda number, size: get_page(pageNumber=number, pageSize=size), page_sizer=page_sizer)
+        documents = itertools.chain.from_iterable(source)
+    else:
+        if limit is not None:
+            page_size = min(int(page_size), limit)
+        source = get_documents(get_page=wrapped_partial(get_page, pageSize=page_size), prefetch=prefetch)
+        documents = source
+    try:
+        yield from itertools.islice(documents, limit)
+    finally:
+        source.close()
+
+
+def _id_filter(ids: List[str]) -> str:
+    """Returns the `gqlFilter` matching the records with the given ids."""
+    return json.dumps({'id': ids}, separators=(',', ':'))
+
+
+def _chunk_ids(
+    ids: List[str],
+    chunk_size: int,
+    max_filter_length: int = MAX_ID_FILTER_LENGTH,
+) -> Iterator[List[str]]:
+    """Splits ids into chunks of at most `chunk_size` ids, whose URL-encoded `gqlFilter` is at most \
+    `max_filter_length` characters long (a longer id gets a chunk of its own)."""
+    empty_filter_length: int = len(quote_plus(_id_filter([])))
+    separator_length: int = len(quote_plus(','))
+
+    chunk: List[str] = []
+    filter_length: int = empty_filter_length
+    for record_id in ids:
+        id_length: int = len(quote_plus(json.dumps(record_id))) + (separator_length if chunk else 0)
+        if chunk and (len(chunk) >= chunk_size or filter_length + id_length > max_filter_length):
+            yield chunk
+            chunk, filter_length = [], empty_filter_length
+            id_length -= separator_length
+        chunk.append(record_id)
+        filter_length += id_length
+
+    if chunk:
+        yield chunk
+
+
+def _get_records_by_ids(
+    get_records: Callable[..., List[T]],
+    record_ids: Iterable[RecordID],
+    chunk_size: int,
+    max_workers: int,
+) -> Tuple[List[T], List[str]]:
+    """Fetches records by id, filtering a paged endpoint by chunks of ids fetched concurrently.
+
+    Args:
+        get_records (Callable[..., List[T]]): Paged endpoint, called with `pageSize` and `gqlFilter` keyword \
+            arguments.
 
-        page_number += 1
+        record_ids (Iterable[RecordID]): The ids of the records.
 
-    return output_record
+        chunk_size (int): Maximum number of ids per request.
 
+        max_workers (int): Maximum number of requests in flight.
 
+    Returns:
+        Tuple[List[T], List[str]]: The records found (in the order of their first id in `record_ids`), and the ids \
+            of the records not found.
+    """
+    ids: List[str] = list(dict.fromkeys(str(record_id) for record_id in record_ids))
+    chunks: List[List[str]] = list(_chunk_ids(ids, chunk_size=chunk_size))
+
+    def get_chunk(chunk: List[str]) -> List[T]:
+        return get_records(pageSize=len(chunk), gqlFilter=_id_filter(chunk))
+
+    pages: Iterable[List[T]]
+    if len(chunks) <= 1:
+        pages = map(get_chunk, chunks)
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)),
+                                thread_name_prefix='teselagen-batch') as executor:
+            # Requests sent on the pool are traced as children of the current span.
+            futures: List[Future[List[T]]] = [
+                executor.submit(contextvars.copy_context().run, get_chunk, chunk) for chunk in chunks
+            ]
+            pages = [future.result() for future in futures]
+
+    records_by_id: Dict[str, T] = {str(record['id']): record for page in pages for record in page}
+    return (
+        [records_by_id[record_id] for record_id in ids if record_id in records_by_id],
+        [record_id for record_id in ids if record_id not in records_by_id],
+    )
+
+
+def _well_name(
+    row_position: Optional[int],
+    column_position: Optional[int],
+) -> Optional[str]:
+    """Returns the name of a well (e.g. "A1" for the 0-based positions (0, 0), or "AA1" after row "Z")."""
+    if row_position is None or column_position is None:
+        return None
+    row: str = ''
+    number: int = row_position + 1
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        row = chr(ord('A') + remainder) + row
+    return f'{row}{column_position + 1}'
+
+
+def _plate_well_rows(plate: Mapping[str, Any]) -> List[Dict[str, Any]]:
+    """Returns a row (see `PLATE_WELL_COLUMNS`) per aliquot container of a plate, including the empty ones."""
+    barcode: Any = plate.get('barcode')
+    rows: List[Dict[str, Any]] = []
+    for container in plate.get('aliquotContainers') or []:
+        aliquot: Mapping[str, Any] = container.get('aliquot') or {}
+        sample: Mapping[str, Any] = aliquot.get('sample') or {}
+        material: Mapping[str, Any] = sample.get('material') or {}
+        rows.append({
+            'plate_id': str(plate['id']),
+            'well': _well_name(container.get('rowPosition'), container.get('columnPosition')) or container.get('name'),
+            'plate_name': plate.get('name'),
+            'plate_barcode': barcode.get('barcodeString') if isinstance(barcode, dict) else barcode,
+            'row_position': container.get('rowPosition'),
+            'column_position': container.get('columnPosition'),
+            'aliquot_container_id': container.get('id'),
+            'aliquot_id': aliquot.get('id'),
+            'volume': aliquot.get('volume'),
+            'volumetric_unit_code': aliquot.get('volumetricUnitCode'),
+            'concentration': aliquot.get('concentration'),
+            'concentration_unit_code': aliquot.get('concentrationUnitCode'),
+            'sample_id': sample.get('id'),
+            'sample_name': sample.get('name'),
+            'material_id': material.get('id'),
+            'material_name': material.get('name'),
+        })
+    return rows
+
+
+@trace_public_methods
 class BUILDClient:
     """BUILD Client."""
 
     def __init__(
         self,
         teselagen_client: TeselaGenClient,
+        lookup_index_maxsize: int = DEFAULT_LOOKUP_INDEX_MAXSIZE,
     ) -> None:
         """Initialize the Client.
 
         Args:
             teselagen_client (TeselaGenClient): A TeselaGenClient instance.
+
+            lookup_index_maxsize (int): Maximum number of aliquots (and of samples) kept by the fallback lookups of \
+                `get_aliquot` and `get_sample` (see `RecordIndex`). `0` disables them. Defaults to 10000.
         """
         module_name: str = 'build'
 
         self.host_url = teselagen_client.host_url
         self.headers = teselagen_client.headers
+        # Shared (pooled, keep-alive) HTTP session of the parent client.
+        self.http_session = teselagen_client.http_session
 
         # Here we define the Base CLI URL.
         api_url_base: str = teselagen_client.api_url_base
@@ -183,17 +558,49 @@ class BUILDClient:
         self.plates_url: str = f'{api_url_base}/plates'
         self.plate_url: str = f'{api_url_base}/plates' + '/{}'
 
+        # Records found by the fallback lookups (see `get_record`), by id.
+        self._aliquot_index: Optional[RecordIndex] = RecordIndex(maxsize=lookup_index_maxsize) \
+            if lookup_index_maxsize > 0 else None
+        self._sample_index: Optional[RecordIndex] = RecordIndex(maxsize=lookup_index_maxsize) \
+            if lookup_index_maxsize > 0 else None
+
+    def clear_lookup_indexes(self) -> None:
+        """Removes the aliquots and samples kept by the fallback lookups of `get_aliquot` and `get_sample`."""
+        for index in (self._aliquot_index, self._sample_index):
+            if index is not None:
+                index.clear()
+
     @retry(
         wait=wait_fixed(1),
         stop=stop_after_delay(5),
-        retry=retry_if_exception_type(Exception),
+        retry=retry_if_exception(is_server_error),
+        reraise=True,
+        sleep=async_transport.sleep,
     )
+    def _get_single_record(
+        self,
+        url: str,
+    ) -> Dict[str, Any]:
+        """Returns the record of an endpoint of single records, retrying server errors (5xx)."""
+        response: ResponseDict = get(
+            url=url,
+            headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
+        )
+        assert response['content'] is not None  # noqa: S101
+        return response['content']
+
     def get_aliquot(
         self,
         aliquot_id: AliquotID,
     ) -> AliquotRecord:
         """This function returns a single aliquot record.
 
+        If the endpoint is not allowed or keeps failing (see `can_be_looked_up`), the aliquot is looked up in the \
+        pages of aliquots (see `get_record`). Aliquots found that way are kept (see `RecordIndex`), and later calls \
+        return them without requests.
+
         Args:
             aliquot_id (str): The id of the aliquot record you want to retrieve.
 
@@ -202,17 +609,34 @@ class BUILDClient:
 
         Raises:
             AliquotNotFoundError: If the aliquot record is not found.
-        """
-        output_aliquot: AliquotRecord | None = None
 
-        # try:
-        url: str = self.aliquot_url.format(str(aliquot_id))
-        response: ResponseDict = get(
-            url=url,
-            headers=self.headers,
-        )
-        assert response['content'] is not None  # noqa: S101
-        return cast(AliquotRecord, json.loads(response['content']))
+            requests.HTTPError: If the request is rejected (e.g. unauthorized).
+
+            requests.ConnectionError: If the server cannot be reached.
+        """
+        output_aliquot: AliquotRecord | None = cast('Optional[AliquotRecord]', self._aliquot_index.get(
+            str(aliquot_id))) if self._aliquot_index is not None else None
+        if output_aliquot is not None:
+            return output_aliquot
+
+        try:
+            return cast(AliquotRecord, self._get_single_record(url=self.aliquot_url.format(str(aliquot_id))))
+        except requests.HTTPError as exc:
+            if _status_code(exc) == 404:
+                raise AliquotNotFoundError(f'Aliquot {aliquot_id} not found.') from exc
+            if not can_be_looked_up(exc):
+                raise
+            output_aliquot = get_record(
+                get_records=wrapped_partial(self.get_aliquots, format='expanded'),
+                record_id=aliquot_id,
+                prefetch=DEFAULT_LOOKUP_PREFETCH,
+                index=self._aliquot_index,
+            )
+
+        if output_aliquot is None:
+            raise AliquotNotFoundError(f'Aliquot {aliquot_id} not found.')
+
+        return output_aliquot
 
     # NOTE: The Example below is not documented in the BUILD API documentation, so be careful not to remove it.
     def get_aliquots(
@@ -262,11 +686,95 @@ class BUILDClient:
             url=self.aliquots_url,
             headers=self.headers,
             params=params,
+            session=self.http_session,
+            parse_json=True,
         )
 
         assert response['content'] is not None, 'No content in response'
 
-        return cast(List[AliquotRecord], json.loads(response['content']))
+        return cast(List[AliquotRecord], response['content'])
+
+    def get_aliquots_by_ids(
+        self,
+        aliquot_ids: Iterable[AliquotID],
+        format: GetAliquotsFormatType = 'minimal',
+        chunk_size: int = DEFAULT_PAGE_SIZE,
+        max_workers: int = DEFAULT_BATCH_MAX_WORKERS,
+    ) -> AliquotsByIDs:
+        """This function returns the aliquot records with the given ids, with a few requests instead of one per id.
+
+        The ids are split into chunks (short enough to fit in a URL), and each chunk is fetched with a `gqlFilter` \
+        on the `id` field of `get_aliquots`. Chunks are fetched concurrently.
+
+        Args:
+            aliquot_ids (Iterable[AliquotID]): The ids of the aliquot records.
+
+            format (GetAliquotsFormatType): Use "expanded" to get full detail, as in `get_aliquot`. \
+                Default: "minimal"
+
+            chunk_size (int): Maximum number of ids per request. Default: `100`.
+
+            max_workers (int): Maximum number of chunks fetched at the same time. Default: `8`.
+
+        Returns:
+            AliquotsByIDs: The aliquot records found (`records`, in the order of `aliquot_ids`, without duplicates), \
+                and the ids of the aliquots not found (`missing_ids`).
+        """
+        records, missing_ids = _get_records_by_ids(
+            get_records=wrapped_partial(self.get_aliquots, format=format),
+            record_ids=aliquot_ids,
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+        )
+        return AliquotsByIDs(records=records, missing_ids=missing_ids)
+
+    def iter_aliquots(
+        self,
+        pageSize: str | int = DEFAULT_PAGE_SIZE,  # noqa: N803
+        sort: str = '-updatedAt',
+        gqlFilter: str = '',
+        format: GetAliquotsFormatType = 'minimal',
+        limit: Optional[int] = None,
+        prefetch: int = 0,
+        page_sizer: Optional[AdaptivePageSize] = None,
+    ) -> typing.Generator[AliquotRecord, None, None]:
+        """This function yields the aliquot records of all the pages (see `get_aliquots`), requesting each page when \
+        the records of the previous one have been consumed.
+
+        Args:
+            pageSize (str): size of each page requested. Default: `"100"`.
+
+            sort (str): field to sort on. Default: `"-updatedAt"`.
+
+            gqlFilter (str): A `graphql` filter to apply to the data (see `get_aliquots`). Default: `""`.
+
+            format (GetAliquotsFormatType): Use "expanded" to get full detail, as in `get_aliquot`. \
+                Default: "minimal"
+
+            limit (Optional[int]): Maximum number of records to yield. Default: `None` (all the records).
+
+            prefetch (int): Number of upcoming pages fetched concurrently while the records are consumed (see \
+                `get_documents`). Default: `0` (only one page is held in memory at a time).
+
+            page_sizer (Optional[AdaptivePageSize]): Controller adapting the size of each page to the latency and \
+                size of the previous ones (see `teselagen.utils.paging`), instead of `pageSize`. It cannot be used \
+                with `prefetch`. Default: `None`.
+
+        Yields:
+            AliquotRecord: Aliquot records.
+
+        Example:
+            >>> for aliquot in client.build.iter_aliquots(gqlFilter=json.dumps({'sample.material.name': 'PCR53.1'})):
+            ...     print(aliquot['id'])
+        """
+        get_page = wrapped_partial(self.get_aliquots, sort=sort, gqlFilter=gqlFilter, format=format)
+        yield from _iter_records(
+            get_page=get_page,
+            page_size=pageSize,
+            limit=limit,
+            prefetch=prefetch,
+            page_sizer=page_sizer,
+        )
 
     def get_sample(
         self,
@@ -274,6 +782,10 @@ class BUILDClient:
     ) -> SampleRecord:
         """This function returns a single sample by id.
 
+        If the endpoint is not allowed or keeps failing (see `can_be_looked_up`), the sample is looked up in the \
+        pages of samples (see `get_record`). Samples found that way are kept (see `RecordIndex`), and later calls \
+        return them without requests.
+
         Args:
             sample_id (SampleID): The id of the sample to return.
 
@@ -282,17 +794,34 @@ class BUILDClient:
 
         Raises:
             RecordNotFoundError: If the sample record is not found.
-        """
-        output_sample: SampleRecord | None = None
 
-        # try:
-        url: str = self.sample_url.format(str(sample_id))
-        response: ResponseDict = get(
-            url=url,
-            headers=self.headers,
-        )
-        assert response['content'] is not None  # noqa: S101
-        return cast(SampleRecord, json.loads(response['content']))
+            requests.HTTPError: If the request is rejected (e.g. unauthorized).
+
+            requests.ConnectionError: If the server cannot be reached.
+        """
+        output_sample: SampleRecord | None = cast('Optional[SampleRecord]', self._sample_index.get(
+            str(sample_id))) if self._sample_index is not None else None
+        if output_sample is not None:
+            return output_sample
+
+        try:
+            return cast(SampleRecord, self._get_single_record(url=self.sample_url.format(str(sample_id))))
+        except requests.HTTPError as exc:
+            if _status_code(exc) == 404:
+                raise RecordNotFoundError(f'Sample {sample_id} not found.') from exc
+            if not can_be_looked_up(exc):
+                raise
+            output_sample = get_record(
+                get_records=self.get_samples,
+                record_id=sample_id,
+                prefetch=DEFAULT_LOOKUP_PREFETCH,
+                index=self._sample_index,
+            )
+
+        if output_sample is None:
+            raise RecordNotFoundError(f'Sample {sample_id} not found.')
+
+        return output_sample
 
     # NOTE: The Example below is not documented in the BUILD API documentation, so be careful not to remove it.
     def get_samples(
@@ -343,11 +872,83 @@ class BUILDClient:
             url=self.samples_url,
             headers=self.headers,
             params=params,
+            session=self.http_session,
+            parse_json=True,
         )
 
         assert response['content'] is not None, 'No content in response'
 
-        return cast(List[SampleRecord], json.loads(response['content']))
+        return cast(List[SampleRecord], response['content'])
+
+    def get_samples_by_ids(
+        self,
+        sample_ids: Iterable[SampleID],
+        chunk_size: int = DEFAULT_PAGE_SIZE,
+        max_workers: int = DEFAULT_BATCH_MAX_WORKERS,
+    ) -> SamplesByIDs:
+        """This function returns the sample records with the given ids, with a few requests instead of one per id.
+
+        The ids are split into chunks (short enough to fit in a URL), and each chunk is fetched with a `gqlFilter` \
+        on the `id` field of `get_samples`. Chunks are fetched concurrently.
+
+        Args:
+            sample_ids (Iterable[SampleID]): The ids of the sample records.
+
+            chunk_size (int): Maximum number of ids per request. Default: `100`.
+
+            max_workers (int): Maximum number of chunks fetched at the same time. Default: `8`.
+
+        Returns:
+            SamplesByIDs: The sample records found (`records`, in the order of `sample_ids`, without duplicates), \
+                and the ids of the samples not found (`missing_ids`).
+        """
+        records, missing_ids = _get_records_by_ids(
+            get_records=self.get_samples,
+            record_ids=sample_ids,
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+        )
+        return SamplesByIDs(records=records, missing_ids=missing_ids)
+
+    def iter_samples(
+        self,
+        pageSize: str | int = DEFAULT_PAGE_SIZE,  # noqa: N803
+        sort: str = '-updatedAt',
+        gqlFilter: str = '',
+        limit: Optional[int] = None,
+        prefetch: int = 0,
+        page_sizer: Optional[AdaptivePageSize] = None,
+    ) -> typing.Generator[SampleRecord, None, None]:
+        """This function yields the sample records of all the pages (see `get_samples`), requesting each page when \
+        the records of the previous one have been consumed.
+
+        Args:
+            pageSize (str): Number of records requested in a page. Default: `"100"`.
+
+            sort (str): sort column. Default: `"-updatedAt"`.
+
+            gqlFilter (str): A `graphql` filter to apply to the data (see `get_samples`). Default: `""`.
+
+            limit (Optional[int]): Maximum number of records to yield. Default: `None` (all the records).
+
+            prefetch (int): Number of upcoming pages fetched concurrently while the records are consumed (see \
+                `get_documents`). Default: `0` (only one page is held in memory at a time).
+
+            page_sizer (Optional[AdaptivePageSize]): Controller adapting the size of each page to the latency and \
+                size of the previous ones (see `teselagen.utils.paging`), instead of `pageSize`. It cannot be used \
+                with `prefetch`. Default: `None`.
+
+        Yields:
+            SampleRecord: Sample records.
+        """
+        get_page = wrapped_partial(self.get_samples, sort=sort, gqlFilter=gqlFilter)
+        yield from _iter_records(
+            get_page=get_page,
+            page_size=pageSize,
+            limit=limit,
+            prefetch=prefetch,
+            page_sizer=page_sizer,
+        )
 
     # TODO
     def get_plates(
@@ -398,11 +999,53 @@ class BUILDClient:
             url=self.plates_url,
             headers=self.headers,
             params=params,
+            session=self.http_session,
+            parse_json=True,
         )
 
         assert response['content'] is not None, 'No content in response'
 
-        return cast(List[PlateLibraryRecord], json.loads(response['content']))
+        return cast(List[PlateLibraryRecord], response['content'])
+
+    def iter_plates(
+        self,
+        pageSize: str | int = DEFAULT_PAGE_SIZE,  # noqa: N803
+        sort: str = '-updatedAt',
+        gqlFilter: str = '',
+        limit: Optional[int] = None,
+        prefetch: int = 0,
+        page_sizer: Optional[AdaptivePageSize] = None,
+    ) -> typing.Generator[PlateLibraryRecord, None, None]:
+        """This function yields the plate records of all the pages (see `get_plates`), requesting each page when the \
+        records of the previous one have been consumed.
+
+        Args:
+            pageSize (str): Number of records requested in a page. Default: `"100"`.
+
+            sort (str): sort column. Default: `"-updatedAt"`.
+
+            gqlFilter (str): A `graphql` filter to apply to the data (see `get_plates`). Default: `""`.
+
+            limit (Optional[int]): Maximum number of records to yield. Default: `None` (all the records).
+
+            prefetch (int): Number of upcoming pages fetched concurrently while the records are consumed (see \
+                `get_documents`). Default: `0` (only one page is held in memory at a time).
+
+            page_sizer (Optional[AdaptivePageSize]): Controller adapting the size of each page to the latency and \
+                size of the previous ones (see `teselagen.utils.paging`), instead of `pageSize`. It cannot be used \
+                with `prefetch`. Default: `None`.
+
+        Yields:
+            PlateLibraryRecord: Plate records.
+        """
+        get_page = wrapped_partial(self.get_plates, sort=sort, gqlFilter=gqlFilter)
+        yield from _iter_records(
+            get_page=get_page,
+            page_size=pageSize,
+            limit=limit,
+            prefetch=prefetch,
+            page_sizer=page_sizer,
+        )
 
     # TODO
     def get_plate(self, plate_id: str) -> PlateRecord:
@@ -423,9 +1066,11 @@ class BUILDClient:
         response: ResponseDict = get(
             url=url,
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
         assert response['content'] is not None  # noqa: S101
-        output_plate = cast(PlateRecord, json.loads(response['content']))
+        output_plate = cast(PlateRecord, response['content'])
 
         return output_plate
 
@@ -443,6 +1088,189 @@ class BUILDClient:
         response: ResponseDict = get(
             url=url,
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
         assert response['content'] is not None
-        return cast(List[WorkflowRunRecord], json.loads(response['content']))
+        return cast(List[WorkflowRunRecord], response['content'])
+
+    def expand_plates(
+        self,
+        plate_ids: Optional[Iterable[str]] = None,
+        max_workers: int = DEFAULT_BATCH_MAX_WORKERS,
+        as_dataframe: bool = True,
+    ) -> Union[pd.DataFrame, List[Dict[str, Any]]]:
+        """This function expands plates into their wells: the aliquot, sample and material of each aliquot \
+        container. Plate records are fetched concurrently.
+
+        NOTE: The workflow runs that output the plates are not expanded: `get_plate_workflow_run` requests the plate \
+            record, and no endpoint listing the workflow runs of a plate is documented yet.
+
+        Args:
+            plate_ids (Optional[Iterable[str]]): The ids of the plates. Default: `None` (all the plates, whose \
+                records are read from `iter_plates` instead of being fetched one by one).
+
+            max_workers (int): Maximum number of requests in flight. Default: `8`.
+
+            as_dataframe (bool): Whether to return a DataFrame indexed by `plate_id` and `well` (e.g. "A1"), or a \
+                list of rows. Default: `True`.
+
+        Returns:
+            Union[pd.DataFrame, List[Dict[str, Any]]]: A row (see `PLATE_WELL_COLUMNS`) per aliquot container, \
+                including the empty ones (without aliquot), in the order of the plates.
+        """
+        plates: List[Optional[Mapping[str, Any]]]
+        ids: List[str]
+        if plate_ids is None:
+            listed_plates: List[PlateLibraryRecord] = list(self.iter_plates())
+            ids = [str(plate['id']) for plate in listed_plates]
+            plates = list(listed_plates)
+        else:
+            ids = list(dict.fromkeys(str(plate_id) for plate_id in plate_ids))
+            plates = [None] * len(ids)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='teselagen-batch') as executor:
+            # Requests sent on the pool are traced as children of the current span.
+            plate_futures: Dict[int, Future[PlateRecord]] = {
+                i: executor.submit(contextvars.copy_context().run, self.get_plate, plate_id)
+                for i, plate_id in enumerate(ids)
+                if 'aliquotContainers' not in (plates[i] or {})
+            }
+            for i, future in plate_futures.items():
+                plates[i] = future.result()
+
+        with span('BUILDClient.format_plate_wells', attributes={'plates': len(ids)}):
+            rows: List[Dict[str, Any]] = [
+                row for plate in plates if plate is not None for row in _plate_well_rows(plate)
+            ]
+            if not as_dataframe:
+                return rows
+
+            import pandas as pd
+
+            return pd.DataFrame(rows, columns=PLATE_WELL_COLUMNS).set_index(PLATE_WELL_INDEX)
+
+    def export_records(
+        self,
+        collection: InventoryCollection,
+        path: Union[str, Path],
+        file_format: FileFormat = 'parquet',
+        columns: Optional[Sequence[Column]] = None,
+        batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+        compression: str = DEFAULT_EXPORT_COMPRESSION,
+        pageSize: str | int = DEFAULT_PAGE_SIZE,  # noqa: N803
+        sort: str = '-updatedAt',
+        gqlFilter: str = '',
+        format: GetAliquotsFormatType = 'expanded',  # noqa: A002 # pylint: disable=redefined-builtin
+        prefetch: int = 0,
+        page_sizer: Optional[AdaptivePageSize] = None,
+    ) -> int:
+        """This function exports the records of a collection to a Parquet or Feather file, flattening them page by \
+        page into Arrow record batches of a fixed schema (see `teselagen.utils.columnar`), so the records are never \
+        all held in memory. It requires `pyarrow`.
+
+        Args:
+            collection (InventoryCollection): "aliquots", "samples" or "plates".
+
+            path (Union[str, Path]): Path of the file.
+
+            file_format (FileFormat): "parquet" or "feather". Default: `"parquet"`.
+
+            columns (Optional[Sequence[Column]]): Columns of the file. Default: `None` (`ALIQUOT_COLUMNS`, \
+                `SAMPLE_COLUMNS` or `PLATE_COLUMNS`).
+
+            batch_size (int): Number of rows of each record batch (and Parquet row group). Default: `10000`.
+
+            compression (str): Compression codec of the file. Default: `"zstd"`.
+
+            pageSize (str): Number of records requested in a page. Default: `"100"`.
+
+            sort (str): sort column. Default: `"-updatedAt"`.
+
+            gqlFilter (str): A `graphql` filter to apply to the data (see `get_aliquots`). Default: `""`.
+
+            format (GetAliquotsFormatType): Format of the aliquot records. The default columns of the aliquots read \
+                their sample and material, which are only in the `"expanded"` format. Default: `"expanded"`.
+
+            prefetch (int): Number of upcoming pages fetched concurrently (see `get_documents`). Default: `0`.
+
+            page_sizer (Optional[AdaptivePageSize]): Controller adapting the size of each page (see \
+                `teselagen.utils.paging`), instead of `pageSize`. Default: `None`.
+
+        Returns:
+            int: The number of records exported.
+        """
+        iter_collections: Dict[str, Callable[..., Iterator[Mapping[str, Any]]]] = {
+            'aliquots': wrapped_partial(self.iter_aliquots, format=format),
+            'samples': self.iter_samples,
+            'plates': self.iter_plates,
+        }
+        default_columns: Dict[str, Sequence[Column]] = {
+            'aliquots': ALIQUOT_COLUMNS,
+            'samples': SAMPLE_COLUMNS,
+            'plates': PLATE_COLUMNS,
+        }
+        records: Iterator[Mapping[str, Any]] = iter_collections[collection](
+            pageSize=pageSize,
+            sort=sort,
+            gqlFilter=gqlFilter,
+            prefetch=prefetch,
+            page_sizer=page_sizer,
+        )
+        return write_records(
+            records,
+            path=path,
+            columns=default_columns[collection] if columns is None else columns,
+            file_format=file_format,
+            batch_size=batch_size,
+            compression=compression,
+        )
+
+    def sync_inventory(
+        self,
+        mirror: InventoryMirror,
+        collections: Sequence[InventoryCollection] = ('aliquots', 'samples', 'plates'),
+        full: Optional[bool] = None,
+        pageSize: str | int = DEFAULT_PAGE_SIZE,  # noqa: N803
+        format: GetAliquotsFormatType = 'minimal',  # noqa: A002 # pylint: disable=redefined-builtin
+    ) -> Dict[str, SyncResult]:
+        """This function syncs the local mirror of the inventory of the selected laboratory: only the records updated \
+        since the previous sync are fetched (sorted by `-updatedAt`), and upserted in the mirror.
+
+        Deleted records are only dropped from the mirror by full syncs (reconciliation passes), which read the whole \
+        collections. They run on the first sync of a collection, when the last one is older than the \
+        `reconcile_every` of the mirror, or when `full` is True (see `teselagen.utils.sync`).
+
+        Args:
+            mirror (InventoryMirror): Local mirror of the inventory.
+
+            collections (Sequence[InventoryCollection]): Collections to sync: "aliquots", "samples" and/or \
+                "plates". Default: all of them.
+
+            full (Optional[bool]): Whether to read the whole collections. Default: `None` (incremental syncs, with \
+                periodic full syncs).
+
+            pageSize (str): Number of records requested in a page. Default: `"100"`.
+
+            format (GetAliquotsFormatType): Format of the aliquot records (see `get_aliquots`). Default: \
+                `"minimal"`.
+
+        Returns:
+            Dict[str, SyncResult]: The number of records fetched and deleted, and the new high-water mark, by \
+                collection.
+        """
+        iter_collections: Dict[str, Callable[..., Iterator[Mapping[str, Any]]]] = {
+            'aliquots': wrapped_partial(self.iter_aliquots, format=format),
+            'samples': self.iter_samples,
+            'plates': self.iter_plates,
+        }
+        results: Dict[str, SyncResult] = {}
+        for collection in collections:
+            results[collection] = mirror.sync(
+                collection=collection,
+                get_records=wrapped_partial(iter_collections[collection], pageSize=pageSize, sort='-updatedAt'),
+                host=self.host_url,
+                lab=self.headers.get(_LAB_HEADER) or '',
+                full=full,
+            )
+        return results
@@ -6,7 +6,9 @@
 from __future__ import annotations
 
 from tokenize import Number
-from typing import Any, List, Literal, Optional, TypedDict, Union
+from typing import Any, List, Literal, Optional, Tuple, TypedDict, Union
+
+from teselagen.utils.columnar import Column
 
 numeric = Union[int, float, complex]
 
@@ -101,6 +103,18 @@ class SampleRecord(TypedDict, total=False):  # noqa: H601
     __typename: Literal['sample']
 
 
+class AliquotsByIDs(TypedDict, total=True):  # noqa: H601
+    """Aliquots fetched by id (see `get_aliquots_by_ids`) `TypedDict`."""
+    records: List[AliquotRecord]
+    missing_ids: List[str]
+
+
+class SamplesByIDs(TypedDict, total=True):  # noqa: H601
+    """Samples fetched by id (see `get_samples_by_ids`) `TypedDict`."""
+    records: List[SampleRecord]
+    missing_ids: List[str]
+
+
 class GetRecordsQueryParams(TypedDict, total=True):  # noqa: H601
     """Get records query parameters `TypedDict`."""
     pageNumber: str  # noqa: N815
@@ -202,3 +216,48 @@ class WorkflowRunRecord(TypedDict, total=True):  # noqa: H601
     id: str
     name: str
     workflowDefinition: Optional[Any]
+
+
+# Columns of the columnar exports of BUILD records (see `BUILDClient.export_records`).
+ALIQUOT_COLUMNS: Tuple[Column, ...] = (
+    Column('id', ('id',)),
+    Column('aliquot_type', ('aliquotType',)),
+    Column('volume', ('volume',), 'float64'),
+    Column('volumetric_unit_code', ('volumetricUnitCode',)),
+    Column('concentration', ('concentration',), 'float64'),
+    Column('concentration_unit_code', ('concentrationUnitCode',)),
+    Column('mass', ('mass',), 'float64'),
+    Column('mass_unit_code', ('massUnitCode',)),
+    Column('sample_id', ('sample', 'id')),
+    Column('sample_name', ('sample', 'name')),
+    Column('material_id', ('sample', 'material', 'id')),
+    Column('material_name', ('sample', 'material', 'name')),
+    Column('lab_id', ('lab', 'id')),
+    Column('user_id', ('user', 'id')),
+    Column('created_at', ('createdAt',), 'timestamp'),
+    Column('updated_at', ('updatedAt',), 'timestamp'),
+)
+SAMPLE_COLUMNS: Tuple[Column, ...] = (
+    Column('id', ('id',)),
+    Column('name', ('name',)),
+    Column('sample_type_code', ('sampleTypeCode',)),
+    Column('material_id', ('material', 'id')),
+    Column('material_name', ('material', 'name')),
+    Column('lab_id', ('lab', 'id')),
+    Column('user_id', ('user', 'id')),
+    Column('created_at', ('createdAt',), 'timestamp'),
+    Column('updated_at', ('updatedAt',), 'timestamp'),
+)
+PLATE_COLUMNS: Tuple[Column, ...] = (
+    Column('id', ('id',)),
+    Column('name', ('name',)),
+    Column('barcode', ('barcode', 'barcodeString')),
+    Column('container_array_type_id', ('containerArrayType', 'id')),
+    Column('container_array_type_name', ('containerArrayType', 'name')),
+    Column('container_format_code', ('containerArrayType', 'containerFormatCode')),
+    Column('max_well_volume', ('containerArrayType', 'maxWellVolume'), 'float64'),
+    Column('lab_id', ('lab', 'id')),
+    Column('user_id', ('user', 'id')),
+    Column('created_at', ('createdAt',), 'timestamp'),
+    Column('updated_at', ('updatedAt',), 'timestamp'),
+)
@@ -5,29 +5,52 @@
 
 from __future__ import annotations
 
-import json
+import copy
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+import os
+import threading
 import time
 from typing import TYPE_CHECKING
 from urllib.parse import urljoin
+import weakref
 
 from teselagen.api.build_client import BUILDClient
 from teselagen.api.design_client import DESIGNClient
 from teselagen.api.discover_client import DISCOVERClient
 from teselagen.api.test_client import TESTClient
+from teselagen.utils import cassettes
 from teselagen.utils import DEFAULT_API_TOKEN_NAME
 from teselagen.utils import delete_session_file
 from teselagen.utils import get
 from teselagen.utils import get_credentials
+from teselagen.utils import load_credentials_from_file
 from teselagen.utils import load_session_file
+from teselagen.utils import parse_datetime
+from teselagen.utils import parse_duration
 from teselagen.utils import post
 from teselagen.utils import put
 from teselagen.utils import save_session_file
 from teselagen.utils import get_default_host_name
+from teselagen.utils import serializers
+from teselagen.utils.cache import ResponseCache
+from teselagen.utils.disk_cache import PersistentCache
+from teselagen.utils.governor import ConcurrencyGovernor
+from teselagen.utils.hedging import HedgingPolicy
+from teselagen.utils.metrics import MetricsRegistry
+from teselagen.utils.singleflight import SingleFlight
 from teselagen.utils.utils import ParsedJSONResponse
 from teselagen.utils.utils import Session
+from teselagen.utils.transport import DEFAULT_POOL_CONNECTIONS
+from teselagen.utils.transport import DEFAULT_POOL_MAXSIZE
+from teselagen.utils.transport import TeselaGenSession
+from teselagen.utils.tracing import trace_public_methods
 
 if TYPE_CHECKING:
-    from typing import Dict, List, Literal, Optional, TypedDict
+    from typing import Any, Dict, List, Literal, Optional, Tuple, TypedDict
+
+    import requests
 
     class Laboratory(TypedDict, total=True):  # noqa: D101, H601
         id: str
@@ -50,18 +73,44 @@ if TYPE_CHECKING:
 #           "Query Params" goes into "params" argument
 
 
+# Attributes of a client that are not pickled (they are recreated by the unpickling process).
+_UNPICKLED_ATTRIBUTES: Tuple[str, ...] = (
+    '_design',
+    '_test',
+    '_discover',
+    '_build',
+    '_lock',
+    '_views',
+    '_token_refresh_thread',
+)
+
+
 # TODO: Maybe is better to set a default value for expires_in = "30m" instead of "1d" (?) or 8 hours
+@trace_public_methods
 class TeselaGenClient:
     """TeselaGen Client."""
     # NOTE: For cross-module endpoints use the DESIGN module as default.
     DEFAULT_MODULE_NAME: Literal['design'] = 'design'
     TESELAGEN_ACTIVE_LAB_IDENTIFIER: Literal['tg-active-lab-id'] = 'tg-active-lab-id'
+    # A stored token is trusted (without a request to the server) unless it expires within this margin.
+    TOKEN_EXPIRATION_MARGIN: timedelta = timedelta(minutes=1)
+    # A restored token expiring within this margin is replaced in the background (if a credentials file is found).
+    TOKEN_REFRESH_MARGIN: timedelta = timedelta(days=1)
 
     def __init__(
         self,
         host_url: str = get_default_host_name(),
         api_token_name: str = DEFAULT_API_TOKEN_NAME,
         module_name: Literal['design', 'build', 'test', 'discover'] = DEFAULT_MODULE_NAME,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        keep_alive: bool = True,
+        governor: Optional[ConcurrencyGovernor] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        cache: Optional[ResponseCache] = None,
+        persistent_cache: Optional[PersistentCache] = None,
+        coalesce_requests: bool = False,
+        hedging: Optional[HedgingPolicy] = None,
     ) -> None:
         """A Client to use for communication with the TeselaGen modules.
 
@@ -72,11 +121,46 @@ class TeselaGenClient:
             host_url (str) : The Host URL of the API. Defaults to "https://platform.teselagen.com"
 
             api_token_name (str) : The name of the API token to use. Defaults to "x-tg-api-token"
+
+            pool_connections (int) : Number of connection pools to cache (one per host). Defaults to 10.
+
+            pool_maxsize (int) : Maximum number of connections kept open per pool. Set it to (at least) the number \
+                of threads sharing this client. Defaults to 10.
+
+            keep_alive (bool) : Whether HTTP connections are kept open between requests. Defaults to True.
+
+            governor (Optional[ConcurrencyGovernor]) : Adaptive concurrency limit, rate limit and retry policy \
+                shared by all the requests of this client (and its module clients). Pass the same governor to several \
+                clients to share it between them, e.g. `ConcurrencyGovernor(initial_limit=pool_maxsize)`. Defaults \
+                to None (requests are sent as they are, without limits nor retries).
+
+            metrics (Optional[MetricsRegistry]) : Registry where the requests of this client (and its module clients) \
+                are recorded, per endpoint. Defaults to a new registry, available as `client.metrics`.
+
+            cache (Optional[ResponseCache]) : Opt-in TTL/LRU cache of the responses of slow-changing read endpoints \
+                (e.g. `get_assays`, `get_files_info`, `get_metadata`, `get_designs`, `get_models_by_type` or \
+                `get_laboratories`), invalidated by the matching write methods. Defaults to None (no cache).
+
+            persistent_cache (Optional[PersistentCache]) : Opt-in, size-bounded on-disk (SQLite) cache of records \
+                fetched by id (e.g. `get_dna_sequence`, `export_aa_sequence` or `get_design`), shared between \
+                sessions. Defaults to None (no persistent cache).
+
+            coalesce_requests (bool) : Whether identical concurrent GET requests (same URL, query parameters and \
+                laboratory) share a single HTTP call (and response). Streamed requests (`stream=True`) are never \
+                shared. Defaults to False.
+
+            hedging (Optional[HedgingPolicy]) : Opt-in hedging of GET requests: a request not answered after a \
+                percentile of the recent latencies of its endpoint is sent again (within a budget), and the first \
+                response wins. Defaults to None (no hedging).
         """
         self._design: Optional[DESIGNClient] = None
         self._test: Optional[TESTClient] = None
         self._discover: Optional[DISCOVERClient] = None
         self._build: Optional[BUILDClient] = None
+        # Guards the lazy creation of the module clients, so threads sharing the client share them too.
+        self._lock = threading.Lock()
+        # Laboratory-scoped views of this client (see `for_laboratory`), which follow its token.
+        self._views: weakref.WeakSet[TeselaGenClient] = weakref.WeakSet()
 
         # NOTE: Do not add passwords to the class attributes. Delete all passwords once they've been used.
 
@@ -105,14 +189,56 @@ class TeselaGenClient:
 
         # NOTE : The authorization token will be updated with the "login" method.
         self.auth_token: Optional[str] = None
+        self.token_expiration_date: Optional[datetime] = None
+        # Expiration time (in zeit/ms format) requested at login, also requested by the token refreshes.
+        self.token_expiration_time: Optional[str] = None
+        self._token_refresh_thread: Optional[threading.Thread] = None
 
         # Here we define the headers.
         self.headers: Dict[str, str] = {
             'Content-Type': 'application/json',
         }
 
+        # Per-endpoint count, latency histogram, bytes, retries and errors of every request of this client. Use
+        # `client.metrics.snapshot()`, `client.metrics.reset()` or `client.metrics.to_prometheus()`.
+        self.metrics: MetricsRegistry = metrics if metrics is not None else MetricsRegistry()
+
+        # Opt-in cache of the responses of slow-changing read endpoints.
+        self.cache: Optional[ResponseCache] = cache
+        self.persistent_cache: Optional[PersistentCache] = persistent_cache
+
+        # NOTE: All requests (including the ones made by the module clients) go through this pooled session, so
+        #       TCP/TLS connections are reused between calls.
+        self.http_session: TeselaGenSession = TeselaGenSession(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            keep_alive=keep_alive,
+            governor=governor,
+            metrics=self.metrics,
+            cache=self.cache,
+            persistent_cache=self.persistent_cache,
+            single_flight=SingleFlight() if coalesce_requests else None,
+            hedging=hedging,
+        )
+
+        _clients.add(self)
+
         print("Client ready. Please login")
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """The client is pickled by reference: its host, token, headers (with the selected laboratory) and settings \
+        (those of its HTTP session, governor, caches and policies), but no connection, cached response, module client \
+        nor metrics. An unpickled client is ready to use, without login."""
+        return {name: value for name, value in self.__dict__.items() if name not in _UNPICKLED_ATTRIBUTES}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._design, self._test, self._discover, self._build = None, None, None, None
+        self._lock = threading.Lock()
+        self._views = weakref.WeakSet()
+        self._token_refresh_thread = None
+        _clients.add(self)
+
     # The next four properties are TG Module Classes providing a series of functions that interact with their
     # corresponding TG API endpoints.
     # These objects are instantiated with the TeselaGen Client object so they share all common functions (such as:
@@ -122,28 +248,36 @@ class TeselaGenClient:
     def design(self) -> DESIGNClient:
         """This instantiates the client's 'design' property object which provides TeselaGen DESIGN API methods."""
         if self._design is None:
-            self._design = DESIGNClient(teselagen_client=self)
+            with self._lock:
+                if self._design is None:
+                    self._design = DESIGNClient(teselagen_client=self)
         return self._design
 
     @property
     def build(self) -> BUILDClient:
         """This instantiates the client's 'build' property object which provides TeselaGen BUILD API methods."""
         if self._build is None:
-            self._build = BUILDClient(teselagen_client=self)
+            with self._lock:
+                if self._build is None:
+                    self._build = BUILDClient(teselagen_client=self)
         return self._build
 
     @property
     def discover(self) -> DISCOVERClient:
         """This instantiates the client's 'discover' property object which provides TeselaGen DISCOVER API methods."""
         if self._discover is None:
-            self._discover = DISCOVERClient(teselagen_client=self)
+            with self._lock:
+                if self._discover is None:
+                    self._discover = DISCOVERClient(teselagen_client=self)
         return self._discover
 
     @property
     def test(self) -> TESTClient:
         """This instantiates the client's 'test' property object which provides TeselaGen TEST API methods."""
         if self._test is None:
-            self._test = TESTClient(teselagen_client=self)
+            with self._lock:
+                if self._test is None:
+                    self._test = TESTClient(teselagen_client=self)
         return self._test
 
     # Common methods for all four TG Modules.
@@ -164,8 +298,7 @@ class TeselaGenClient:
             'password': password,
             'passwordConfirm': password,
         }
-        response = post(url=self.register_url, json=body)
-        response['content'] = json.loads(response['content'])
+        response = post(url=self.register_url, json=body, session=self.http_session, parse_json=True)
         return response
 
     def login(
@@ -203,7 +336,7 @@ class TeselaGenClient:
             username=username,
             password=_password,
         )
-        auth_token = self.create_token(
+        auth_token, expiration_date = self._create_token(
             username=username,
             password=password,
             expiration_time=expiration_time,
@@ -215,14 +348,39 @@ class TeselaGenClient:
         del username, password
 
         # It will update the auth token and headers.
-        self.update_token(token=auth_token)
+        self.update_token(token=auth_token, expiration_date=expiration_date, expiration_time=expiration_time)
         return None
 
     def login_from_stored_session(self) -> bool:
+        """Restores the token of the stored session, if it was created for the same host.
+
+        A token whose expiration date is stored, and not within `TOKEN_EXPIRATION_MARGIN`, is trusted without a \
+        request to the server: it is validated by the first request that needs it (if the server rejects it, the \
+        stored session is deleted). A token expiring within `TOKEN_REFRESH_MARGIN` is replaced in the background, \
+        when credentials are found in the credentials file. Tokens without expiration date (stored by older versions) \
+        are validated against the server.
+
+        Returns:
+            bool: Whether a session was restored.
+        """
         # Load token from file if exists
         session = load_session_file()
         if session is not None:
             if session['host_url'] == self.host_url:
+                expiration_date: Optional[datetime] = (
+                    parse_datetime(session['expiration_date']) if session.get('expiration_date') else None)
+                if expiration_date is not None:
+                    if expiration_date - datetime.now(timezone.utc) <= self.TOKEN_EXPIRATION_MARGIN:
+                        # The token has expired (or is about to): a new one is needed.
+                        delete_session_file()
+                        return False
+                    self.update_token(token=session['token'], save_to_storage=False, expiration_date=expiration_date,
+                                      expiration_time=session.get('expiration_time'))
+                    self.http_session.hooks['response'].append(self._validate_restored_token)
+                    self._refresh_token_in_background()
+                    print(f'Session restored at {self.host_url}')
+                    return True
+
                 self.update_token(token=session['token'], save_to_storage=False)
                 #TODO: Check permissions are ok
                 api_info = self.get_api_info()
@@ -271,12 +429,68 @@ class TeselaGenClient:
         delete_session_file()
 
         # We wait (a few seconds) for the (temporary) token to expire
-        time.sleep(3)
+        if not cassettes.is_replaying():
+            time.sleep(3)
 
         # NOTE :Verify that the user is deauthorized after the return.
         # raise NotImplementedError
         return
 
+    def _validate_restored_token(self, response: requests.Response, *args: Any, **kwargs: Any) -> requests.Response:
+        """Response hook validating a restored token (see `login_from_stored_session`) with the first response to a \
+        request authenticated with it. If the token was rejected, it is deleted along with the stored session."""
+        request_token: Optional[str] = response.request.headers.get(self.api_token_name)
+        if request_token is None or request_token != self.auth_token or '/public/' in (response.request.url or ''):
+            # Public endpoints do not check the token.
+            return response
+
+        try:
+            self.http_session.hooks['response'].remove(self._validate_restored_token)
+        except ValueError:
+            # Concurrent responses race to validate the token: it was validated (or rejected) by another one.
+            return response
+        if response.status_code == 401:
+            print(f'The stored session at {self.host_url} is no longer valid. Please login again.')
+            self.update_token(token=None)
+            delete_session_file()
+        return response
+
+    def _refresh_token_in_background(self) -> None:
+        """Replaces the token in a background thread if it expires within `TOKEN_REFRESH_MARGIN`, using the \
+        credentials of the credentials file (if there is none, the token is kept until it expires). The new token \
+        expires after the expiration time requested at login (or the default one of `login`)."""
+        if self.token_expiration_date is None or cassettes.is_replaying():
+            return
+        if self.token_expiration_date - datetime.now(timezone.utc) > self.TOKEN_REFRESH_MARGIN:
+            return
+
+        try:
+            credentials = load_credentials_from_file()
+        except (KeyError, ValueError):
+            credentials = None
+        if credentials is None or credentials.username is None or credentials.password is None:
+            return
+
+        expiration_time: str = self.token_expiration_time or '1w'
+
+        def refresh_token(old_token: Optional[str]) -> None:
+            token, expiration_date = self._create_token(
+                username=credentials.username,
+                password=credentials.password,
+                expiration_time=expiration_time,
+            )
+            # The token is only replaced if the client has not logged in nor out in the meantime.
+            if token is not None and self.auth_token == old_token:
+                self.update_token(token=token, expiration_date=expiration_date, expiration_time=expiration_time)
+
+        self._token_refresh_thread = threading.Thread(
+            target=refresh_token,
+            args=(self.auth_token,),
+            name='teselagen-token-refresh',
+            daemon=True,
+        )
+        self._token_refresh_thread.start()
+
     def get_server_status(self) -> str:
         """Gets the current Server Status.
 
@@ -288,6 +502,7 @@ class TeselaGenClient:
             url=self.status_url,
             params=None,
             headers=self.headers,
+            session=self.http_session,
         )
 
         return response['content']
@@ -311,6 +526,18 @@ class TeselaGenClient:
             Optional[str]: It returns the authentication token (as a string) for the given email address, or \
                 None if the email address is not authenticated.
         """
+        token, _ = self._create_token(username=username, password=password, expiration_time=expiration_time)
+        return token
+
+    def _create_token(
+        self,
+        username: str,
+        password: str,
+        expiration_time: str,
+    ) -> Tuple[Optional[str], Optional[datetime]]:
+        """Creates a new access token for the user (see `create_token`), and returns it along with its expiration \
+        date (as given by the server, or estimated from `expiration_time`)."""
+        requested_at: datetime = datetime.now(timezone.utc)
         body = {
             'username': username,
             'password': password,
@@ -323,48 +550,82 @@ class TeselaGenClient:
                 url=self.auth_url,
                 headers=self.headers,
                 json=body,
+                session=self.http_session,
             )
         except Exception as _exc:  # noqa: F841
             # TODO : Use a logger
             print(f'Connection Refused at {self.auth_url} with username: {username}')
-            return None
+            return None, None
         print(f'Connection Accepted at {self.host_url}')
 
         del username, password, body
 
         try:
-            response['content'] = json.loads(response['content'])
+            response['content'] = serializers.loads(response['content'])
         except Exception as e:
             print(f"Response is not ok. Response: {response}")
             raise e
 
-        # TODO: We could log the expiration Date
-        # expiration_date: str = content['expirationDate']
-
         # NOTE: Should we raise an exception if the content is not a valid JSON ?
         token: Optional[str] = response['content']['token'] if response['status'] else None
+        if token is None:
+            return None, None
 
-        return token
+        try:
+            expiration_date: Optional[datetime] = parse_datetime(response['content']['expirationDate'])
+        except (KeyError, TypeError, ValueError):
+            try:
+                expiration_date = requested_at + parse_duration(expiration_time)
+            except ValueError:
+                expiration_date = None
+
+        return token, expiration_date
 
     # TODO: Rename this to update_class_token() or update_auth_token()
-    def update_token(self, token: Optional[str], save_to_storage=True) -> None:
+    def update_token(
+        self,
+        token: Optional[str],
+        save_to_storage: bool = True,
+        expiration_date: Optional[datetime] = None,
+        expiration_time: Optional[str] = None,
+    ) -> None:
         """Update the authorization token in the class headers and class attributes.
 
         Args:
             token (Optional[str]) : The authorization token to update in headers and class attributes. If the token \
                 is None, it will locally delete the last token from the class attributes.
+
+            save_to_storage (bool) : Whether to store the token in the session file. Defaults to True.
+
+            expiration_date (Optional[datetime]) : Expiration date of the token. When it is stored, the session is \
+                restored without a request to the server. Defaults to None (unknown).
+
+            expiration_time (Optional[str]) : Expiration time requested for the token, in zeit/ms format. It is \
+                requested again when the token is refreshed (see `login_from_stored_session`). Defaults to None \
+                (unknown).
         """
         self.auth_token = token
+        self.token_expiration_date = expiration_date if token is not None else None
+        self.token_expiration_time = expiration_time if token is not None else None
 
         if self.auth_token is not None:
             # If a new token is provided, we update the headers
             self.headers[self.api_token_name] = self.auth_token
             if save_to_storage:
-                save_session_file(session_dict={"host_url": self.host_url, "token": self.auth_token})
+                save_session_file(session_dict={
+                    'host_url': self.host_url,
+                    'token': self.auth_token,
+                    'expiration_date': expiration_date.isoformat() if expiration_date is not None else None,
+                    'expiration_time': expiration_time,
+                })
         else:
             # If the token provided is None, we remove the last token from the headers.
             _ = self.headers.pop(self.api_token_name) if self.api_token_name in self.headers.keys() else None
 
+        for view in list(self._views):
+            view.update_token(token=token, save_to_storage=False, expiration_date=expiration_date,
+                              expiration_time=expiration_time)
+
         return
 
     def get_api_info(self) -> str:
@@ -379,6 +640,7 @@ class TeselaGenClient:
             response = get(
                 url=self.info_url,
                 headers=self.headers,
+                session=self.http_session,
             )
 
         except Exception as e:
@@ -402,8 +664,7 @@ class TeselaGenClient:
             ( ): The current user.
         """
         # TODO : implement a method to get the expiration date of the current token
-        response = get(url=self.auth_url, headers=self.headers)
-        response['content'] = json.loads(response['content'])
+        response = get(url=self.auth_url, headers=self.headers, session=self.http_session, parse_json=True)
 
         return response
 
@@ -415,11 +676,9 @@ class TeselaGenClient:
         Returns :
             (List[Laboratory]): A list of laboratories objects.
         """
-        response = get(url=self.labs_url, headers=self.headers)
+        response = get(url=self.labs_url, headers=self.headers, session=self.http_session, parse_json=True)
 
         # response["content"] = [{"id" : str, "name": str}, ...]
-        response['content'] = json.loads(response['content'])
-
         return response['content']
 
     def select_laboratory(
@@ -448,18 +707,14 @@ class TeselaGenClient:
             self.unselect_laboratory()
             return
 
-        labs = self.get_laboratories()
-        lab = list(filter(lambda x: x[search_field] == identifier, labs))
-
-        if len(lab) == 0:
-            raise OSError(f"Can't find {search_field} {identifier}. Available labs are {labs}")
+        lab = self._find_laboratory(search_field=search_field, identifier=identifier)
 
         # Finally store lab id in headers
         self.headers.update({
-            self.TESELAGEN_ACTIVE_LAB_IDENTIFIER: str(lab[0]['id']),
+            self.TESELAGEN_ACTIVE_LAB_IDENTIFIER: str(lab['id']),
         })
 
-        print(f"Selected Lab: {lab[0]['name']}")
+        print(f"Selected Lab: {lab['name']}")
 
     def unselect_laboratory(self) -> None:
         """Clear the selection of a laboratory and removes it from instance headers."""
@@ -468,3 +723,79 @@ class TeselaGenClient:
             del self.headers[self.TESELAGEN_ACTIVE_LAB_IDENTIFIER]
 
         print('Selected Lab: Common')
+
+    def for_laboratory(
+        self,
+        lab_id: Optional[int] = None,
+        lab_name: Optional[str] = None,
+    ) -> TeselaGenClient:
+        """Returns a view of the client scoped to a laboratory.
+
+        `select_laboratory` changes the laboratory of every request of the client (and of its module clients), so it \
+        cannot be used by threads working on different laboratories. A view shares the HTTP session (and its \
+        connection pool), token, metrics and caches of the client, but has its own headers and module clients: views \
+        of different laboratories can be used concurrently.
+
+        Args:
+            lab_id (Optional[int]): ID of the lab. It is not checked against the server (see `get_laboratories`), so \
+                creating the view makes no request.
+
+            lab_name (Optional[str]): Name of the lab, used if `lab_id` is not set (finding its ID makes a request). \
+                If it is "Common", the view is not scoped to any laboratory.
+
+        Returns:
+            TeselaGenClient: The view of the client.
+
+        Example:
+            >>> with ThreadPoolExecutor(max_workers=8) as executor:
+            ...     assays = executor.map(lambda lab: client.for_laboratory(lab_id=lab['id']).test.get_assays(),
+            ...                           client.get_laboratories())
+        """
+        if lab_id is None and lab_name is None:
+            raise ValueError('Received None lab identifiers')
+
+        if lab_id is None and lab_name.lower() != 'common':
+            lab_id = self._find_laboratory(search_field='name', identifier=lab_name)['id']
+
+        view: TeselaGenClient = copy.copy(self)
+        view._design, view._test, view._discover, view._build = None, None, None, None
+        view._lock = threading.Lock()
+        view._views = weakref.WeakSet()
+        view._token_refresh_thread = None
+        _clients.add(view)
+        view.headers = {
+            name: value for name, value in self.headers.items() if name != self.TESELAGEN_ACTIVE_LAB_IDENTIFIER
+        }
+        if lab_id is not None:
+            view.headers[self.TESELAGEN_ACTIVE_LAB_IDENTIFIER] = str(lab_id)
+
+        self._views.add(view)
+        return view
+
+    def _find_laboratory(self, search_field: Literal['id', 'name'], identifier: str) -> Laboratory:
+        """Returns the laboratory of the current user whose `search_field` is `identifier`.
+
+        Raises:
+            OSError: If the user has no such laboratory.
+        """
+        labs = self.get_laboratories()
+        lab = list(filter(lambda x: x[search_field] == identifier, labs))
+
+        if len(lab) == 0:
+            raise OSError(f"Can't find {search_field} {identifier}. Available labs are {labs}")
+
+        return lab[0]
+
+
+# Clients of this process, whose locks are replaced in the child processes forked from it (an inherited lock may be
+# held by a thread that does not exist in the child). Their sessions are reinitialized by `teselagen.utils.transport`.
+_clients: weakref.WeakSet[TeselaGenClient] = weakref.WeakSet()
+
+
+def _reinitialize_clients() -> None:
+    for client in list(_clients):
+        client._lock = threading.Lock()  # pylint: disable=protected-access
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinitialize_clients)
@@ -11,16 +11,19 @@ from os.path import join
 from typing import cast, TYPE_CHECKING
 from urllib.parse import urljoin
 
-import numpy as np
-import pandas as pd
-
 from teselagen.utils import download_file
+from teselagen.utils import serializers
 from teselagen.utils import get
+from teselagen.utils import is_instance
 from teselagen.utils import post
+from teselagen.utils.tracing import trace_public_methods
 
 if TYPE_CHECKING:
     from typing import Any, Dict, List, Literal, Optional, Set, Tuple, Union
 
+    import numpy as np
+    import pandas as pd
+
     from teselagen.api import TeselaGenClient
 
 SUPPORTED_AA_EXPORT_FORMATS: List[Literal['JSON', 'FASTA', 'GENBANK']] = [
@@ -33,6 +36,7 @@ SUPPORTED_AA_EXPORT_FORMATS: List[Literal['JSON', 'FASTA', 'GENBANK']] = [
 #           "Query Params" goes into "params" argument
 
 
+@trace_public_methods
 class DESIGNClient:
     """DESIGN Client."""
 
@@ -57,6 +61,8 @@ class DESIGNClient:
 
         self.host_url = teselagen_client.host_url
         self.headers = teselagen_client.headers
+        # Shared (pooled, keep-alive) HTTP session of the parent client.
+        self.http_session = teselagen_client.http_session
         # Here we define the Base CLI URL.
         api_url_base: str = teselagen_client.api_url_base
 
@@ -165,14 +171,16 @@ class DESIGNClient:
         if out_format not in self.ALLOWED_SEQ_FORMATS:
             raise ValueError(f'Format {out_format} not in {self.ALLOWED_SEQ_FORMATS}')
         url = urljoin(self.export_dna_sequence_url, f'{out_format}/{seq_id}')
-        response = get(url=url, headers=self.headers)
+        # NOTE: JSON is deserialized straight from the response bytes, unless its text is also written to a file.
+        parse_json: bool = out_format == 'json' and out_filepath is None
+        response = get(url=url, headers=self.headers, session=self.http_session, parse_json=parse_json)
         # Write output file
         if out_filepath is not None:
             with open(out_filepath, 'w') as f:
                 f.write(response['content'])
-        # Parse json
-        if out_format == 'json':
-            response['content'] = json.loads(response['content'])
+            # Parse json
+            if out_format == 'json':
+                response['content'] = serializers.loads(response['content'])
         # Finish
         return response['content']
 
@@ -189,8 +197,14 @@ class DESIGNClient:
             List[dict]: List of dicts with sequence data.
         """
         args = {'name': name}
-        response = get(url=self.export_dna_sequences_url, headers=self.headers, params=args)
-        return json.loads(response['content'])
+        response = get(
+            url=self.export_dna_sequences_url,
+            headers=self.headers,
+            params=args,
+            session=self.http_session,
+            parse_json=True,
+        )
+        return response['content']
 
     def get_designs(
         self,
@@ -217,8 +231,14 @@ class DESIGNClient:
         # Param gqlFilter should be a json string
         args['gqlFilter'] = json.dumps(args['gqlFilter'])
         # Make request and process output
-        response = get(url=self.get_designs_url, headers=self.headers, params=args)
-        out = json.loads(response['content'])
+        response = get(
+            url=self.get_designs_url,
+            headers=self.headers,
+            params=args,
+            session=self.http_session,
+            parse_json=True,
+        )
+        out = response['content']
         # Remove useless key
         for el in out:
             el.pop('__typename')
@@ -238,10 +258,15 @@ class DESIGNClient:
         Returns:
             dict: A dict containing designs information
         """
-        response = get(url=f'{self.get_design_url}/{design_id}', headers=self.headers)
+        response = get(
+            url=f'{self.get_design_url}/{design_id}',
+            headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
+        )
         # params=args)
 
-        return json.loads(response['content'])
+        return response['content']
 
     def post_design(
         self,
@@ -264,8 +289,14 @@ class DESIGNClient:
             'designJson': design,
             'allowDuplicates': allow_duplicates,
         }
-        response = post(url=self.post_designs_url, headers=self.headers, json=body)
-        return json.loads(response['content'])
+        response = post(
+            url=self.post_designs_url,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
+        return response['content']
 
     def get_assembly_report(
         self,
@@ -285,7 +316,7 @@ class DESIGNClient:
             local_filename = f'report_{report_id}.zip'
         # url = f'{self.api_url_base}{self.URL_GET_ASSEMBLY_REPORT}/{report_id}'
         url = self.get_assembly_report_url.format(report_id)
-        return download_file(url=url, local_filename=local_filename, headers=self.headers)
+        return download_file(url=url, local_filename=local_filename, headers=self.headers, session=self.http_session)
 
     def post_codon_optimization_job(
         self,
@@ -298,16 +329,27 @@ class DESIGNClient:
             'algorithm': algorithm,
             'parameters': parameters,
         }
-        response = post(url=self.post_codon_op, headers=self.headers, json=body)
-        return json.loads(response['content'])
+        response = post(
+            url=self.post_codon_op,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
+        return response['content']
 
     def get_codon_optimization_job_results(
         self,
         job_id,
     ):
-        response = get(url=f'{self.get_codon_op_result}/{job_id}', headers=self.headers)
+        response = get(
+            url=f'{self.get_codon_op_result}/{job_id}',
+            headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
+        )
         # params=args)
-        return json.loads(response['content'])
+        return response['content']
 
     # RBS Calculator Methods.
 
@@ -334,7 +376,7 @@ class DESIGNClient:
             dict: {authenticated: boolean, success: boolean}
         """
         try:
-            result = get(url=self.rbs_calculator_status_url, headers=self.headers)
+            result = get(url=self.rbs_calculator_status_url, headers=self.headers, session=self.http_session)
         except Exception as e:
             return {
                 'error': e,
@@ -358,6 +400,7 @@ class DESIGNClient:
             result = get(
                 url=self.rbs_calculator_job_url.format(job_id) if job_id is not None else self.rbs_calculator_jobs_url,
                 headers=self.headers,
+                session=self.http_session,
             )
         except Exception as e:
             return {
@@ -382,14 +425,19 @@ class DESIGNClient:
             result = get(
                 url=self.rbs_calculator_organisms_url,
                 headers=self.headers,
+                session=self.http_session,
+                parse_json=True,
             )
         except Exception as e:
             return {
                 'error': e,
             }
 
-        result = json.loads(result['content'])
-        result = pd.DataFrame(result) if as_dataframe else result
+        result = result['content']
+        if as_dataframe:
+            import pandas as pd
+
+            result = pd.DataFrame(result)
 
         return result
 
@@ -497,19 +545,25 @@ class DESIGNClient:
         Returns:
             JSON with RBS Calculator job response. This may depend on the chosen tool.
         """
-        _params: str = json.dumps({
+        _params: Dict[str, Any] = {
             **params,
             **{
                 'algorithm': algorithm,
             },
-        })
+        }
 
         try:
-            result = post(url=self.rbs_calculator_submit_url, data=_params, headers=self.headers)
+            result = post(
+                url=self.rbs_calculator_submit_url,
+                json=_params,
+                headers=self.headers,
+                session=self.http_session,
+                parse_json=True,
+            )
         except Exception as e:
             return {'error': e}
 
-        result = json.loads(result['content'])
+        result = result['content']
 
         return result
 
@@ -541,7 +595,7 @@ class DESIGNClient:
         if aa_sequences is None:
             raise Exception("The 'aa_sequences' argument is mandatory.")
 
-        if isinstance(aa_sequences, pd.DataFrame):
+        if is_instance(aa_sequences, 'pandas', 'DataFrame'):
             params['name'] = aa_sequences.iloc[:, 0].values.tolist()
             params['contents'] = aa_sequences.iloc[:, 1].values.tolist()
 
@@ -569,11 +623,17 @@ class DESIGNClient:
             params['tags'] = list(map(lambda x: {'id': x}, tags))
 
         try:
-            result = post(url=self.import_aa_url, data=json.dumps(params), headers=self.headers)
+            result = post(
+                url=self.import_aa_url,
+                json=params,
+                headers=self.headers,
+                session=self.http_session,
+                parse_json=True,
+            )
         except Exception as e:
             return e
 
-        parsed_api_result = json.loads(result['content'])
+        parsed_api_result = result['content']
 
         formatted_response = {}
 
@@ -637,12 +697,17 @@ class DESIGNClient:
             raise ValueError("Argument 'format' can only be one of this three strings: JSON, FASTA or GENBANK.")
 
         try:
-            result = get(url=self.export_aa_url.format(format, aa_sequence_id), headers=self.headers)
+            result = get(
+                url=self.export_aa_url.format(format, aa_sequence_id),
+                headers=self.headers,
+                session=self.http_session,
+                parse_json=format == 'JSON',
+            )
         except Exception as e:
             return e
 
         if format == 'JSON':
-            parsed_response = json.loads(result['content'])
+            parsed_response = result['content']
             formatted_response = {
                 'id':
                     parsed_response['id'],
@@ -717,9 +782,9 @@ class DESIGNClient:
         if isinstance(aa_sequence_ids, str):
             _sequence_ids.append(aa_sequence_ids)
 
-        if isinstance(aa_sequence_ids, np.ndarray):
-            if all(isinstance(x, str) for x in cast(np.ndarray, aa_sequence_ids)):
-                _sequence_ids.extend(cast(np.ndarray, aa_sequence_ids).tolist())
+        if is_instance(aa_sequence_ids, 'numpy', 'ndarray'):
+            if all(isinstance(x, str) for x in cast('np.ndarray', aa_sequence_ids)):
+                _sequence_ids.extend(cast('np.ndarray', aa_sequence_ids).tolist())
             else:
                 raise ValueError("All elements in list argument 'aa_sequence_ids' must be of type int.")
 
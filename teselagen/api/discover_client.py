@@ -5,17 +5,20 @@
 
 from __future__ import annotations
 
-import json
 from typing import TYPE_CHECKING
 
-import numpy as np
-
 from teselagen.utils import get
+from teselagen.utils import is_instance
 from teselagen.utils import post
 from teselagen.utils import wait_for_status
+from teselagen.utils.paging import AdaptivePageSize
+from teselagen.utils.paging import iter_pages
+from teselagen.utils.tracing import trace_public_methods
 
 if TYPE_CHECKING:
-    from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+    from typing import Any, Dict, Iterator, List, Literal, Optional, Tuple, Union
+
+    import numpy as np
 
     from teselagen.api import TeselaGenClient
 
@@ -47,6 +50,7 @@ GENERATIVE_MODEL_DATA_SCHEMA = [
 ]
 
 
+@trace_public_methods
 class DISCOVERClient():
     """DISCOVER Client."""
 
@@ -63,6 +67,8 @@ class DISCOVERClient():
 
         self.host_url = teselagen_client.host_url
         self.headers = teselagen_client.headers
+        # Shared (pooled, keep-alive) HTTP session of the parent client.
+        self.http_session = teselagen_client.http_session
 
         # Here we define the Base CLI URL.
         api_url_base: str = teselagen_client.api_url_base
@@ -165,8 +171,13 @@ class DISCOVERClient():
         body = {
             'id': str(model_id),
         }
-        response = post(url=self.get_model_url, headers=self.headers, json=body)
-        response['content'] = json.loads(response['content'])
+        response = post(
+            url=self.get_model_url,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
 
         # Check output
         try:
@@ -271,8 +282,13 @@ class DISCOVERClient():
         body = {
             'modelType': model_type,
         }
-        response = post(url=self.get_models_by_type_url, headers=self.headers, json=body)
-        response['content'] = json.loads(response['content'])
+        response = post(
+            url=self.get_models_by_type_url,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
         return self._get_data_from_content(response['content'])
 
     def get_model_datapoints(
@@ -323,9 +339,11 @@ class DISCOVERClient():
             url=self.get_model_datapoints_url,
             headers=self.headers,
             json=body,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        responseContent: Dict[str, Any] = json.loads(response['content'])  # noqa: N806
+        responseContent: Dict[str, Any] = response['content']  # noqa: N806
 
         datapoints: List[Dict[str, Any]] = []
         if 'data' in responseContent:
@@ -337,6 +355,42 @@ class DISCOVERClient():
 
         return responseContent
 
+    def iter_model_datapoints(
+        self,
+        model_id: ModelID,
+        datapoint_type: str,
+        page_sizer: Optional[AdaptivePageSize] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yields all the datapoints of a model, fetching them by batches (see `get_model_datapoints`).
+
+        The size of each batch is adapted to the latency and size of the previous ones, so that batches are as large \
+        as possible without being too slow (see `teselagen.utils.paging`).
+
+        Args:
+            model_id (ModelID): ID of the model
+
+            datapoint_type (str): "input" (training datapoints) or "output" (predicted datapoints).
+
+            page_sizer (Optional[AdaptivePageSize]): Controller of the batch sizes. Defaults to None (a new \
+                `AdaptivePageSize` with the default settings).
+
+        Yields:
+            Dict[str, Any]: The datapoints.
+        """
+        page_sizer = page_sizer if page_sizer is not None else AdaptivePageSize()
+
+        def get_batch(batch_number: int, batch_size: int) -> List[Dict[str, Any]]:
+            return self.get_model_datapoints(
+                model_id=model_id,
+                datapoint_type=datapoint_type,
+                batch_size=batch_size,
+                batch_number=batch_number,
+            )['data']
+
+        # NOTE: batch numbers are 0-based.
+        for batch in iter_pages(get_batch, page_sizer=page_sizer, first_page_number=0):
+            yield from batch
+
     def submit_model(
         self,
         data_input: List[Any],
@@ -453,9 +507,14 @@ class DISCOVERClient():
             'name': name,
             'description': '' if description is None else description,
         }
-        response = post(url=self.submit_model_url, headers=self.headers, json=body)
+        response = post(
+            url=self.submit_model_url,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
 
-        response['content'] = json.loads(response['content'])
         return self._get_data_from_content(response['content'])
 
     def submit_prediction_task(
@@ -487,9 +546,11 @@ class DISCOVERClient():
             url=self.submit_model_url,
             headers=self.headers,
             json=body,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        responseContent: Dict[str, Any] = json.loads(response['content'])  # noqa: N806
+        responseContent: Dict[str, Any] = response['content']  # noqa: N806
 
         responseContent['data'].update({'pretrainedModelId': model_id})
 
@@ -646,8 +707,9 @@ class DISCOVERClient():
             url=self.submit_multi_objective_optimization_url,
             headers=self.headers,
             json=body,
+            session=self.http_session,
+            parse_json=True,
         )
-        response['content'] = json.loads(response['content'])
         return response['content']
 
     # TODO: Add docstrings for `get_multi_objective_optimization` method.
@@ -658,9 +720,10 @@ class DISCOVERClient():
         response = get(
             url=self.get_multi_objective_optimization_url.format(taskId),
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        response['content'] = json.loads(response['content'])
         return response['content']
 
     def delete_model(
@@ -679,8 +742,13 @@ class DISCOVERClient():
         body = {
             'id': str(model_id),
         }
-        response = post(url=self.delete_model_url, headers=self.headers, json=body)
-        response['content'] = json.loads(response['content'])
+        response = post(
+            url=self.delete_model_url,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
         return self._get_data_from_content(response['content'])
         # raise NotImplementedError
 
@@ -699,8 +767,13 @@ class DISCOVERClient():
         body = {
             'id': str(model_id),
         }
-        response = post(url=self.cancel_model_url, headers=self.headers, json=body)
-        response['content'] = json.loads(response['content'])
+        response = post(
+            url=self.cancel_model_url,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
         return self._get_data_from_content(response['content'])
 
     def get_task(
@@ -717,9 +790,11 @@ class DISCOVERClient():
         response = get(
             url=self.get_task_url.format(task_id),
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        return json.loads(response['content'])
+        return response['content']
 
     def cancel_task(
         self,
@@ -736,8 +811,10 @@ class DISCOVERClient():
         response = post(
             url=self.cancel_task_url.format(task_id),
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
-        return json.loads(response['content'])
+        return response['content']
 
     def design_crispr_grnas(
         self,
@@ -827,10 +904,16 @@ class DISCOVERClient():
         if max_number is not None:
             body['CRISPRToolData']['options']['maxNumber'] = max_number
 
-        response = post(url=self.crispr_guide_rnas_url, headers=self.headers, json=body)
+        response = post(
+            url=self.crispr_guide_rnas_url,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
 
-        if isinstance(response['content'], str):
-            result = json.loads(response['content'])
+        if isinstance(response['content'], dict):
+            result = response['content']
         else:
             print(f"Error in response: {response}")
             result = {}
@@ -856,9 +939,14 @@ class DISCOVERClient():
         Returns:
             dict: status of the process and, if finished, guides information  as described in `design_crispr_grnas`.
         """
-        response = get(url=self.crispr_guide_rnas_result_url.format(task_id), headers=self.headers)
+        response = get(
+            url=self.crispr_guide_rnas_result_url.format(task_id),
+            headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
+        )
 
-        return json.loads(response['content'])
+        return response['content']
 
     def submit_generative_model(
         self,
@@ -916,13 +1004,13 @@ class DISCOVERClient():
         }
 
         if aa_sequences is not None:
-            if isinstance(aa_sequences, (list, np.ndarray)):
+            if isinstance(aa_sequences, list) or is_instance(aa_sequences, 'numpy', 'ndarray'):
                 if all(isinstance(x, str) for x in aa_sequences):
                     kwargs['data_input'] = list(map(lambda x: {'sequence': x}, aa_sequences))
                 else:
                     raise ValueError('All amino acid sequences must be of type string.')
         elif aa_sequence_ids is not None:
-            if isinstance(aa_sequence_ids, (list, np.ndarray)):
+            if isinstance(aa_sequence_ids, list) or is_instance(aa_sequence_ids, 'numpy', 'ndarray'):
                 if all(isinstance(x, int) for x in aa_sequence_ids):
                     NotImplementedError('Passing sequence IDs is not yet supported.')
                     # TODO: import sequences from DESIGN using the IDs in aa_sequence_ids.
@@ -6,23 +6,26 @@
 from __future__ import annotations
 
 from io import StringIO
-import json
 from os.path import join
 from pathlib import Path
 from typing import TYPE_CHECKING, TypedDict
 import warnings
 
-import pandas as pd
-
 from teselagen.utils import delete
 from teselagen.utils import get
 from teselagen.utils import post
 from teselagen.utils import put
+from teselagen.utils.paging import iter_pages
+from teselagen.utils.tracing import span
+from teselagen.utils.tracing import trace_public_methods
 
 if TYPE_CHECKING:
     from typing import Any, Dict, List, Literal, Optional, Union
 
+    import pandas as pd
+
     from teselagen.api import TeselaGenClient
+    from teselagen.utils.paging import AdaptivePageSize
 
     class AssayRecord(TypedDict, total=True):
         """The assay the Assay Subject has been involved in.
@@ -173,6 +176,7 @@ IMPORTED_FILE_STATUSES: List[Literal['FINISHED', 'FINISHED-DISCARDED']] = [
 ]
 
 
+@trace_public_methods
 class TESTClient:
     """TEST Client."""
 
@@ -189,6 +193,8 @@ class TESTClient:
 
         self.host_url = teselagen_client.host_url
         self.headers = teselagen_client.headers
+        # Shared (pooled, keep-alive) HTTP session of the parent client.
+        self.http_session = teselagen_client.http_session
 
         # Here we define the Base CLI URL.
         api_url_base: str = teselagen_client.api_url_base
@@ -242,8 +248,13 @@ class TESTClient:
             },
         ]
 
-        response = post(url=self.create_assay_subjects_url, headers=self.headers, json=body)
-        response['content'] = json.loads(response['content'])
+        response = post(
+            url=self.create_assay_subjects_url,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
 
         return response['content']
 
@@ -297,11 +308,11 @@ class TESTClient:
             url=url,
             params=params,
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
 
         # response['content'] = [{'id' : str, 'name': str}, ...]
-        response['content'] = json.loads(response['content'])
-
         return response['content']
 
     # TODO(diegovalenzuelaiturra): Verify if returned value is an array of IDs of the Assay Subjects deleted
@@ -329,6 +340,7 @@ class TESTClient:
             url=self.delete_assay_subject_url.format(''),
             params=params,
             headers=self.headers,
+            session=self.http_session,
         )
 
         return response['content']
@@ -379,10 +391,10 @@ class TESTClient:
             url=self.put_assay_subject_descriptors_url,
             headers=self.headers,
             json=body,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        response['content'] = json.loads(response['content'])
-
         return response['content']
 
     def import_assay_subject_descriptors(
@@ -431,9 +443,11 @@ class TESTClient:
             url=self.post_assay_subjects_descriptors_import_url,
             headers=self.headers,
             json=body,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        parsed_content = json.loads(response['content'])
+        parsed_content = response['content']
 
         if 'message' in parsed_content.keys():
             parsed_content['message'] = parsed_content['message'].replace('Assay results', 'Assay Subject descriptor')
@@ -459,13 +473,14 @@ class TESTClient:
             response = get(
                 url=self.get_assay_subjects_descriptors_import_url.format(importId),
                 headers=self.headers,
+                session=self.http_session,
+                parse_json=True,
             )
         except Exception as e:
             # TODO : Use a logger
             print('Error:', e)
             return None
 
-        response['content'] = json.loads(response['content'])
         response.pop('url')
 
         return response
@@ -503,10 +518,10 @@ class TESTClient:
         response = get(
             url=self.get_assays_url,
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        response['content'] = json.loads(response['content'])
-
         return response['content']
 
     def create_assay(
@@ -524,13 +539,15 @@ class TESTClient:
                 url=self.create_assay_url,
                 headers=self.headers,
                 json=body,
+                session=self.http_session,
+                parse_json=True,
             )
         except Exception as _exc:  # noqa: F841
             # TODO : Use a logger
             raise
 
         # A dictionary {id: str} with the ID of the new Assay.
-        assay_res: Dict[str, str] = json.loads(response['content'])[0]
+        assay_res: Dict[str, str] = response['content'][0]
 
         if not assay_res:
             raise OSError(f"Creation failed. Result: {assay_res}")
@@ -545,10 +562,12 @@ class TESTClient:
         response = delete(
             url=self.delete_assay_url.format(assay_id),
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
 
         # A dictionary {id: str} with the ID of the deleted Assay.
-        return json.loads(response['content'])
+        return response['content']
 
     def delete_assays(
         self,
@@ -629,6 +648,8 @@ class TESTClient:
                 url=self.assay_results_url.format(assay_id),
                 headers=self.headers,
                 json=body,
+                session=self.http_session,
+                parse_json=True,
             )
             print(f'response: {response}')
         except Exception as e:
@@ -636,8 +657,6 @@ class TESTClient:
             print('Error:', e)
             return None
 
-        response['content'] = json.loads(response['content'])
-
         return response['content']
 
     def import_assay_results(
@@ -699,14 +718,14 @@ class TESTClient:
                 url=self.post_assay_results_import_url.format(assay_id),
                 headers=self.headers,
                 json=body,
+                session=self.http_session,
+                parse_json=True,
             )
         except Exception as e:
             # TODO : Use a logger
             print('Error:', e)
             return None
 
-        response['content'] = json.loads(response['content'])
-
         return response['content']
 
     # -> AssaySubjectDescriptorImportJob
@@ -726,14 +745,14 @@ class TESTClient:
             response = get(
                 url=self.get_assay_results_import_url.format(importId),
                 headers=self.headers,
+                session=self.http_session,
+                parse_json=True,
             )
         except Exception as e:
             # TODO : Use a logger
             print('Error:', e)
             return None
 
-        response['content'] = json.loads(response['content'])
-
         return response
 
     # TODO : For assays with multiple imported files, evaluate support for retrieving the assay results merged together.
@@ -747,6 +766,7 @@ class TESTClient:
         as_dataframe: Optional[bool] = True,
         with_subject_data: Optional[bool] = True,
         with_units: Optional[bool] = False,
+        page_sizer: Optional[AdaptivePageSize] = None,
     ) -> List[IAssayResults]:
         """Calls Teselagen TEST API endpoint: `GET /assays/:assayId/results`.
 
@@ -772,16 +792,22 @@ class TESTClient:
             with_subject_data (Optional[bool]): Flag indicating whether to return the assay results together with a \
                 more complete information on the assay subjects (default=True).
 
+            page_sizer (Optional[AdaptivePageSize]): If set, all the pages of results are returned, with page sizes \
+                adapted to the latency and size of the previous pages (see `teselagen.utils.paging`), instead of \
+                `page_number` and `page_size` (default=None).
 
         Returns:
             List[IAssayResults]: A `IAssayResults` object or a list of `IAssayResults` objects. The information \
                 included in the returned object is the assay results, plus the assay name, file information and \
                 assay subject information (if 'with_subject_data' is set to True).
         """
-        if page_size is None:
+        if page_sizer is not None and (page_number is not None or page_size is not None):
+            raise ValueError("'page_sizer' cannot be used together with 'page_number' or 'page_size'.")
+
+        if page_sizer is None and page_size is None:
             print(f"Using the 'page_size' argument for pagination is advised (default page_size={DEFAULT_PAGE_SIZE}).")
 
-        if page_number is None:
+        if page_sizer is None and page_number is None:
             print("Using the 'page_number' argument for pagination is advised (default page_number=1).")
 
         if isinstance(page_size, int) and page_size > 2 * DEFAULT_PAGE_SIZE:
@@ -818,6 +844,7 @@ class TESTClient:
                     as_dataframe=as_dataframe,
                     with_subject_data=with_subject_data,
                     with_units=with_units,
+                    page_sizer=page_sizer,
                 )
                 final_assay_results.append(final_result)
 
@@ -836,6 +863,7 @@ class TESTClient:
         as_dataframe: Optional[bool] = True,
         with_subject_data: Optional[bool] = True,
         with_units: Optional[bool] = False,
+        page_sizer: Optional[AdaptivePageSize] = None,
     ) -> IAssayResults:
         """Calls Teselagen TEST API endpoint: `GET /assays/:assayId/results?fileId=file_id`.
 
@@ -857,6 +885,8 @@ class TESTClient:
             with_subject_data (Optional[bool]): Flag indicating whether to return the assay results together with a \
                 more complete information on the assay subjects (default=True).
 
+            page_sizer (Optional[AdaptivePageSize]): If set, all the pages of results are fetched, with adaptive page \
+                sizes (default=None).
 
         Returns:
             IAssayResults: A IAssayResults object. The information included in the returned object is the assay \
@@ -865,12 +895,19 @@ class TESTClient:
         """
         try:
             # NOTE: depending on the different flags, the order of the columns may vary.
-            api_result = self._get_assay_file_results_from_api(
-                assay_id=assay_id,
-                file_id=file_id,
-                page_number=page_number,
-                page_size=page_size,
-            )
+            if page_sizer is not None:
+                api_result = self._get_all_assay_file_results_from_api(
+                    assay_id=assay_id,
+                    file_id=file_id,
+                    page_sizer=page_sizer,
+                )
+            else:
+                api_result = self._get_assay_file_results_from_api(
+                    assay_id=assay_id,
+                    file_id=file_id,
+                    page_number=page_number,
+                    page_size=page_size,
+                )
             assay_name = api_result['name']
             assay_results = api_result['results']
 
@@ -879,18 +916,22 @@ class TESTClient:
                     f'Error getting assay results from assay with ID={assay_id}. Make sure assay has imported data files.'
                 )
 
-            tabular_assay_results, assay_result_indexes = self._tabular_format_assay_result_data(
-                assay_results,
-                with_units,
-            )
+            with span('TESTClient.format_assay_results', attributes={'rows': len(assay_results)}):
+                tabular_assay_results, assay_result_indexes = self._tabular_format_assay_result_data(
+                    assay_results,
+                    with_units,
+                )
 
             if as_dataframe:
-                final_results = pd.DataFrame(tabular_assay_results).set_index(assay_result_indexes[0])
-                # final_results.insert(0, "Assay", assay_name) // This column is redundant
-                # If required, group by the assay results and assay subject indexes.
-                # Usually these indexes are going to be the assay subject id and any
-                # reference dimension found in the assay results.
-                final_results = final_results.groupby(by=[*assay_result_indexes]).first().reset_index()
+                import pandas as pd
+
+                with span('TESTClient.group_assay_results'):
+                    final_results = pd.DataFrame(tabular_assay_results).set_index(assay_result_indexes[0])
+                    # final_results.insert(0, "Assay", assay_name) // This column is redundant
+                    # If required, group by the assay results and assay subject indexes.
+                    # Usually these indexes are going to be the assay subject id and any
+                    # reference dimension found in the assay results.
+                    final_results = final_results.groupby(by=[*assay_result_indexes]).first().reset_index()
 
                 if with_subject_data:
                     assaySubjectIds = list({assay_result['assaySubjectId'] for assay_result in assay_results})
@@ -901,17 +942,19 @@ class TESTClient:
                         summarized=False,
                     )
 
-                    tabular_assay_subjects, assay_subject_indexes = self._tabular_format_assay_subject_data(
-                        assay_subjects)
+                    with span('TESTClient.format_assay_subjects', attributes={'rows': len(assay_subjects)}):
+                        tabular_assay_subjects, assay_subject_indexes = self._tabular_format_assay_subject_data(
+                            assay_subjects)
 
-                    assay_subjects_df = pd.DataFrame(tabular_assay_subjects).set_index(assay_subject_indexes)
+                        assay_subjects_df = pd.DataFrame(tabular_assay_subjects).set_index(assay_subject_indexes)
 
                     # Here we merge both dataframes.
-                    final_results = assay_subjects_df.merge(
-                        final_results,
-                        left_on=assay_subject_indexes,
-                        right_on=assay_subject_indexes,
-                    )
+                    with span('TESTClient.merge_assay_results'):
+                        final_results = assay_subjects_df.merge(
+                            final_results,
+                            left_on=assay_subject_indexes,
+                            right_on=assay_subject_indexes,
+                        )
 
             elif with_subject_data:
                 assaySubjectIds = list({assay_result['assaySubjectId'] for assay_result in assay_results})
@@ -921,7 +964,9 @@ class TESTClient:
                     assay_subject_ids=assaySubjectIds,
                     summarized=False,
                 )
-                tabular_assay_subjects, assay_subject_indexes = self._tabular_format_assay_subject_data(assay_subjects)
+                with span('TESTClient.format_assay_subjects', attributes={'rows': len(assay_subjects)}):
+                    tabular_assay_subjects, assay_subject_indexes = self._tabular_format_assay_subject_data(
+                        assay_subjects)
 
                 final_results = [{
                     **{
@@ -971,8 +1016,10 @@ class TESTClient:
                 url=url,
                 headers=self.headers,
                 params=params,
+                session=self.http_session,
+                parse_json=True,
             )
-            api_result = json.loads(response['content'])
+            api_result = response['content']
 
         except Exception as e:
             print(e)
@@ -982,6 +1029,30 @@ class TESTClient:
 
         return api_result
 
+    def _get_all_assay_file_results_from_api(
+        self,
+        assay_id: str,
+        file_id: str,
+        page_sizer: AdaptivePageSize,
+    ) -> Dict[str, Any]:
+        """Returns all the pages of results of an assay file, with page sizes adapted by `page_sizer`."""
+        api_result: Dict[str, Any] = {'name': None, 'results': []}
+
+        def get_page(page_number: int, page_size: int) -> List[Dict[str, Any]]:
+            page = self._get_assay_file_results_from_api(
+                assay_id=assay_id,
+                file_id=file_id,
+                page_number=page_number,
+                page_size=page_size,
+            )
+            api_result['name'] = page['name']
+            return page['results']
+
+        for results in iter_pages(get_page, page_sizer=page_sizer):
+            api_result['results'].extend(results)
+
+        return api_result
+
     # File Endpoints
 
     def get_files_info(
@@ -1021,9 +1092,11 @@ class TESTClient:
             url=self.get_files_info_url,
             headers=self.headers,
             params=params,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        results: List[Dict[str, Any]] = json.loads(response['content'])
+        results: List[Dict[str, Any]] = response['content']
 
         if file_id is not None:
             results = list(filter(lambda x: x['id'] == file_id, results))
@@ -1067,8 +1140,10 @@ class TESTClient:
             url=upload_file_url,
             headers=headers,
             files=multipart_form_data,
+            session=self.http_session,
+            parse_json=True,
         )
-        res_files_info = json.loads(response['content'])
+        res_files_info = response['content']
 
         if not isinstance(res_files_info, dict):
             raise OSError(f'There was a problem with upload (maybe check assay_id): response: {response}')
@@ -1102,6 +1177,7 @@ class TESTClient:
         response = get(
             url=self.get_file_data_url.format(file_id),
             headers=self.headers,
+            session=self.http_session,
         )
 
         return StringIO(response['content'])
@@ -1114,9 +1190,11 @@ class TESTClient:
         response = delete(
             url=self.delete_file_url.format(file_id),
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        return json.loads(response['content'])
+        return response['content']
 
     # Metadata Endpoints
 
@@ -1151,10 +1229,10 @@ class TESTClient:
         response = get(
             url=self.get_metadata_url.format(metadataType),
             headers=self.headers,
+            session=self.http_session,
+            parse_json=True,
         )
 
-        response['content'] = json.loads(response['content'])
-
         return response['content']
 
     def create_metadata(
@@ -1179,11 +1257,15 @@ class TESTClient:
             },
         }
 
-        response = post(url=self.create_metadata_url, headers=self.headers, json=body)
+        response = post(
+            url=self.create_metadata_url,
+            headers=self.headers,
+            json=body,
+            session=self.http_session,
+            parse_json=True,
+        )
 
         # [{ id: '3' }]
-        response['content'] = json.loads(response['content'])
-
         return response['content']
 
     def delete_metadata(
@@ -1197,6 +1279,7 @@ class TESTClient:
                 metadataId,
             ),
             headers=self.headers,
+            session=self.http_session,
         )
 
         # response["content"] = json.loads(response["content"])
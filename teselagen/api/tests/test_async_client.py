@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Test the Asyncio TeselaGen Client."""
+
+from __future__ import annotations
+
+import asyncio
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import inspect
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+import requests_mock
+
+from teselagen.api import AsyncTeselaGenClient
+from teselagen.api import TeselaGenClient
+from teselagen.utils.cache import ResponseCache
+from teselagen.utils.governor import ConcurrencyGovernor
+from teselagen.utils.hedging import HedgingPolicy
+from teselagen.utils.metrics import MetricsRegistry
+from teselagen.utils.utils import wait_for_status
+
+if TYPE_CHECKING:
+    from typing import Any, List, Set
+
+HOST_URL: str = 'https://tg.example.com'
+
+
+class TestAsyncTeselaGenClient:
+    """Tests for the Asyncio TeselaGen Client (no live server needed)."""
+
+    def test_methods_are_coroutine_functions(self) -> None:
+        client = AsyncTeselaGenClient(host_url=HOST_URL)
+
+        for method in (
+                client.get_laboratories,
+                client.design.get_designs,
+                client.build.get_aliquots,
+                client.test.get_assays,
+                client.discover.get_model_info,
+        ):
+            assert inspect.iscoroutinefunction(method)
+
+        assert inspect.isasyncgenfunction(client.build.iter_aliquots)
+
+        # Non callable attributes are returned as they are
+        assert client.test.get_assays_url == client.client.test.get_assays_url
+        assert client.headers is client.client.headers
+
+    def test_invalid_max_concurrency(self) -> None:
+        with pytest.raises(ValueError, match='max_concurrency'):
+            AsyncTeselaGenClient(host_url=HOST_URL, max_concurrency=0)
+
+    @pytest.mark.parametrize(('max_concurrency', 'number_of_calls'), [(4, 12), (100, 120)])
+    def test_concurrency_is_bounded(self, max_concurrency: int, number_of_calls: int) -> None:
+        """Requests are in flight at the same time, up to `max_concurrency`, without a thread per request."""
+        lock = threading.Lock()
+        in_flight: int = 0
+        max_in_flight: int = 0
+        client_threads: Set[str] = set()
+
+        class SlowHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self) -> None:  # noqa: N802
+                nonlocal in_flight, max_in_flight
+                with lock:
+                    in_flight += 1
+                    max_in_flight = max(max_in_flight, in_flight)
+                    client_threads.update(thread.name for thread in threading.enumerate()
+                                          if 'process_request_thread' not in thread.name)
+                time.sleep(0.2)
+                with lock:
+                    in_flight -= 1
+                body = b'TeselaGen API is operational.'
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        async def main(host_url: str) -> List[str]:
+            async with AsyncTeselaGenClient(host_url=host_url, max_concurrency=max_concurrency) as client:
+                return await asyncio.gather(*(client.get_server_status() for _ in range(number_of_calls)))
+
+        class Server(ThreadingHTTPServer):
+            daemon_threads = True
+            # Accepts all the connections opened at once.
+            request_queue_size = number_of_calls
+
+        threads_before: Set[str] = {thread.name for thread in threading.enumerate()}
+        server = Server(('127.0.0.1', 0), SlowHandler)
+        server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server_thread.start()
+        try:
+            results = asyncio.run(main(f'http://127.0.0.1:{server.server_address[1]}'))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert results == ['TeselaGen API is operational.'] * number_of_calls
+        assert max_in_flight == max_concurrency
+        # The calls run on the thread of the event loop.
+        assert client_threads <= threads_before | {server_thread.name}
+
+    def test_session_components(self) -> None:
+        """Metrics and caches are forwarded to the client, and components blocking the event loop are rejected."""
+        metrics = MetricsRegistry()
+        client = AsyncTeselaGenClient(host_url=HOST_URL, metrics=metrics, cache=ResponseCache())
+        assert client.metrics is metrics and client.http_session.cache is client.cache is not None
+
+        with pytest.raises(ValueError, match='governor'):
+            AsyncTeselaGenClient(teselagen_client=TeselaGenClient(host_url=HOST_URL, governor=ConcurrencyGovernor()))
+        with pytest.raises(ValueError, match='hedging'):
+            AsyncTeselaGenClient(teselagen_client=TeselaGenClient(host_url=HOST_URL, hedging=HedgingPolicy()))
+        with pytest.raises(ValueError, match='cannot be given with teselagen_client'):
+            AsyncTeselaGenClient(teselagen_client=TeselaGenClient(host_url=HOST_URL), metrics=metrics)
+
+    def test_waits_do_not_block_the_event_loop(self) -> None:
+        """Polling waits of the calls let the event loop run the other calls."""
+        polls: List[str] = []
+
+        def poll(name: str) -> str:
+            polls.append(name)
+            return 'done' if polls.count(name) == 3 else 'pending'
+
+        def wait(name: str) -> str:
+            return wait_for_status(method=poll, validate=lambda status: status == 'done', fixed_wait_time=0.05,
+                                   name=name)
+
+        async def main() -> List[str]:
+            async with AsyncTeselaGenClient(host_url=HOST_URL) as client:
+                return await asyncio.gather(client._run(wait, 'a'), client._run(wait, 'b'))
+
+        assert asyncio.run(main()) == ['done', 'done']
+        assert polls == ['a', 'b'] * 3
+
+    def test_requests_go_through_the_shared_session(self) -> None:
+
+        async def main() -> str:
+            async with AsyncTeselaGenClient(host_url=HOST_URL) as client:
+                with requests_mock.Mocker(session=client.http_session) as mocker:
+                    mocker.get(client.status_url, text='TeselaGen API is operational.')
+                    return await client.get_server_status()
+
+        assert asyncio.run(main()) == 'TeselaGen API is operational.'
+
+    def test_laboratory_views(self) -> None:
+
+        async def main() -> List[str]:
+            async with AsyncTeselaGenClient(host_url=HOST_URL) as client:
+                with requests_mock.Mocker(session=client.http_session) as mocker:
+                    mocker.get(client.test.get_assays_url,
+                               json=lambda request, context: [{'id': request.headers['tg-active-lab-id']}])
+                    views = [await client.for_laboratory(lab_id=lab_id) for lab_id in (1, 2, 3)]
+                    assays = await asyncio.gather(*(view.test.get_assays() for view in views))
+                    assert all(view.http_session is client.http_session for view in views)
+            return [assay[0]['id'] for assay in assays]
+
+        assert asyncio.run(main()) == ['1', '2', '3']
+
+    def test_generator_methods(self) -> None:
+
+        async def main() -> List[str]:
+            async with AsyncTeselaGenClient(host_url=HOST_URL) as client:
+                with requests_mock.Mocker(session=client.http_session) as mocker:
+                    mocker.get(client.build.aliquots_url,
+                               json=lambda request, context: [{'id': n} for n in request.qs['pagenumber'] if n != '3'])
+                    return [aliquot['id'] async for aliquot in client.build.iter_aliquots()]
+
+        assert asyncio.run(main()) == ['1', '2']
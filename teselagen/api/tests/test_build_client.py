@@ -6,30 +6,51 @@
 from __future__ import annotations
 
 import collections.abc
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import nullcontext as does_not_raise
 import inspect
 import json
 import operator
+import threading
+import time
 import types
 from typing import TYPE_CHECKING
+from urllib.parse import quote_plus
+import warnings
 
 import pytest
+import requests
+from tenacity.stop import stop_after_attempt
+from tenacity.wait import wait_none
 
+from teselagen.api.build_client import _chunk_ids
+from teselagen.api.build_client import _id_filter
 from teselagen.api.build_client import get_documents
+from teselagen.api.build_client import BUILDClient
 from teselagen.api.build_client import get_record
+from teselagen.api.build_client import RecordIndex
+from teselagen.api.build_client_models import ALIQUOT_COLUMNS
+from teselagen.api.build_client_models import AliquotNotFoundError
 from teselagen.api.build_client_models import AliquotRecord
 from teselagen.api.build_client_models import SampleRecord
+from teselagen.utils.columnar import arrow_schema
+from teselagen.utils.fake_server import FakeServerConfig
+from teselagen.utils.paging import AdaptivePageSize
+from teselagen.utils.sync import InventoryMirror
 
 if TYPE_CHECKING:
+    from pathlib import Path
     from typing import Any, Callable, ContextManager, Dict, List, Mapping, TypeVar, Union
     import typing
 
-    from teselagen.api import BUILDClient  # pylint: disable=unused-import
     from teselagen.api import TeselaGenClient
     from teselagen.api.build_client import Page
     from teselagen.api.build_client import PageNumber
     from teselagen.api.build_client import Record
     from teselagen.api.build_client import RecordID
+    from teselagen.utils.fake_server import FakeTeselaGenServer
+
+    FakeTeselaGenClient = Callable[..., typing.Tuple[FakeTeselaGenServer, TeselaGenClient]]
 
     T = TypeVar('T', bound=Mapping[str, Any])
 
@@ -177,6 +198,85 @@ def test_get_record(
         assert comparison_fn(record, expected_record), 'Record is not as expected.'
 
 
+@pytest.mark.timeout(timeout=5)
+def test_get_record_stops_at_first_match_and_indexes_records() -> None:
+    """`get_record` should stop requesting pages once the record is found, and answer later lookups from the index."""
+    requested_page_numbers: List[int] = []
+
+    def get_records(page_number: PageNumber) -> List[Record]:
+        requested_page_numbers.append(int(page_number))
+        last_id: int = 2 * int(page_number)
+        return [{'id': str(last_id - 1)}, {'id': str(last_id)}] if int(page_number) <= 50 else []
+
+    index: Dict[str, Record] = {}
+
+    with pytest.warns(UserWarning, match='fallback to bruteforce'):
+        assert get_record(get_records=get_records, record_id='4', index=index) == {'id': '4'}
+    assert requested_page_numbers == [1, 2], 'Pages after the match should not be requested.'
+    assert set(index) == {'1', '2', '3', '4'}
+
+    requested_page_numbers.clear()
+    assert get_record(get_records=get_records, record_id=3, index=index) == {'id': '3'}
+    assert not requested_page_numbers, 'Indexed records should be returned without requests.'
+
+    with pytest.warns(UserWarning, match='fallback to bruteforce'):
+        assert get_record(get_records=get_records, record_id='60', prefetch=4, index=index) == {'id': '60'}
+    assert max(requested_page_numbers) < 30 + 4
+
+
+def test_record_index() -> None:
+    """The index keeps the most recently used records."""
+    index = RecordIndex(maxsize=2)
+    index.update({'1': {'id': '1'}, '2': {'id': '2'}})
+    assert index['1'] == {'id': '1'}
+    index['3'] = {'id': '3'}
+    assert list(index) == ['1', '3'], 'The least recently used record should be evicted.'
+    index.clear()
+    assert len(index) == 0 and index.get('1') is None
+
+    with pytest.raises(ValueError, match='maxsize'):
+        RecordIndex(maxsize=0)
+
+
+def test_get_aliquot_fallback(monkeypatch: pytest.MonkeyPatch, fake_teselagen_client: FakeTeselaGenClient) -> None:
+    """Aliquots are looked up in the pages of aliquots only if their endpoint is not allowed or keeps failing."""
+    server, client = fake_teselagen_client(FakeServerConfig(num_aliquots=250))
+    monkeypatch.setattr(BUILDClient._get_single_record.retry, 'wait', wait_none())
+    monkeypatch.setattr(BUILDClient._get_single_record.retry, 'stop', stop_after_attempt(3))
+
+    assert client.build.get_aliquot(7)['id'] == '7'
+    with pytest.raises(AliquotNotFoundError):
+        client.build.get_aliquot(999)
+    assert server.stats()['requests'] == {'GET aliquots/{}': 2}, 'Missing aliquots should not be looked up.'
+
+    for status_code, expected_requests in [(405, 1), (500, 3)]:
+        monkeypatch.setitem(server._routes, ('GET', 'aliquots/{}'), lambda status_code=status_code, **_: (
+            status_code, {'error': 'Failure'}))
+        server.reset_stats()
+        client.build.clear_lookup_indexes()
+        with pytest.warns(UserWarning, match='fallback to bruteforce'):
+            assert client.build.get_aliquot('120')['id'] == '120'
+        assert server.stats()['requests']['GET aliquots/{}'] == expected_requests
+        assert server.stats()['requests']['GET aliquots'] >= 2
+
+    server.reset_stats()
+    assert client.build.get_aliquot('101')['id'] == '101'
+    assert server.stats()['requests'] == {}, 'Aliquots found by lookups should be returned without requests.'
+
+    monkeypatch.setitem(server._routes, ('GET', 'aliquots/{}'), lambda **_: (401, 'unauthorized'))
+    client.build.clear_lookup_indexes()
+    # Rejected requests and connection errors should be raised right away (the lookups warn).
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        with pytest.raises(requests.HTTPError, match='unauthorized'):
+            client.build.get_aliquot('120')
+
+        server.stop()
+        client.http_session.close()  # drops the kept-alive connections
+        with pytest.raises(requests.ConnectionError):
+            client.build.get_aliquot('120')
+
+
 @pytest.mark.parametrize(
     ('document_id', 'expected_documents', 'expectation', 'comparison_fn'),
     [
@@ -245,6 +345,172 @@ def test_get_documents(
         assert comparison_fn(documents, expected_documents), 'Documents are not as expected.'
 
 
+@pytest.mark.timeout(timeout=5)
+def test_get_documents_with_prefetch() -> None:
+    """Prefetched pages should be yielded in order, without requesting pages far beyond the exhausted page, and \
+    pending requests should be cancelled when the generator is closed."""
+    requested_page_numbers: List[int] = []
+    lock = threading.Lock()
+
+    def get_page(page_number: PageNumber) -> Page[Record]:
+        with lock:
+            requested_page_numbers.append(int(page_number))
+        time.sleep(0.01 * (int(page_number) % 3))  # pages complete out of order
+        return [{'id': str(page_number)}] if int(page_number) <= 20 else []
+
+    serial_documents = list(get_documents(get_page=get_page, start_page_number=1))
+    requested_page_numbers.clear()
+    prefetched_documents = list(get_documents(get_page=get_page, start_page_number=1, prefetch=4))
+
+    assert prefetched_documents == serial_documents == [{'id': str(i)} for i in range(1, 21)]
+    assert max(requested_page_numbers) < 21 + 4, 'Pages should not be requested far beyond the exhausted page.'
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        requested_page_numbers.clear()
+        documents_generator = get_documents(get_page=get_page, start_page_number=1, prefetch=8, executor=executor)
+        assert next(documents_generator) == {'id': '1'}
+        documents_generator.close()
+    assert len(requested_page_numbers) < 8, 'Pending requests should be cancelled when the generator is closed.'
+
+
+@pytest.mark.parametrize(
+    ('ids', 'chunk_size', 'max_filter_length', 'expected_chunks'),
+    [
+        pytest.param([], 3, 2000, [], id='no_ids'),
+        pytest.param(['1', '2', '3', '4'], 3, 2000, [['1', '2', '3'], ['4']], id='chunk_size'),
+        pytest.param(['1' * 10, '2' * 10, '3' * 10], 100, 70, [['1' * 10, '2' * 10], ['3' * 10]], id='filter_length'),
+        pytest.param(['1' * 100, '2'], 100, 70, [['1' * 100], ['2']], id='long_id'),
+    ],
+)
+def test_chunk_ids(
+    ids: List[str],
+    chunk_size: int,
+    max_filter_length: int,
+    expected_chunks: List[List[str]],
+) -> None:
+    """Chunks of ids should be bounded in size and in URL-encoded filter length."""
+    chunks = list(_chunk_ids(ids, chunk_size=chunk_size, max_filter_length=max_filter_length))
+
+    assert chunks == expected_chunks
+    assert all(len(quote_plus(_id_filter(chunk))) <= max_filter_length for chunk in chunks if len(chunk) > 1)
+
+
+def test_iterators_stream_all_pages(fake_teselagen_client: FakeTeselaGenClient) -> None:
+    """BUILD iterators yield the records of all the pages, filtered, up to a limit, requesting pages lazily."""
+    server, client = fake_teselagen_client(FakeServerConfig(num_aliquots=250, num_samples=30, num_plates=0))
+
+    aliquots = client.build.iter_aliquots(pageSize=100)
+    assert next(aliquots)['id'] == '1'
+    assert server.stats()['requests'] == {'GET aliquots': 1}
+    assert [aliquot['id'] for aliquot in aliquots] == [str(i) for i in range(2, 251)]
+    assert server.stats()['requests'] == {'GET aliquots': 4}
+
+    server.reset_stats()
+    assert len(list(client.build.iter_aliquots(limit=30, prefetch=2))) == 30
+    assert server.stats()['requests']['GET aliquots'] <= 2
+
+    gql_filter = json.dumps({'id': ['3', '12', '29']})
+    assert [sample['id'] for sample in client.build.iter_samples(pageSize=2, gqlFilter=gql_filter)] == \
+        ['3', '12', '29']
+    assert list(client.build.iter_plates()) == []
+
+
+def test_get_records_by_ids(fake_teselagen_client: FakeTeselaGenClient) -> None:
+    """Records are fetched by chunks of ids, and returned in the order of the ids, with the missing ids."""
+    server, client = fake_teselagen_client(FakeServerConfig(num_aliquots=250, num_samples=30))
+
+    aliquot_ids = [240, '7', 999, 120, '7', 1]
+    aliquots = client.build.get_aliquots_by_ids(aliquot_ids, chunk_size=2)
+    assert [aliquot['id'] for aliquot in aliquots['records']] == ['240', '7', '120', '1']
+    assert aliquots['missing_ids'] == ['999']
+    assert server.stats()['requests'] == {'GET aliquots': 3}
+
+    samples = client.build.get_samples_by_ids([str(i) for i in range(30, 0, -1)] + ['31'])
+    assert [sample['id'] for sample in samples['records']] == [str(i) for i in range(30, 0, -1)]
+    assert samples['missing_ids'] == ['31']
+    assert client.build.get_samples_by_ids([]) == {'records': [], 'missing_ids': []}
+
+
+def test_adaptive_paging(fake_teselagen_client: FakeTeselaGenClient) -> None:
+    """BUILD collections can be fetched with adaptive page sizes, which cannot be prefetched."""
+    server, client = fake_teselagen_client(FakeServerConfig(num_aliquots=3000, max_page_size=1000))
+
+    aliquots = list(client.build.iter_aliquots(page_sizer=AdaptivePageSize()))
+    assert [aliquot['id'] for aliquot in aliquots] == [str(i) for i in range(1, 3001)]
+    assert server.stats()['requests']['GET aliquots'] < 3000 // 100
+
+    with pytest.raises(ValueError, match='prefetch'):
+        next(client.build.iter_samples(page_sizer=AdaptivePageSize(), prefetch=2))
+
+
+def test_sync_inventory(tmp_path: Path, fake_teselagen_client: FakeTeselaGenClient) -> None:
+    """Syncs fetch the records updated since the high-water mark, and full syncs drop the deleted records."""
+    server, client = fake_teselagen_client(FakeServerConfig(num_aliquots=250, num_samples=30, num_plates=0))
+    mirror = InventoryMirror(path=tmp_path / 'inventory.sqlite')
+    host = server.host_url
+    server.update_record('aliquots', 1, updated_at='2025-01-01T00:00:00.000Z')
+
+    results = client.build.sync_inventory(mirror)
+    assert [(result['full'], result['fetched']) for result in results.values()] == [(True, 250), (True, 30), (True, 0)]
+    assert mirror.count('aliquots', host=host) == 250 and mirror.count('samples', host=host) == 30
+
+    server.update_record('aliquots', 42, updated_at='2030-01-01T00:00:00.000Z')
+    server.update_record('aliquots', 7, updated_at='2030-01-02T00:00:00.000Z')
+    server.reset_stats()
+    results = client.build.sync_inventory(mirror, collections=['aliquots'])
+    # The updated records, and the record at the previous high-water mark (within the overlap).
+    assert results['aliquots']['full'] is False and results['aliquots']['fetched'] == 3
+    assert results['aliquots']['high_water_mark'] == '2030-01-02T00:00:00.000Z'
+    assert server.stats()['requests'] == {'GET aliquots': 1}
+    assert mirror.get('aliquots', 42, host=host)['updatedAt'] == '2030-01-01T00:00:00.000Z'
+
+    server.delete_record('aliquots', 42)
+    assert client.build.sync_inventory(mirror, collections=['aliquots'])['aliquots']['deleted'] == 0
+    results = client.build.sync_inventory(mirror, collections=['aliquots'], full=True)
+    assert results['aliquots']['deleted'] == 1 and mirror.get('aliquots', 42, host=host) is None
+    assert mirror.count('aliquots', host=host) == 249
+    mirror.close()
+
+
+def test_expand_plates(fake_teselagen_client: FakeTeselaGenClient) -> None:
+    """Plates are expanded into a DataFrame with a row per well, fetching plate records concurrently."""
+    server, client = fake_teselagen_client(FakeServerConfig(num_plates=3, wells_per_plate=24))
+
+    wells = client.build.expand_plates(plate_ids=['2', '1', '2'], max_workers=4)
+    assert list(wells.index.names) == ['plate_id', 'well'] and len(wells) == 48
+    assert wells.index[:2].tolist() == [('2', 'A1'), ('2', 'A2')] and wells.index[-1] == ('1', 'B12')
+    assert wells.loc[('1', 'B1'), 'aliquot_id'] == '13'
+    assert wells.loc[('1', 'B1'), 'material_name'] is not None
+    assert server.stats()['requests'] == {'GET plates/{}': 2}
+
+    server.reset_stats()
+    rows = client.build.expand_plates(as_dataframe=False)
+    assert len(rows) == 72 and rows[0]['plate_id'] == '1'
+    assert 'GET plates/{}' not in server.stats()['requests']
+    assert client.build.expand_plates(plate_ids=[]).empty
+
+
+@pytest.mark.parametrize('file_format', ['parquet', 'feather'])
+def test_export_records(tmp_path: Path, file_format: str, fake_teselagen_client: FakeTeselaGenClient) -> None:
+    """Collections are exported page by page to Parquet or Feather files, with the columns of their records."""
+    pytest.importorskip('pyarrow')
+    pq = pytest.importorskip('pyarrow.parquet')
+    feather = pytest.importorskip('pyarrow.feather')
+    server, client = fake_teselagen_client(FakeServerConfig(num_aliquots=250, num_plates=3))
+
+    path = tmp_path / f'aliquots.{file_format}'
+    assert client.build.export_records('aliquots', path, file_format=file_format, batch_size=100) == 250
+    table = pq.read_table(path) if file_format == 'parquet' else feather.read_table(path)
+    assert table.schema == arrow_schema(ALIQUOT_COLUMNS) and table.num_rows == 250
+    assert table.column('id').to_pylist() == [str(i) for i in range(1, 251)]
+    assert table.column('material_name').null_count == 0
+    # The pages of the records, and the empty page after them.
+    assert server.stats()['requests'] == {'GET aliquots': 4}
+
+    path = tmp_path / f'plates.{file_format}'
+    assert client.build.export_records('plates', path, file_format=file_format) == 3
+
+
 class TestBUILDClient:
     """Tests for the BUILD Client."""
 
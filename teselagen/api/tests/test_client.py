@@ -5,13 +5,24 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+import json
+import multiprocessing
 from pathlib import Path
+import pickle
+import threading
+import time
 from typing import TYPE_CHECKING
 from unittest.mock import patch
 from urllib.parse import urljoin
 
 import pytest
+import requests
+import requests_mock
 
 from teselagen.api import TeselaGenClient
 from teselagen.api.client import DEFAULT_API_TOKEN_NAME
@@ -21,9 +32,18 @@ from teselagen.utils import delete_session_file
 from teselagen.utils import get_credentials_path
 from teselagen.utils import get_session_path
 from teselagen.utils import get_default_host_name
+from teselagen.utils import utils
+from teselagen.utils.cache import ResponseCache
+from teselagen.utils.disk_cache import PersistentCache
+from teselagen.utils.fake_server import FakeTeselaGenServer
+from teselagen.utils.hedging import HedgingPolicy
+from teselagen.utils.utils import parse_duration
 
 if TYPE_CHECKING:
-    from typing import Any, Dict, List, Literal
+    from typing import Any, Callable, Dict, List, Literal
+    import typing
+
+    FakeTeselaGenClient = Callable[..., typing.Tuple[FakeTeselaGenServer, TeselaGenClient]]
 
 MODULES_TO_BE_TESTED: List[Literal['design', 'build', 'test', 'evolve']] = [
     'design',
@@ -32,6 +52,152 @@ MODULES_TO_BE_TESTED: List[Literal['design', 'build', 'test', 'evolve']] = [
 ]
 
 
+def test_stored_session_is_restored_without_requests(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A stored token is trusted until it expires, rejected tokens are dropped on their first use, and tokens \
+    close to their expiration date are replaced in the background."""
+    session_path = tmp_path / '.session'
+    monkeypatch.setattr(utils, 'get_session_path', lambda: session_path)
+    monkeypatch.setattr(utils, 'get_credentials_path', lambda: tmp_path / '.credentials')
+    assert parse_duration('1w') == timedelta(days=7)
+
+    def store_session(host_url: str, token: str, expires_in: timedelta, **session):
+        expiration_date = datetime.now(timezone.utc) + expires_in
+        session_path.write_text(json.dumps({'host_url': host_url, 'token': token,
+                                            'expiration_date': expiration_date.isoformat(), **session}))
+
+    with FakeTeselaGenServer() as server:
+        TeselaGenClient(host_url=server.host_url).login(username='user', password='password', expiration_time='1d')
+        stored_session = json.loads(session_path.read_text())
+        assert stored_session['token'].startswith('fake-token') and stored_session['expiration_time'] == '1d'
+        assert list(tmp_path.iterdir()) == [session_path], 'The session file should be written atomically.'
+        expires_in = utils.parse_datetime(stored_session['expiration_date']) - datetime.now(timezone.utc)
+        assert timedelta(hours=23) < expires_in <= timedelta(days=1)
+
+        server.reset_stats()
+        client = TeselaGenClient(host_url=server.host_url)
+        client.login()
+        assert client.auth_token == stored_session['token']
+        assert server.stats()['requests'] == {}
+        assert len(client.build.get_aliquots(pageSize=5)) == 5
+        assert client.http_session.hooks['response'] == []
+
+        store_session(server.host_url, token='rejected-token', expires_in=timedelta(days=1))
+        client = TeselaGenClient(host_url=server.host_url)
+        client.login()
+        with pytest.raises(Exception, match='unauthorized'):
+            client.get_laboratories()
+        assert client.auth_token is None
+        assert not session_path.exists()
+
+        store_session(server.host_url, token=stored_session['token'], expires_in=timedelta(hours=1))
+        (tmp_path / '.credentials').write_text(json.dumps({'username': 'user', 'password': 'password',
+                                                           'host_url': server.host_url}))
+        client = TeselaGenClient(host_url=server.host_url)
+        client.login()
+        client._token_refresh_thread.join(timeout=10)
+        assert client.auth_token not in (None, stored_session['token'])
+        assert client.token_expiration_date - datetime.now(timezone.utc) > timedelta(days=6)
+        assert json.loads(session_path.read_text())['token'] == client.auth_token
+
+        # Tokens are refreshed with the expiration time requested at login.
+        store_session(server.host_url, token=stored_session['token'], expires_in=timedelta(hours=1),
+                      expiration_time='2d')
+        client = TeselaGenClient(host_url=server.host_url)
+        client.login()
+        client._token_refresh_thread.join(timeout=10)
+        expires_in = client.token_expiration_date - datetime.now(timezone.utc)
+        assert timedelta(days=1, hours=23) < expires_in <= timedelta(days=2)
+        assert json.loads(session_path.read_text())['expiration_time'] == '2d'
+
+
+def test_restored_token_is_validated_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Concurrent responses to requests authenticated with a restored token validate it once, without errors."""
+    deleted_sessions = []
+    monkeypatch.setattr('teselagen.api.client.delete_session_file', lambda: deleted_sessions.append(True))
+    client = TeselaGenClient(host_url='https://tg.example.com')
+    client.update_token(token='restored-token', save_to_storage=False)
+    client.http_session.hooks['response'].append(client._validate_restored_token)
+    n_workers = 8
+    barrier = threading.Barrier(n_workers)
+
+    def rejected_response(_):
+        response = requests.Response()
+        response.status_code = 401
+        response.request = requests.Request('GET', client.labs_url,
+                                            headers={client.api_token_name: 'restored-token'}).prepare()
+        barrier.wait()
+        return client._validate_restored_token(response)
+
+    for _ in range(20):
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            assert len(list(executor.map(rejected_response, range(n_workers)))) == n_workers
+        assert client.auth_token is None and client.http_session.hooks['response'] == []
+        assert deleted_sessions == [True]
+        deleted_sessions.clear()
+        client.update_token(token='restored-token', save_to_storage=False)
+        client.http_session.hooks['response'].append(client._validate_restored_token)
+
+
+def test_laboratory_views_are_independent() -> None:
+    """Views of different laboratories share the session and token of the client, and can be used concurrently."""
+    client = TeselaGenClient(host_url='https://tg.test')
+    client.update_token(token='token', save_to_storage=False)
+    lab_ids = list(range(1, 9))
+
+    def echo_laboratory(request, context):
+        time.sleep(0.01)
+        return [{'id': request.headers.get(client.TESELAGEN_ACTIVE_LAB_IDENTIFIER, 'common')}]
+
+    def get_assays(lab_id: int):
+        return client.for_laboratory(lab_id=lab_id).test.get_assays()
+
+    with requests_mock.Mocker(session=client.http_session) as mocker:
+        mocker.get(client.test.get_assays_url, json=echo_laboratory)
+        with ThreadPoolExecutor(max_workers=len(lab_ids)) as executor:
+            assays = list(executor.map(get_assays, lab_ids))
+        common_assays = client.for_laboratory(lab_name='Common').test.get_assays()
+
+    assert assays == [[{'id': str(lab_id)}] for lab_id in lab_ids]
+    assert common_assays == [{'id': 'common'}]
+    assert client.TESELAGEN_ACTIVE_LAB_IDENTIFIER not in client.headers
+
+    view = client.for_laboratory(lab_id=3)
+    assert view.http_session is client.http_session and view.test is not client.test
+    client.update_token(token='new-token', save_to_storage=False)
+    assert view.headers[client.api_token_name] == 'new-token'
+    assert view.headers[client.TESELAGEN_ACTIVE_LAB_IDENTIFIER] == '3'
+
+
+def test_client_is_picklable_and_fork_safe(tmp_path: Path, fake_teselagen_client: FakeTeselaGenClient) -> None:
+    """Clients are pickled by reference (no login needed to use them), and forked ones get their own pools."""
+    server, client = fake_teselagen_client(cache=ResponseCache(),
+                                           persistent_cache=PersistentCache(path=tmp_path / 'records.sqlite'),
+                                           hedging=HedgingPolicy())
+    client.select_laboratory(lab_id=1)
+    assert len(client.build.get_aliquots(pageSize=5)) == 5
+
+    server.reset_stats()
+    restored = pickle.loads(pickle.dumps(client))
+    assert restored.headers == client.headers and restored.headers is not client.headers
+    assert restored.cache is restored.http_session.cache and restored.cache.stats()['size'] == 0
+    assert restored.http_session.hedging.max_workers == client.http_session.hedging.max_workers
+    assert len(restored.build.get_aliquots(pageSize=5)) == 5
+    assert server.stats()['requests'] == {'GET aliquots': 1}
+
+    parent_adapter = client.http_session.get_adapter(server.host_url)
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+
+    def in_child():
+        adapter = client.http_session.get_adapter(server.host_url)
+        queue.put((adapter is not parent_adapter, len(client.build.get_aliquots(pageSize=3))))
+
+    process = context.Process(target=in_child)
+    process.start()
+    assert queue.get(timeout=30) == (True, 3)
+    process.join()
+
+
 class TestTeselaGenClient:
     """Tests for the TeselaGen Client."""
 
@@ -121,6 +287,8 @@ class TestTeselaGenClient:
             'labs_url',
             'headers',
             'auth_token',
+            'http_session',
+            'metrics',
         ]
 
         # We check if the client has the required attributes.
@@ -131,6 +299,12 @@ class TestTeselaGenClient:
         assert 'Content-Type' in client.headers.keys()
         assert isinstance(client.headers['Content-Type'], str)
 
+        # All module clients share the parent client pooled session.
+        assert client.design.http_session is client.http_session
+        assert client.build.http_session is client.http_session
+        assert client.test.http_session is client.http_session
+        assert client.discover.http_session is client.http_session
+
     def test_get(
         self,
         host_url: str,
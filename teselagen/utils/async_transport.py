@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Asyncio transport of the HTTP sessions of the teselagen package (used by `AsyncTeselaGenClient`).
+
+The module clients are synchronous: their methods build requests, send them through a `TeselaGenSession` and parse
+the responses. To await them from an event loop without a thread per call, each call runs in a greenlet on the thread
+of the event loop (see `run_in_greenlet`), and the session sends its requests through an `AsyncHTTPAdapter`. Instead
+of blocking on a socket, the adapter suspends the greenlet (see `await_`) until its `httpx.AsyncClient` receives the
+response, so the event loop runs the other calls meanwhile: a single thread keeps hundreds of requests in flight,
+bounded by an `asyncio.Semaphore` of `max_concurrency` permits.
+
+Requests sent outside of those greenlets (e.g. from the worker threads of a prefetching iterator, of `expand_plates`
+or of `get_aliquots_by_ids`, or by a synchronous client sharing the session) are sent by a regular (blocking)
+`HTTPAdapter`. While a call waits for its worker threads, the event loop is blocked, so prefer `asyncio.gather` over
+those thread pools. The waits of `wait_for_status` (see `sleep`) let the event loop run.
+
+`httpx` and `greenlet` are required (install the `async` extra). They (and `asyncio`) are only imported when a call or
+adapter needs them, so importing the synchronous clients does not import them.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import io
+import sys
+import time
+from typing import Literal, TYPE_CHECKING
+import weakref
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+if TYPE_CHECKING:
+    import asyncio
+    from typing import Any, Awaitable, Callable, Optional, Tuple, TypeVar, Union
+
+    import httpx
+
+    T = TypeVar('T')
+
+# CONSTANTS
+DEFAULT_ASYNC_MAX_CONCURRENCY: Literal[100] = 100
+
+# Attribute marking the greenlets started by `run_in_greenlet`.
+_BRIDGE_ATTRIBUTE: str = 'teselagen_bridge'
+
+
+def _import_async_dependencies() -> Tuple[Any, Any]:
+    try:
+        import greenlet
+        import httpx
+    except ImportError as exc:
+        raise ImportError('The asyncio client requires `httpx` and `greenlet` to be installed (the `async` extra)') \
+            from exc
+    return greenlet, httpx
+
+
+def _current_bridge() -> Optional[Any]:
+    """Returns the current greenlet if it was started by `run_in_greenlet`, or None otherwise."""
+    greenlet = sys.modules.get('greenlet')
+    if greenlet is None:
+        # Greenlets are only imported by `run_in_greenlet`: none was started.
+        return None
+    current = greenlet.getcurrent()
+    return current if getattr(current, _BRIDGE_ATTRIBUTE, False) else None
+
+
+def in_greenlet() -> bool:
+    """Whether the caller runs in a call of `run_in_greenlet`, i.e. whether it can use `await_`."""
+    return _current_bridge() is not None
+
+
+async def run_in_greenlet(
+    func: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """Runs a synchronous function on the thread of the running event loop, awaiting the awaitables passed to \
+    `await_` (so the event loop runs other tasks meanwhile), and returns its result.
+
+    The function runs in a copy of the current context (so tracing spans are propagated).
+    """
+    greenlet, _ = _import_async_dependencies()
+    bridge = greenlet.greenlet(func, parent=greenlet.getcurrent())
+    setattr(bridge, _BRIDGE_ATTRIBUTE, True)
+    bridge.gr_context = contextvars.copy_context()
+
+    result: Any = bridge.switch(*args, **kwargs)
+    while not bridge.dead:
+        # The function is waiting for an awaitable (see `await_`).
+        try:
+            value: Any = await result
+        except BaseException:  # pylint: disable=broad-except
+            result = bridge.throw(*sys.exc_info())
+        else:
+            result = bridge.switch(value)
+    return result
+
+
+def await_(awaitable: Awaitable[T]) -> T:
+    """Waits for an awaitable from a function run by `run_in_greenlet`, and returns its result (or raises its \
+    exception). The event loop runs other tasks meanwhile."""
+    bridge = _current_bridge()
+    if bridge is None:
+        raise RuntimeError('await_ can only be called from a function run by run_in_greenlet')
+    return bridge.parent.switch(awaitable)
+
+
+def sleep(seconds: float) -> None:
+    """Same as `time.sleep`, but lets the event loop run meanwhile when called from `run_in_greenlet`."""
+    if in_greenlet():
+        import asyncio
+
+        await_(asyncio.sleep(seconds))
+    else:
+        time.sleep(seconds)
+
+
+def _timeout(timeout: Union[None, float, Tuple[Optional[float], Optional[float]]]) -> httpx.Timeout:
+    """Returns the `httpx` timeout of a `requests` timeout (None, a number of seconds or a (connect, read) tuple)."""
+    _, httpx = _import_async_dependencies()
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+class AsyncHTTPAdapter(BaseAdapter):
+    """Transport adapter sending the requests of a (synchronous) session with an `httpx.AsyncClient`, when they are \
+    sent from `run_in_greenlet`, and with a regular `HTTPAdapter` otherwise.
+
+    Use it from a single event loop: the connections of its `httpx.AsyncClient` belong to the event loop that opened
+    them.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_ASYNC_MAX_CONCURRENCY,
+        fallback: Optional[BaseAdapter] = None,
+    ) -> None:
+        """Initialize the adapter.
+
+        Args:
+            max_concurrency (int): Maximum number of requests in flight at the same time (and of open connections). \
+                Defaults to 100.
+
+            fallback (Optional[BaseAdapter]): Adapter sending the requests sent outside of `run_in_greenlet`. \
+                Defaults to a new `HTTPAdapter`.
+        """
+        super().__init__()
+        if max_concurrency < 1:
+            raise ValueError(f'max_concurrency must be a positive integer, got {max_concurrency}')
+
+        _, httpx = _import_async_dependencies()
+        self.max_concurrency: int = max_concurrency
+        self.fallback: BaseAdapter = fallback if fallback is not None else HTTPAdapter()
+        # NOTE: Like `requests`, there are no timeouts unless they are given with the request.
+        self.client: httpx.AsyncClient = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            timeout=None,
+        )
+        # A semaphore per event loop (they cannot be shared between event loops).
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = \
+            weakref.WeakKeyDictionary()
+
+    def send(  # type: ignore[override]
+        self,
+        request: requests.PreparedRequest,
+        stream: bool = False,
+        timeout: Union[None, float, Tuple[Optional[float], Optional[float]]] = None,
+        verify: Union[bool, str] = True,
+        cert: Optional[Any] = None,
+        proxies: Optional[Any] = None,
+    ) -> requests.Response:
+        """Sends a prepared request, awaiting its response (see `await_`) when it is sent from `run_in_greenlet`.
+
+        NOTE: The TLS verification, certificates and proxies of requests sent from `run_in_greenlet` are those of the \
+            `httpx.AsyncClient`, and their (streamed) bodies are read in full.
+        """
+        if not in_greenlet():
+            return self.fallback.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                      proxies=proxies)
+        return await_(self._send(request, timeout=timeout))
+
+    async def _send(
+        self,
+        request: requests.PreparedRequest,
+        timeout: Union[None, float, Tuple[Optional[float], Optional[float]]] = None,
+    ) -> requests.Response:
+        _, httpx = _import_async_dependencies()
+        body: Any = request.body
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        elif body is not None and hasattr(body, 'read'):
+            body = body.read()
+
+        http_request = self.client.build_request(
+            method=str(request.method),
+            url=str(request.url),
+            headers=dict(request.headers),
+            content=body,
+            timeout=_timeout(timeout),
+        )
+        try:
+            async with self._semaphore():
+                http_response: httpx.Response = await self.client.send(http_request)
+        except httpx.ConnectTimeout as exc:
+            raise requests.exceptions.ConnectTimeout(exc, request=request) from exc
+        except httpx.TimeoutException as exc:
+            raise requests.exceptions.ReadTimeout(exc, request=request) from exc
+        except httpx.TransportError as exc:
+            raise requests.exceptions.ConnectionError(exc, request=request) from exc
+
+        return self._build_response(request, http_response)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        semaphore: Optional[asyncio.Semaphore] = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _build_response(
+        self,
+        request: requests.PreparedRequest,
+        http_response: httpx.Response,
+    ) -> requests.Response:
+        """Returns the `requests` response of an (already read) `httpx` response."""
+        response = requests.Response()
+        response.status_code = http_response.status_code
+        response.headers = CaseInsensitiveDict(http_response.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.reason = http_response.reason_phrase
+        response.url = str(request.url)
+        response.request = request
+        response.connection = self
+        # NOTE: The body was read (and decompressed) by `httpx`.
+        response._content = http_response.content  # pylint: disable=protected-access
+        response._content_consumed = True  # pylint: disable=protected-access
+        response.raw = io.BytesIO(response._content)  # pylint: disable=protected-access
+        return response
+
+    def close(self) -> None:
+        """Closes the fallback adapter. Use `aclose` to close the connections of the `httpx.AsyncClient` too."""
+        self.fallback.close()
+
+    async def aclose(self) -> None:
+        """Closes the connections of the adapter."""
+        self.close()
+        await self.client.aclose()
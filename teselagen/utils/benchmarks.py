@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Benchmarks of the hot paths of the teselagen package, with regression tracking.
+
+The benchmarks run offline, on synthetic payloads (generated by the `FakeTeselaGenServer` of
+`teselagen.utils.fake_server`):
+
+- `test.tabular_format_assay_result_data`: `TESTClient._tabular_format_assay_result_data`.
+- `test.get_assay_file_results`: `TESTClient._get_assay_file_results` (formatting, groupby and merge with the assay \
+  subjects), with the HTTP calls stubbed out.
+- `candidates_to_design.build_design_from_candidates`: `build_design_from_candidates`.
+- `utils.downsample_data`: `downsample_data`.
+- `utils.xlsx_parser`: `xlsx_parser`, on a generated workbook.
+- `build.get_documents`: paging through in-memory pages with `get_documents`.
+- `end_to_end.get_aliquots`: request throughput of `BUILDClient.get_aliquots` against a local fake server.
+- `startup.import_teselagen_api`: `from teselagen.api import TeselaGenClient` in a fresh interpreter (including the \
+  interpreter startup), which short-lived scripts and workers pay before their first request.
+
+Results are stored as JSON (one file per commit, in `.benchmarks/` by default), and compared with a baseline: a \
+benchmark whose best time grew by more than a threshold is flagged as a regression. The startup time must also stay \
+under a target.
+
+Example:
+    >>> python3 -m teselagen.utils.benchmarks --baseline .benchmarks/<commit>.json --threshold 0.1
+"""
+
+from __future__ import annotations
+
+import argparse
+from contextlib import contextmanager
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+import io
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from typing import Any, Literal, TYPE_CHECKING
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from teselagen.api.build_client import get_documents
+from teselagen.utils import serializers
+from teselagen.utils.candidates_to_design import build_design_from_candidates
+from teselagen.utils.fake_server import FakeServerConfig
+from teselagen.utils.fake_server import FakeTeselaGenServer
+from teselagen.utils.utils import downsample_data
+from teselagen.utils.utils import get_project_root
+from teselagen.utils.utils import xlsx_parser
+
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+    from teselagen.api import TeselaGenClient
+
+    # A setup function receives a scale factor of the payloads, and yields the function to time.
+    Setup = Callable[[float], Iterator[Callable[[], Any]]]
+
+# CONSTANTS
+BENCHMARKS_FORMAT_VERSION: Literal[1] = 1
+DEFAULT_BENCHMARKS_DIR: Path = get_project_root() / '.benchmarks'
+DEFAULT_REGRESSION_THRESHOLD: float = 0.1
+# Best time (in seconds) of the `startup.import_teselagen_api` benchmark above which the command fails.
+DEFAULT_STARTUP_TARGET: float = 0.5
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark."""
+
+    name: str
+    setup: Setup
+    # Number of items (rows, records, requests) processed per run, as a function of the scale.
+    items: Callable[[float], int]
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(
+    name: str,
+    items: Callable[[float], int],
+) -> Callable[[Setup], Setup]:
+    """Decorator registering a benchmark setup (a generator function yielding the function to time)."""
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = Benchmark(name=name, setup=setup, items=items)
+        return setup
+
+    return register
+
+
+def _scaled(size: int) -> Callable[[float], int]:
+    return lambda scale: max(1, int(size * scale))
+
+
+def _fake_json(
+    server: FakeTeselaGenServer,
+    method: str,
+    path: str,
+    body: Optional[Any] = None,
+) -> Any:
+    """Returns the (decoded) payload of a fake server response, without any network I/O."""
+    _, _, content = server.handle('PUT', '/tg-api/public/auth', {}, b'{"username": "user", "password": "password"}')
+    headers: Dict[str, str] = {server.api_token_name: serializers.loads(content)['token']}
+    _, _, content = server.handle(method, path, headers, b'' if body is None else serializers.dumps(body))
+    return serializers.loads(content)
+
+
+@contextmanager
+def _fake_client(host_url: str = 'http://127.0.0.1:1', **kwargs: Any) -> Iterator[TeselaGenClient]:
+    """Yields a (quiet) client, closing its session afterwards."""
+    from teselagen.api import TeselaGenClient
+
+    with redirect_stdout(io.StringIO()):
+        client = TeselaGenClient(host_url=host_url, **kwargs)
+    try:
+        yield client
+    finally:
+        client.http_session.close()
+
+
+# BENCHMARKS
+
+
+@benchmark('test.tabular_format_assay_result_data', items=_scaled(20_000))
+def _tabular_format_assay_result_data(scale: float) -> Iterator[Callable[[], Any]]:
+    rows: int = _scaled(20_000)(scale)
+    server = FakeTeselaGenServer(FakeServerConfig(results_per_file=rows))
+    results = _fake_json(server, 'GET', f'/tg-api/assays/1/results?fileId=1&pageNumber=1&pageSize={rows}')['results']
+    with _fake_client() as client:
+        yield lambda: client.test._tabular_format_assay_result_data(results, with_units=True)
+
+
+@benchmark('test.get_assay_file_results', items=_scaled(20_000))
+def _get_assay_file_results(scale: float) -> Iterator[Callable[[], Any]]:
+    rows: int = _scaled(20_000)(scale)
+    config = FakeServerConfig(results_per_file=rows, num_assay_subjects=max(1, rows // 20))
+    server = FakeTeselaGenServer(config)
+    api_result = _fake_json(server, 'GET', f'/tg-api/assays/1/results?fileId=1&pageNumber=1&pageSize={rows}')
+    assay_subjects = _fake_json(server, 'GET', '/tg-api/assay-subjects?summarized=false')
+    with _fake_client() as client:
+        test_client = client.test
+        with patch.object(test_client, '_get_assay_file_results_from_api', return_value=api_result), \
+                patch.object(test_client, 'get_assay_subjects', return_value=assay_subjects):
+            yield lambda: test_client._get_assay_file_results(
+                assay_id='1',
+                file_id='1',
+                as_dataframe=True,
+                with_subject_data=True,
+            )
+
+
+@benchmark('candidates_to_design.build_design_from_candidates', items=_scaled(10_000))
+def _build_design_from_candidates(scale: float) -> Iterator[Callable[[], Any]]:
+    rows: int = _scaled(10_000)(scale)
+    bin_cols: List[str] = [f'Bin {i}' for i in range(6)]
+    candidates: List[Dict[str, Any]] = [{
+        **{bin_col: f'Part {i % 17}-{j}' for j, bin_col in enumerate(bin_cols)},
+        'Priority': float(i) if i % 4 else float('nan'),
+    } for i in range(rows)]
+    yield lambda: build_design_from_candidates(candidates_data=candidates, bin_cols=bin_cols, name='Benchmark')
+
+
+@benchmark('utils.downsample_data', items=_scaled(200_000))
+def _downsample_data(scale: float) -> Iterator[Callable[[], Any]]:
+    rows: int = _scaled(200_000)(scale)
+    rng = np.random.default_rng(0)
+    dataframe = pd.DataFrame({
+        'Time': np.arange(rows, dtype=float) * 0.5,
+        'OD600': rng.random(rows),
+        'Glucose': rng.random(rows),
+    })
+    yield lambda: downsample_data(dataframe, time_column='Time', max_samples=max(1, rows // 200))
+
+
+@benchmark('utils.xlsx_parser', items=_scaled(3 * 5_000))
+def _xlsx_parser(scale: float) -> Iterator[Callable[[], Any]]:
+    rows: int = _scaled(5_000)(scale)
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as directory:
+        filepath: Path = Path(directory) / 'benchmark.xlsx'
+        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+            for sheet in range(3):
+                pd.DataFrame({
+                    'Strain': [f'Strain {i}' for i in range(rows)],
+                    'Time': np.arange(rows),
+                    'OD600': rng.random(rows),
+                }).to_excel(writer, sheet_name=f'Sheet {sheet}', index=False)
+        yield lambda: xlsx_parser(filepath)
+
+
+@benchmark('build.get_documents', items=_scaled(100_000))
+def _get_documents(scale: float) -> Iterator[Callable[[], Any]]:
+    records: int = _scaled(100_000)(scale)
+    page_size: int = 100
+    pages: List[List[Dict[str, Any]]] = [[{
+        'id': str(i),
+        'name': f'Aliquot {i}'
+    } for i in range(start, min(start + page_size, records))] for start in range(0, records, page_size)]
+
+    def get_page(page_number: Any) -> List[Dict[str, Any]]:
+        index: int = int(page_number) - 1
+        return pages[index] if index < len(pages) else []
+
+    yield lambda: sum(1 for _ in get_documents(get_page, match_criteria=lambda record: record['id'].endswith('7')))
+
+
+@benchmark('end_to_end.get_aliquots', items=_scaled(200))
+def _end_to_end_get_aliquots(scale: float) -> Iterator[Callable[[], Any]]:
+    num_requests: int = _scaled(200)(scale)
+    page_size: int = 50
+    with FakeTeselaGenServer(FakeServerConfig(num_aliquots=num_requests * page_size)) as server:
+        with _fake_client(host_url=server.host_url) as client:
+            with redirect_stdout(io.StringIO()):
+                client.update_token(token=client.create_token('user', 'password', '1d'), save_to_storage=False)
+            yield lambda: [
+                client.build.get_aliquots(pageNumber=page_number, pageSize=page_size)
+                for page_number in range(1, num_requests + 1)
+            ]
+
+
+@benchmark('startup.import_teselagen_api', items=lambda scale: 1)
+def _import_teselagen_api(scale: float) -> Iterator[Callable[[], Any]]:
+    env: Dict[str, str] = {
+        **os.environ,
+        'PYTHONPATH': os.pathsep.join(filter(None, [str(get_project_root()), os.environ.get('PYTHONPATH')])),
+    }
+    command: List[str] = [sys.executable, '-c', 'from teselagen.api import TeselaGenClient']
+    yield lambda: subprocess.run(command, env=env, check=True)
+
+
+# RUNNER
+
+
+def get_commit() -> Optional[str]:
+    """Returns the current git commit of the project, or None if it is not a git repository."""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=get_project_root(),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(
+    name: str,
+    scale: float = 1.0,
+    repeat: int = 5,
+    number: int = 1,
+) -> Dict[str, Any]:
+    """Runs a registered benchmark.
+
+    Args:
+        name (str): Name of the benchmark.
+
+        scale (float): Scale factor of the payloads. Defaults to 1.
+
+        repeat (int): Number of timings. Defaults to 5.
+
+        number (int): Number of runs per timing. Defaults to 1.
+
+    Returns:
+        Dict[str, Any]: Timings (in seconds per run): `min`, `median`, `mean` and `stdev`, along with `items` (per \
+            run) and `items_per_second` (at the best time).
+    """
+    bench: Benchmark = BENCHMARKS[name]
+    # The benchmarked functions print progress messages.
+    with redirect_stdout(io.StringIO()):
+        with contextmanager(bench.setup)(scale) as func:
+            timings: List[float] = [timing / number for timing in timeit.repeat(func, repeat=repeat, number=number)]
+
+    items: int = bench.items(scale)
+    return {
+        'repeat': repeat,
+        'number': number,
+        'scale': scale,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'items': items,
+        'items_per_second': items / min(timings) if min(timings) > 0 else None,
+    }
+
+
+def run_benchmarks(
+    names: Optional[Sequence[str]] = None,
+    scale: float = 1.0,
+    repeat: int = 5,
+    number: int = 1,
+) -> Dict[str, Any]:
+    """Runs the registered benchmarks.
+
+    Args:
+        names (Optional[Sequence[str]]): Names of the benchmarks to run. Defaults to all of them.
+
+        scale (float): Scale factor of the payloads. Defaults to 1.
+
+        repeat (int): Number of timings per benchmark. Defaults to 5.
+
+        number (int): Number of runs per timing. Defaults to 1.
+
+    Returns:
+        Dict[str, Any]: The results: the commit, date and environment of the run, and the timings of every \
+            benchmark (under `benchmarks`).
+    """
+    return {
+        'version': BENCHMARKS_FORMAT_VERSION,
+        'commit': get_commit(),
+        'date': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'serializer': type(serializers.get_serializer()).__name__,
+        'benchmarks': {
+            name: run_benchmark(name=name, scale=scale, repeat=repeat, number=number)
+            for name in (names if names is not None else BENCHMARKS)
+        },
+    }
+
+
+def save_results(results: Dict[str, Any], filepath: Path) -> None:
+    """Writes benchmark results to a JSON file."""
+    filepath.parent.mkdir(parents=True, exist_ok=True)
+    with open(filepath, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(filepath: Path) -> Dict[str, Any]:
+    """Reads benchmark results from a JSON file."""
+    with open(filepath) as f:
+        return json.load(f)
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> List[Dict[str, Any]]:
+    """Compares two benchmark results, on the best time of each benchmark run in both (at the same scale).
+
+    Args:
+        baseline (Dict[str, Any]): Results of the reference commit.
+
+        current (Dict[str, Any]): Results of the commit under test.
+
+        threshold (float): Relative slowdown above which a benchmark is flagged. Defaults to 0.1 (10%).
+
+    Returns:
+        List[Dict[str, Any]]: One entry per benchmark, with its `name`, `baseline` and `current` best times, \
+            relative `change` and whether it is a `regression`.
+    """
+    comparison: List[Dict[str, Any]] = []
+    for name, timings in current['benchmarks'].items():
+        baseline_timings: Optional[Dict[str, Any]] = baseline['benchmarks'].get(name)
+        if baseline_timings is None or baseline_timings.get('scale') != timings.get('scale'):
+            continue
+        change: float = timings['min'] / baseline_timings['min'] - 1
+        comparison.append({
+            'name': name,
+            'baseline': baseline_timings['min'],
+            'current': timings['min'],
+            'change': change,
+            'regression': change > threshold,
+        })
+    return comparison
+
+
+def format_comparison(comparison: List[Dict[str, Any]]) -> str:
+    """Formats a comparison (see `compare_results`) as a text table."""
+    lines: List[str] = [f"{'benchmark':<52} {'baseline':>12} {'current':>12} {'change':>9}"]
+    for row in comparison:
+        flag: str = '  REGRESSION' if row['regression'] else ''
+        lines.append(f"{row['name']:<52} {1000 * row['baseline']:>10.2f}ms {1000 * row['current']:>10.2f}ms "
+                     f"{100 * row['change']:>+8.1f}%{flag}")
+    return '\n'.join(lines)
+
+
+def _latest_results(directory: Path, exclude: Optional[Path] = None) -> Optional[Path]:
+    """Returns the most recent results file of a directory (other than `exclude`), if any."""
+    files: List[Path] = [filepath for filepath in directory.glob('*.json') if filepath != exclude]
+    return max(files, key=lambda filepath: filepath.stat().st_mtime) if files else None
+
+
+def args_parser(args_in: Sequence[str] | None) -> argparse.Namespace:
+    """Parses arguments from the command line tool."""
+    parser = argparse.ArgumentParser(
+        prog='benchmarks',
+        description='Runs the benchmarks of the teselagen package, and flags regressions against a baseline.',
+    )
+    parser.add_argument('--names', nargs='+', choices=sorted(BENCHMARKS), help='Benchmarks to run (default: all)')
+    parser.add_argument('--scale', default=1.0, type=float, help='Scale factor of the payloads')
+    parser.add_argument('--repeat', default=5, type=int, help='Number of timings per benchmark')
+    parser.add_argument('--number', default=1, type=int, help='Number of runs per timing')
+    parser.add_argument(
+        '--output',
+        default=None,
+        type=Path,
+        help=f'Path of the JSON results (default: {DEFAULT_BENCHMARKS_DIR}/<commit>.json)',
+    )
+    parser.add_argument(
+        '--baseline',
+        default=None,
+        type=Path,
+        help='Path of the JSON results to compare with (default: the latest other results of the output directory)',
+    )
+    parser.add_argument(
+        '--threshold',
+        default=DEFAULT_REGRESSION_THRESHOLD,
+        type=float,
+        help='Relative slowdown flagged as a regression',
+    )
+    parser.add_argument(
+        '--startup-target',
+        default=DEFAULT_STARTUP_TARGET,
+        type=float,
+        help='Maximum time (in seconds) of the startup.import_teselagen_api benchmark',
+    )
+    return parser.parse_args(args_in)
+
+
+# Command line tool, runs the benchmarks and exits with status 1 if a regression is found, or if the startup time is
+# above its target.
+if __name__ == '__main__':
+    args = args_parser(sys.argv[1:])
+
+    results = run_benchmarks(names=args.names, scale=args.scale, repeat=args.repeat, number=args.number)
+    output: Path = args.output or DEFAULT_BENCHMARKS_DIR / f"{results['commit'] or 'results'}.json"
+    save_results(results, output)
+    print(f'Results saved to {output}')
+
+    failed: bool = False
+    startup: Optional[Dict[str, Any]] = results['benchmarks'].get('startup.import_teselagen_api')
+    if startup is not None and startup['min'] > args.startup_target:
+        print(f"Startup time {1000 * startup['min']:.0f}ms is above the target ({1000 * args.startup_target:.0f}ms).")
+        failed = True
+
+    baseline_path: Optional[Path] = args.baseline or _latest_results(output.parent, exclude=output)
+    if baseline_path is None:
+        print('No baseline to compare with.')
+    else:
+        comparison = compare_results(load_results(baseline_path), results, threshold=args.threshold)
+        print(f'Compared with {baseline_path}:')
+        print(format_comparison(comparison))
+        failed = failed or any(row['regression'] for row in comparison)
+
+    sys.exit(1 if failed else 0)
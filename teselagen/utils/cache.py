@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""In-memory response cache for the teselagen package.
+
+A `ResponseCache` can be attached to a `TeselaGenClient` (it is opt-in). Responses of slow-changing read endpoints
+(such as assays, files, metadata, designs, laboratories or DISCOVER models by type) are kept for `ttl` seconds, in an
+LRU of at most `maxsize` responses. Entries are keyed by method, URL, query parameters, body and request headers (so by
+user and by laboratory too).
+
+Every other (write) request sent through the session invalidates the cached responses of the resource it modifies, so
+for example `TESTClient.create_assay` invalidates the cached `TESTClient.get_assays` responses. Writes made by other
+clients are only noticed once the `ttl` expires.
+
+Example:
+    >>> client = TeselaGenClient(cache=ResponseCache(ttl=600, maxsize=256))
+    >>> client.test.get_assays()  # Sent to the server
+    >>> client.test.get_assays()  # Served from the cache
+    >>> client.cache.stats()
+    {'hits': 1, 'misses': 1, 'size': 1}
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+import threading
+import time
+from typing import Dict, Hashable, Literal, Mapping, Tuple, TYPE_CHECKING
+from urllib.parse import urlencode
+
+from teselagen.utils.metrics import endpoint_template
+
+if TYPE_CHECKING:
+    from typing import Any, Optional
+
+    import requests
+
+# CONSTANTS
+DEFAULT_CACHE_TTL: Literal[300] = 300
+DEFAULT_CACHE_MAXSIZE: Literal[1024] = 1024
+
+# Cacheable read endpoints: (method, endpoint template pattern) -> resource they read.
+DEFAULT_CACHEABLE_ENDPOINTS: Dict[Tuple[str, str], str] = {
+    ('GET', 'laboratories'): 'laboratories',
+    ('GET', 'assays'): 'assays',
+    ('GET', 'files'): 'files',
+    ('GET', 'metadata/*'): 'metadata',
+    ('GET', 'designs'): 'designs',
+    ('GET', 'designs/*'): 'designs',
+    ('POST', 'get-models-by-type'): 'models',
+}
+
+# Resources modified by write endpoints: endpoint template pattern -> resources. Writes to any other endpoint modify
+# the resource named by the first segment of their path (e.g. `DELETE assays/{}` modifies "assays").
+DEFAULT_WRITE_RESOURCES: Dict[str, Tuple[str, ...]] = {
+    'assays/*/files': ('assays', 'files'),
+    'create-model': ('models',),
+    'submit-model': ('models',),
+    'delete-model': ('models',),
+    'cancel-model': ('models',),
+}
+
+
+class ResponseCache:
+    """Thread-safe TTL/LRU cache of the responses of slow-changing read endpoints."""
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_CACHE_TTL,
+        maxsize: int = DEFAULT_CACHE_MAXSIZE,
+        cacheable_endpoints: Optional[Mapping[Tuple[str, str], str]] = None,
+        write_resources: Optional[Mapping[str, Tuple[str, ...]]] = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            ttl (float): Time (in seconds) a response is kept. Defaults to 300.
+
+            maxsize (int): Maximum number of responses kept. The least recently used ones are evicted first. \
+                Defaults to 1024.
+
+            cacheable_endpoints (Optional[Mapping[Tuple[str, str], str]]): Maps (method, endpoint template pattern) \
+                of the cacheable read endpoints to the resource they read. Patterns use `fnmatch` syntax, and \
+                endpoint templates are URL paths with record ids replaced by `{}`. Defaults to \
+                `DEFAULT_CACHEABLE_ENDPOINTS`.
+
+            write_resources (Optional[Mapping[str, Tuple[str, ...]]]): Maps endpoint template patterns of write \
+                endpoints to the resources they modify. Defaults to `DEFAULT_WRITE_RESOURCES`.
+        """
+        if maxsize < 1:
+            raise ValueError(f'maxsize must be a positive integer, got {maxsize}')
+
+        self.ttl: float = ttl
+        self.maxsize: int = maxsize
+        self.cacheable_endpoints: Dict[Tuple[str, str], str] = dict(
+            DEFAULT_CACHEABLE_ENDPOINTS if cacheable_endpoints is None else cacheable_endpoints)
+        self.write_resources: Dict[str, Tuple[str, ...]] = dict(
+            DEFAULT_WRITE_RESOURCES if write_resources is None else write_resources)
+
+        # key -> (expiration time, resource, response)
+        self._entries: OrderedDict[Hashable, Tuple[float, str, requests.Response]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the settings are pickled: the cached responses stay in the pickling process.
+        return {
+            'ttl': self.ttl,
+            'maxsize': self.maxsize,
+            'cacheable_endpoints': self.cacheable_endpoints,
+            'write_resources': self.write_resources,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc] # pylint: disable=unnecessary-dunder-call
+
+    def resource_of(self, method: str, url: str) -> Optional[str]:
+        """Returns the resource read by a request, or None if the request is not cacheable."""
+        template: str = endpoint_template(url)
+        for (endpoint_method, pattern), resource in self.cacheable_endpoints.items():
+            if endpoint_method == method.upper() and fnmatchcase(template, pattern):
+                return resource
+        return None
+
+    def modified_resources(self, url: str) -> Tuple[str, ...]:
+        """Returns the resources modified by a write request."""
+        template: str = endpoint_template(url)
+        for pattern, resources in self.write_resources.items():
+            if fnmatchcase(template, pattern):
+                return resources
+        return (template.split('/', 1)[0],)
+
+    @staticmethod
+    def make_key(
+        method: str,
+        url: str,
+        params: Optional[Any] = None,
+        data: Optional[Any] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> Hashable:
+        """Returns the cache key of a request."""
+        if params is not None and not isinstance(params, (str, bytes)):
+            params = urlencode(sorted(params.items()) if isinstance(params, Mapping) else list(params), doseq=True)
+        return (
+            method.upper(),
+            url,
+            params,
+            data if isinstance(data, (str, bytes)) else None,
+            tuple(sorted((headers or {}).items())),
+        )
+
+    def get(self, key: Hashable) -> Optional[requests.Response]:
+        """Returns the cached response of a key, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[2]
+
+    def set(self, key: Hashable, resource: str, response: requests.Response) -> None:
+        """Caches a response (of the given resource)."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, resource, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *resources: str) -> int:
+        """Removes the cached responses of the given resources.
+
+        Returns:
+            int: The number of responses removed.
+        """
+        with self._lock:
+            keys = [key for key, (_, resource, _) in self._entries.items() if resource in resources]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        """Removes all the cached responses."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of hits, misses and cached responses."""
+        with self._lock:
+            return {'hits': self._hits, 'misses': self._misses, 'size': len(self._entries)}
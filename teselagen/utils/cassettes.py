@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Record/replay of HTTP interactions ("cassettes") for the teselagen package.
+
+While a cassette is in use (see `use_cassette`), every request sent by the clients (through their `TeselaGenSession`,
+or through the `get`/`post`/`put`/`delete`/`download_file` wrappers) is either:
+
+- recorded: sent to the server, and its response is stored in the cassette (a JSON file), or
+- replayed: answered from the cassette, without any network I/O.
+
+Tokens and passwords are redacted from the stored requests and responses, so cassettes can be committed.
+Requests are matched by method, path, query parameters and laboratory (not by host, so cassettes recorded against one
+server replay against any), and identical requests are answered in the recorded order (so polling a task replays its
+successive statuses). Replayed responses can simulate the recorded latency, scaled by a factor.
+
+While replaying, the waits between polls of `wait_for_status` (and the wait of `TeselaGenClient.logout`) are skipped,
+so slow workflows replay in a fraction of a second. Replaying without latency also isolates the client-side overhead
+of a workflow, for profiling.
+
+Example:
+    >>> with use_cassette('cassettes/get_assays.json'):  # Recorded on the first run, replayed afterwards.
+    ...     client.test.get_assays()
+"""
+
+from __future__ import annotations
+
+import base64
+from collections import defaultdict
+from collections import deque
+from contextlib import contextmanager
+from datetime import timedelta
+import json
+from pathlib import Path
+import threading
+import time
+from typing import Any, Literal, Tuple, TYPE_CHECKING
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from teselagen.utils import serializers
+
+if TYPE_CHECKING:
+    from typing import Deque, Dict, Iterator, List, Optional, Union
+
+    from teselagen.utils.transport import TeselaGenSession
+
+    CassetteMode = Literal['record', 'replay', 'once']
+
+# CONSTANTS
+CASSETTE_FORMAT_VERSION: Literal[1] = 1
+REDACTED: Literal['REDACTED'] = 'REDACTED'
+
+# Headers never stored (matched case-insensitively).
+DEFAULT_REDACTED_HEADERS: Tuple[str, ...] = (
+    'x-tg-api-token',
+    'authorization',
+    'proxy-authorization',
+    'cookie',
+    'set-cookie',
+)
+# Fields of JSON bodies (at any depth) whose values are replaced by "REDACTED".
+DEFAULT_REDACTED_FIELDS: Tuple[str, ...] = ('token', 'password', 'passwordConfirm', 'apiKey')
+# Response headers describing the raw (possibly compressed) body, which is stored decoded.
+_UNSTORED_RESPONSE_HEADERS: Tuple[str, ...] = ('content-length', 'content-encoding', 'transfer-encoding')
+
+# Header holding the active laboratory (see `TeselaGenClient.TESELAGEN_ACTIVE_LAB_IDENTIFIER`).
+_LAB_HEADER: str = 'tg-active-lab-id'
+
+
+class CassetteError(Exception):
+    """Raised when a replayed request has no recorded response."""
+
+
+class Cassette:
+    """Recorded HTTP interactions, stored in a JSON file."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        mode: CassetteMode = 'once',
+        latency: float = 0.0,
+        redacted_headers: Tuple[str, ...] = DEFAULT_REDACTED_HEADERS,
+        redacted_fields: Tuple[str, ...] = DEFAULT_REDACTED_FIELDS,
+    ) -> None:
+        """Initialize the cassette.
+
+        Args:
+            path (Union[str, Path]): Path of the JSON file.
+
+            mode (CassetteMode): "record" sends the requests and stores their responses (overwriting the file), \
+                "replay" answers the requests from the file, and "once" replays if the file exists and records \
+                otherwise. Defaults to "once".
+
+            latency (float): Factor of the recorded latency simulated when replaying. 0 replays instantly, and 1 at \
+                the recorded speed. Defaults to 0.
+
+            redacted_headers (Tuple[str, ...]): Headers never stored. Defaults to `DEFAULT_REDACTED_HEADERS`.
+
+            redacted_fields (Tuple[str, ...]): Fields of JSON bodies whose values are redacted. Defaults to \
+                `DEFAULT_REDACTED_FIELDS`.
+        """
+        if mode not in ('record', 'replay', 'once'):
+            raise ValueError(f"mode must be 'record', 'replay' or 'once', got {mode!r}")
+
+        self.path: Path = Path(path)
+        self.is_replaying: bool = mode == 'replay' or (mode == 'once' and self.path.is_file())
+        self.latency: float = latency
+        self.redacted_headers: Tuple[str, ...] = tuple(header.lower() for header in redacted_headers)
+        self.redacted_fields: Tuple[str, ...] = tuple(redacted_fields)
+
+        self._lock = threading.Lock()
+        self._session: Optional[TeselaGenSession] = None
+        self.interactions: List[Dict[str, Any]] = []
+        # Interactions not replayed yet, and the last replayed one, by match key.
+        self._pending: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+        self._last: Dict[str, Dict[str, Any]] = {}
+
+        if self.is_replaying:
+            with open(self.path, 'rb') as f:
+                self.interactions = serializers.loads(f.read())['interactions']
+            for interaction in self.interactions:
+                self._pending[interaction['request']['key']].append(interaction)
+
+    @property
+    def session(self) -> TeselaGenSession:
+        """Session sending the requests of the wrappers called without a session."""
+        from teselagen.utils.transport import TeselaGenSession
+
+        with self._lock:
+            if self._session is None:
+                self._session = TeselaGenSession()
+            return self._session
+
+    @staticmethod
+    def match_key(
+        method: str,
+        url: str,
+        headers: Optional[Any] = None,
+    ) -> str:
+        """Returns the key matching a request to its recorded responses: its method, path, (sorted) query \
+        parameters and laboratory."""
+        parts = urlsplit(url)
+        query: str = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        lab: str = (headers or {}).get(_LAB_HEADER) or ''
+        return f"{method.upper()} {parts.path}{'?' if query else ''}{query} lab={lab}"
+
+    def play(self, request: requests.PreparedRequest) -> requests.Response:
+        """Returns the recorded response of a request.
+
+        Raises:
+            CassetteError: If no response was recorded for the request.
+        """
+        key: str = self.match_key(method=request.method or 'GET', url=request.url or '', headers=request.headers)
+        with self._lock:
+            pending: Deque[Dict[str, Any]] = self._pending[key]
+            interaction: Optional[Dict[str, Any]] = pending.popleft() if pending else self._last.get(key)
+            if interaction is None:
+                raise CassetteError(f'No recorded response for {key} in cassette {self.path}')
+            self._last[key] = interaction
+
+        recorded: Dict[str, Any] = interaction['response']
+        if self.latency > 0:
+            time.sleep(self.latency * recorded['elapsed'])
+
+        response = requests.Response()
+        response.status_code = recorded['status_code']
+        response.reason = recorded['reason']
+        response.url = request.url or ''
+        response.request = request
+        response.headers = CaseInsensitiveDict(recorded['headers'])
+        response._content = _decode_body(recorded['body'])  # pylint: disable=protected-access
+        response._content_consumed = True  # pylint: disable=protected-access
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.elapsed = timedelta(seconds=recorded['elapsed'])
+        return response
+
+    def record(
+        self,
+        request: requests.PreparedRequest,
+        response: requests.Response,
+    ) -> None:
+        """Stores a request and its response, redacting their secrets."""
+        interaction: Dict[str, Any] = {
+            'request': {
+                'key': self.match_key(method=request.method or 'GET', url=request.url or '', headers=request.headers),
+                'method': request.method,
+                'url': request.url,
+                'headers': self._redact_headers(request.headers),
+                'body': self._encode_body(request.body),
+            },
+            'response': {
+                'status_code': response.status_code,
+                'reason': response.reason,
+                'headers': {
+                    name: value for name, value in self._redact_headers(response.headers).items()
+                    if name.lower() not in _UNSTORED_RESPONSE_HEADERS
+                },
+                'body': self._encode_body(response.content),
+                'elapsed': response.elapsed.total_seconds(),
+            },
+        }
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def save(self) -> None:
+        """Writes the recorded interactions to the cassette file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            content: Dict[str, Any] = {'version': CASSETTE_FORMAT_VERSION, 'interactions': self.interactions}
+        with open(self.path, 'w') as f:
+            json.dump(content, f, indent=1)
+
+    def close(self) -> None:
+        """Saves the cassette (if recording), and closes its session."""
+        if not self.is_replaying:
+            self.save()
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _redact_headers(self, headers: Any) -> Dict[str, str]:
+        return {name: value for name, value in headers.items() if name.lower() not in self.redacted_headers}
+
+    def _encode_body(self, body: Optional[Union[str, bytes]]) -> Optional[Dict[str, Any]]:
+        """Encodes a body as JSON (redacted), text or base64 (binary)."""
+        if body is None or not isinstance(body, (str, bytes)):
+            return None
+        raw: bytes = body.encode('utf-8') if isinstance(body, str) else body
+        try:
+            return {'json': _redact(serializers.loads(raw), self.redacted_fields)}
+        except ValueError:
+            pass
+        try:
+            return {'text': raw.decode('utf-8')}
+        except UnicodeDecodeError:
+            return {'base64': base64.b64encode(raw).decode('ascii')}
+
+
+def _decode_body(body: Optional[Dict[str, Any]]) -> bytes:
+    if body is None:
+        return b''
+    if 'json' in body:
+        return serializers.dumps(body['json'])
+    if 'text' in body:
+        return body['text'].encode('utf-8')
+    return base64.b64decode(body['base64'])
+
+
+def _redact(obj: Any, fields: Tuple[str, ...]) -> Any:
+    """Replaces the values of the given fields (at any depth) by "REDACTED"."""
+    if isinstance(obj, dict):
+        return {
+            key: REDACTED if key in fields and value is not None else _redact(value, fields)
+            for key, value in obj.items()
+        }
+    if isinstance(obj, list):
+        return [_redact(value, fields) for value in obj]
+    return obj
+
+
+_cassette: Optional[Cassette] = None
+
+
+def get_cassette() -> Optional[Cassette]:
+    """Returns the cassette in use, or None if requests are sent as they are."""
+    return _cassette
+
+
+def set_cassette(cassette: Optional[Cassette] = None) -> Optional[Cassette]:
+    """Sets the cassette used by the clients.
+
+    Args:
+        cassette (Optional[Cassette]): The cassette to use. If None, requests are sent as they are.
+
+    Returns:
+        Optional[Cassette]: The previous cassette.
+    """
+    global _cassette  # pylint: disable=global-statement
+    previous_cassette = _cassette
+    _cassette = cassette
+    return previous_cassette
+
+
+def is_replaying() -> bool:
+    """Whether requests are answered from a cassette (so there is no point in waiting for the server)."""
+    return _cassette is not None and _cassette.is_replaying
+
+
+@contextmanager
+def use_cassette(
+    path: Union[str, Path],
+    mode: CassetteMode = 'once',
+    latency: float = 0.0,
+) -> Iterator[Cassette]:
+    """Records or replays the requests of the clients while the block runs (see `Cassette`). The cassette is saved \
+    when the block exits, if it was recording."""
+    cassette = Cassette(path=path, mode=mode, latency=latency)
+    previous_cassette = set_cassette(cassette)
+    try:
+        yield cassette
+    finally:
+        set_cassette(previous_cassette)
+        cassette.close()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Columnar (Arrow, Parquet and Feather) export of records for the teselagen package.
+
+Records (nested dicts, e.g. aliquots with their sample and material) are flattened into a fixed set of `Column`s, each
+one read from a path of keys (e.g. `('sample', 'material', 'name')`). Records are consumed one at a time, as they are
+paged from the server, and their values appended to per-column buffers, which are turned into Arrow record batches of
+`batch_size` rows and written to the file. So exports hold at most a page of records and a batch of values in memory,
+whatever the number of records.
+
+`pyarrow` is required (install the `arrow` extra), and only imported when a schema or batch is built.
+
+Example:
+    >>> columns = (Column('id', ('id',)), Column('material_name', ('sample', 'material', 'name')))
+    >>> write_records(client.build.iter_aliquots(), 'aliquots.parquet', columns=columns)
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, TYPE_CHECKING
+
+from teselagen.utils.utils import parse_datetime
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple, Union
+
+    import pyarrow as pa
+    from typing_extensions import TypeAlias
+
+    ColumnType: TypeAlias = Literal['string', 'float64', 'int64', 'bool', 'timestamp']
+    FileFormat: TypeAlias = Literal['parquet', 'feather']
+
+# CONSTANTS
+DEFAULT_EXPORT_BATCH_SIZE: Literal[10000] = 10000
+DEFAULT_EXPORT_COMPRESSION: Literal['zstd'] = 'zstd'
+
+
+@dataclass(frozen=True)
+class Column:
+    """Column of an export: a value read from a path of keys of each record, of a fixed type."""
+    name: str
+    path: Tuple[str, ...]
+    type: ColumnType = 'string'
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow
+    except ImportError as exc:
+        raise ImportError('Columnar exports require `pyarrow` to be installed (the `arrow` extra)') from exc
+    return pyarrow
+
+
+def _arrow_type(column_type: ColumnType) -> pa.DataType:
+    pa = _import_pyarrow()
+    return {
+        'string': pa.string(),
+        'float64': pa.float64(),
+        'int64': pa.int64(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('ms', tz='UTC'),
+    }[column_type]
+
+
+# Conversion of the (non-null) values of each column type.
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    'string': str,
+    'float64': float,
+    'int64': int,
+    'bool': bool,
+    'timestamp': lambda value: parse_datetime(value) if isinstance(value, str) else value,
+}
+
+
+def arrow_schema(columns: Sequence[Column]) -> pa.Schema:
+    """Returns the Arrow schema of the columns."""
+    pa = _import_pyarrow()
+    return pa.schema([pa.field(column.name, _arrow_type(column.type)) for column in columns])
+
+
+def _get_value(
+    record: Mapping[str, Any],
+    column: Column,
+) -> Any:
+    """Returns the (converted) value of a column of a record, or None if any key of its path is missing or null."""
+    value: Any = record
+    for key in column.path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return None if value is None else _CONVERTERS[column.type](value)
+
+
+def iter_record_batches(
+    records: Iterable[Mapping[str, Any]],
+    columns: Sequence[Column],
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """Yields the records flattened into Arrow record batches, consuming the records one at a time.
+
+    Args:
+        records (Iterable[Mapping[str, Any]]): The records (e.g. from a paged iterator, such as \
+            `BUILDClient.iter_aliquots`).
+
+        columns (Sequence[Column]): Columns of the batches.
+
+        batch_size (int): Maximum number of rows of a batch. Defaults to 10000.
+
+    Yields:
+        pa.RecordBatch: Batches of the schema of `columns` (see `arrow_schema`).
+    """
+    pa = _import_pyarrow()
+    schema: pa.Schema = arrow_schema(columns)
+    buffers: List[List[Any]] = [[] for _ in columns]
+
+    def make_batch() -> pa.RecordBatch:
+        return pa.RecordBatch.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(buffers, schema)],
+            schema=schema,
+        )
+
+    rows: int = 0
+    for record in records:
+        for values, column in zip(buffers, columns):
+            values.append(_get_value(record, column))
+        rows += 1
+        if rows >= batch_size:
+            yield make_batch()
+            buffers = [[] for _ in columns]
+            rows = 0
+    if rows > 0:
+        yield make_batch()
+
+
+def write_records(
+    records: Iterable[Mapping[str, Any]],
+    path: Union[str, Path],
+    columns: Sequence[Column],
+    file_format: FileFormat = 'parquet',
+    batch_size: int = DEFAULT_EXPORT_BATCH_SIZE,
+    compression: str = DEFAULT_EXPORT_COMPRESSION,
+) -> int:
+    """Writes records to a Parquet or Feather (Arrow IPC) file, a batch at a time.
+
+    Args:
+        records (Iterable[Mapping[str, Any]]): The records.
+
+        path (Union[str, Path]): Path of the file.
+
+        columns (Sequence[Column]): Columns of the file.
+
+        file_format (FileFormat): "parquet" or "feather". Defaults to "parquet".
+
+        batch_size (int): Number of rows of each batch (and Parquet row group). Defaults to 10000.
+
+        compression (str): Compression codec (e.g. "zstd", "lz4" or "snappy" for Parquet). Defaults to "zstd".
+
+    Returns:
+        int: The number of rows written.
+    """
+    pa = _import_pyarrow()
+    schema: pa.Schema = arrow_schema(columns)
+    path = Path(path).expanduser()
+
+    writer: Any
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+
+        writer = pq.ParquetWriter(str(path), schema, compression=compression)
+    elif file_format == 'feather':
+        writer = pa.ipc.new_file(str(path), schema, options=pa.ipc.IpcWriteOptions(compression=compression))
+    else:
+        raise ValueError(f'Unsupported file format: {file_format}')
+
+    rows: int = 0
+    with writer:
+        for batch in iter_record_batches(records, columns=columns, batch_size=batch_size):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
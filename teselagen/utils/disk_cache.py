@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Persistent (on-disk) cache of records fetched by id, for the teselagen package.
+
+Records fetched by id rarely change: DNA sequences (`DESIGNClient.get_dna_sequence`), amino acid sequence exports
+(`DESIGNClient.export_aa_sequence`) and designs (`DESIGNClient.get_design`). A `PersistentCache` keeps their responses
+in a SQLite database, so they survive between notebook sessions and batch jobs, and warm runs are (nearly) free of
+network I/O. Mutable records, such as plates (`plates/*`), are not cached by default: their contents change with the
+inventory, and would be served stale for up to `max_age`.
+
+Entries are keyed by host, laboratory, endpoint and id (the full URL, including its query parameters). They are served
+straight from disk while they are younger than `max_age`. Older entries are revalidated with a conditional request
+(`If-None-Match` / `If-Modified-Since`) when the server sent an `ETag` or `Last-Modified` header, or fetched again
+otherwise. The database is bounded to `max_bytes`, evicting the least recently used entries first, and writes (PUT,
+PATCH, DELETE) to a cached URL drop its entries.
+
+Example:
+    >>> client = TeselaGenClient(persistent_cache=PersistentCache())
+    >>> client.design.get_dna_sequence(seq_id='1')  # Fetched from the server, and stored on disk.
+    >>> # ... in a later session ...
+    >>> client.design.get_dna_sequence(seq_id='1')  # Read from disk.
+"""
+
+from __future__ import annotations
+
+from fnmatch import fnmatchcase
+import hashlib
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Literal, Tuple, TYPE_CHECKING
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from teselagen.utils import serializers
+from teselagen.utils.metrics import endpoint_template
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Mapping, Optional, Union
+
+# CONSTANTS
+DEFAULT_PERSISTENT_CACHE_PATH: Path = Path.home() / '.cache' / 'teselagen' / 'records.sqlite'
+# 512 MiB
+DEFAULT_PERSISTENT_CACHE_MAX_BYTES: Literal[536870912] = 536870912
+# 1 day
+DEFAULT_PERSISTENT_CACHE_MAX_AGE: Literal[86400] = 86400
+
+# Endpoint template patterns (`fnmatch` syntax) of the records fetched by id.
+DEFAULT_PERSISTENT_ENDPOINTS: Tuple[str, ...] = (
+    'sequence/*/*',
+    'export/aminoacids/*/*',
+    'designs/*',
+)
+
+# Header holding the active laboratory (see `TeselaGenClient.TESELAGEN_ACTIVE_LAB_IDENTIFIER`).
+_LAB_HEADER: str = 'tg-active-lab-id'
+# Response headers stored along with the content.
+_STORED_HEADERS: Tuple[str, ...] = ('Content-Type', 'Content-Encoding', 'ETag', 'Last-Modified')
+
+_SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS records (
+    key TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    lab TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    headers BLOB NOT NULL,
+    content BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS records_accessed_at ON records (accessed_at);
+CREATE INDEX IF NOT EXISTS records_url ON records (url);
+'''
+
+
+class PersistentCache:
+    """Size-bounded SQLite cache of records fetched by id."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_PERSISTENT_CACHE_PATH,
+        max_bytes: int = DEFAULT_PERSISTENT_CACHE_MAX_BYTES,
+        max_age: Optional[float] = DEFAULT_PERSISTENT_CACHE_MAX_AGE,
+        endpoints: Tuple[str, ...] = DEFAULT_PERSISTENT_ENDPOINTS,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            path (Union[str, Path]): Path of the SQLite database. It is created if it does not exist. Defaults to \
+                `~/.cache/teselagen/records.sqlite`.
+
+            max_bytes (int): Maximum total size (in bytes) of the cached contents. Defaults to 512 MiB.
+
+            max_age (Optional[float]): Time (in seconds) an entry is served without revalidation. None means \
+                entries are never revalidated. Defaults to 1 day.
+
+            endpoints (Tuple[str, ...]): Endpoint template patterns (`fnmatch` syntax, with record ids replaced by \
+                `{}`) of the cached GET endpoints. Defaults to `DEFAULT_PERSISTENT_ENDPOINTS`.
+        """
+        self.path: Path = Path(path).expanduser()
+        self.max_bytes: int = max_bytes
+        self.max_age: Optional[float] = max_age
+        self.endpoints: Tuple[str, ...] = tuple(endpoints)
+
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the settings are pickled: every process opens its own connection to the (shared) database.
+        return {'path': self.path, 'max_bytes': self.max_bytes, 'max_age': self.max_age, 'endpoints': self.endpoints}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc] # pylint: disable=unnecessary-dunder-call
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection to the database (opened on first use)."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        """Closes the connection to the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def is_cacheable(self, method: str, url: str) -> bool:
+        """Whether the response of a request is kept in the cache."""
+        if method.upper() != 'GET':
+            return False
+        template: str = endpoint_template(url)
+        return any(fnmatchcase(template, pattern) for pattern in self.endpoints)
+
+    @staticmethod
+    def make_key(
+        url: str,
+        params: Optional[Any] = None,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> str:
+        """Returns the cache key of a GET request: a hash of its laboratory and full URL (host, endpoint, id and \
+        query parameters)."""
+        full_url: str = requests.Request(method='GET', url=url, params=params).prepare().url
+        lab: str = (headers or {}).get(_LAB_HEADER) or ''
+        return hashlib.sha256(f'{lab}\n{full_url}'.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[requests.Response, bool]]:
+        """Returns the cached response of a key, and whether it is still fresh, or None if it is missing."""
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT url, status_code, headers, content, stored_at FROM records WHERE key = ?',
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.connection.execute('UPDATE records SET accessed_at = ? WHERE key = ?', (time.time(), key))
+
+        url, status_code, headers, content, stored_at = row
+
+        response = requests.Response()
+        response.status_code = status_code
+        response.url = url
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(serializers.loads(headers))
+        response._content = content  # pylint: disable=protected-access
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+
+        is_fresh: bool = self.max_age is None or time.time() - stored_at < self.max_age
+        return response, is_fresh
+
+    def revalidation_headers(self, response: requests.Response) -> Dict[str, str]:
+        """Returns the conditional request headers to revalidate a cached response (empty if it has no validators)."""
+        headers: Dict[str, str] = {}
+        if 'ETag' in response.headers:
+            headers['If-None-Match'] = response.headers['ETag']
+        if 'Last-Modified' in response.headers:
+            headers['If-Modified-Since'] = response.headers['Last-Modified']
+        return headers
+
+    def touch(self, key: str) -> None:
+        """Marks an entry as fresh (e.g. after the server answered 304 Not Modified)."""
+        now: float = time.time()
+        with self._lock:
+            self.connection.execute('UPDATE records SET stored_at = ?, accessed_at = ? WHERE key = ?', (now, now, key))
+
+    def set(
+        self,
+        key: str,
+        response: requests.Response,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """Stores a (successful) response, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (str): Cache key of the request.
+
+            response (requests.Response): The response to store.
+
+            headers (Optional[Mapping[str, str]]): Headers of the request (used to record its laboratory).
+        """
+        content: bytes = response.content
+        if len(content) > self.max_bytes:
+            return
+
+        stored_headers: Dict[str, str] = {
+            name: response.headers[name] for name in _STORED_HEADERS if name in response.headers
+        }
+        now: float = time.time()
+        with self._lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO records (key, host, lab, endpoint, url, status_code, headers, content, etag, '
+                'last_modified, size, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (
+                    key,
+                    urlparse(response.url).netloc,
+                    (headers or {}).get(_LAB_HEADER) or '',
+                    endpoint_template(response.url),
+                    response.url,
+                    response.status_code,
+                    serializers.dumps(stored_headers),
+                    content,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    len(content),
+                    now,
+                    now,
+                ),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        total_size: int = self.connection.execute('SELECT COALESCE(SUM(size), 0) FROM records').fetchone()[0]
+        if total_size <= self.max_bytes:
+            return
+
+        rows = self.connection.execute('SELECT key, size FROM records ORDER BY accessed_at ASC').fetchall()
+        evicted_keys = []
+        for key, size in rows:
+            if total_size <= self.max_bytes:
+                break
+            evicted_keys.append((key,))
+            total_size -= size
+        self.connection.executemany('DELETE FROM records WHERE key = ?', evicted_keys)
+
+    def invalidate_url(self, url: str) -> None:
+        """Removes the entries of a URL (with any query parameters), in every laboratory."""
+        base_url: str = url.split('?', 1)[0]
+        with self._lock:
+            self.connection.execute(
+                "DELETE FROM records WHERE url = ? OR url LIKE ? ESCAPE '\\'",
+                (base_url, base_url.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '?%'),
+            )
+
+    def clear(self) -> None:
+        """Removes all the entries."""
+        with self._lock:
+            self.connection.execute('DELETE FROM records')
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of entries and their total size (in bytes)."""
+        with self._lock:
+            count, size = self.connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM records').fetchone()
+        return {'entries': count, 'bytes': size}
+
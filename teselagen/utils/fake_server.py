@@ -0,0 +1,807 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Local stand-in TeselaGen API server, for offline load testing and benchmarks.
+
+`FakeTeselaGenServer` serves (synthetic) responses for the endpoints used by the clients, on a local port:
+
+- Authentication: `public/auth`, `login`, `info`, `public/status` and `laboratories`.
+- TEST: `assays`, `files`, `assays/{}/results`, `assay-subjects`, `assay-subjects/{}` and `metadata/{}`.
+- BUILD: `aliquots`, `samples` and `plates` (paged, with a `gqlFilter` on top-level fields, and sorted by `updatedAt` \
+  if requested), and their `{}` records. Records can be updated and deleted with `update_record` and `delete_record`.
+- DISCOVER: `get-model-datapoints` (in batches) and `crispr-grnas` (a task completed after a few polls).
+
+Records are generated deterministically from their index, so the server uses little memory however many records it
+serves. The number of records (hence of pages), the size of the records, the latency distribution (log-normal) and the
+rates of server errors (500) and of rate limiting responses (429, with a `Retry-After` header) are set with a
+`FakeServerConfig`. Any username and password are accepted, but the other endpoints require the returned token.
+
+Example:
+    >>> with FakeTeselaGenServer(FakeServerConfig(num_aliquots=10_000, latency_median=0.05)) as server:
+    ...     client = TeselaGenClient(host_url=server.host_url)
+    ...     client.update_token(client.create_token('user', 'password', '1d'), save_to_storage=False)
+    ...     aliquots = client.build.get_aliquots(pageSize=100)
+    >>> server.stats()
+
+It can also be run from the command line:
+
+    >>> python3 -m teselagen.utils.fake_server --port 8000 --num_aliquots 10000 --latency_median 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections import Counter
+from collections import defaultdict
+from dataclasses import asdict
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timezone
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import itertools
+import math
+import random
+import sys
+import threading
+import time
+from typing import Any, Literal, TYPE_CHECKING
+from urllib.parse import parse_qs
+from urllib.parse import urlsplit
+
+from teselagen.utils import serializers
+from teselagen.utils.metrics import endpoint_template
+from teselagen.utils.utils import parse_duration
+
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+    Handler = Callable[..., Tuple[int, Any]]
+
+# CONSTANTS
+DEFAULT_FAKE_SERVER_HOST: Literal['127.0.0.1'] = '127.0.0.1'
+
+# Endpoints that never fail, and that do not require a token.
+_PUBLIC_ENDPOINTS: Tuple[str, ...] = ('public/auth', 'public/status', 'login', 'register')
+# Timestamp of every generated record.
+_TIMESTAMP: str = '2020-08-05T15:24:35.291Z'
+_CRISPR_COMPLETED_STATUS: str = 'completed-successfully'
+# Laboratory selected by the API tests (see `conftest.py`).
+_TEST_LABORATORY_NAME: str = 'The Test Lab'
+
+
+@dataclass
+class FakeServerConfig:
+    """Configuration of a `FakeTeselaGenServer`.
+
+    Attributes:
+        num_laboratories (int): Number of laboratories. The first one is named "The Test Lab" (the laboratory of \
+            the API tests), and the others "Lab <id>".
+
+        num_assays (int): Number of assays.
+
+        files_per_assay (int): Number of (imported) files per assay.
+
+        results_per_file (int): Number of assay results per file.
+
+        num_assay_subjects (int): Number of assay subjects. Results are spread over them.
+
+        num_aliquots (int): Number of aliquots.
+
+        num_samples (int): Number of samples.
+
+        num_plates (int): Number of plates.
+
+        wells_per_plate (int): Number of aliquot containers per plate.
+
+        num_datapoints (int): Number of datapoints of each DISCOVER model.
+
+        record_padding (int): Size (in bytes) of a filler field added to every record, to grow the payloads.
+
+        max_page_size (Optional[int]): Largest page size served. Larger requested page sizes are truncated. None \
+            means no limit.
+
+        crispr_polls (int): Number of polls of a CRISPR guide RNAs task before it completes.
+
+        latency_median (float): Median latency (in seconds) of a response.
+
+        latency_sigma (float): Shape (standard deviation of the logarithm) of the log-normal latency distribution. \
+            0 means a constant latency.
+
+        error_rate (float): Fraction of the requests answered with a 500 error.
+
+        rate_limit_rate (float): Fraction of the requests answered with a 429 error.
+
+        retry_after (float): `Retry-After` (in seconds) of the 429 responses.
+
+        seed (int): Seed of the latencies and errors.
+    """
+
+    num_laboratories: int = 2
+    num_assays: int = 3
+    files_per_assay: int = 1
+    results_per_file: int = 1000
+    num_assay_subjects: int = 100
+    num_aliquots: int = 1000
+    num_samples: int = 1000
+    num_plates: int = 50
+    wells_per_plate: int = 96
+    num_datapoints: int = 1000
+    record_padding: int = 0
+    max_page_size: Optional[int] = None
+    crispr_polls: int = 1
+    latency_median: float = 0.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    seed: int = 0
+
+
+class FakeTeselaGenServer:
+    """Local HTTP server answering like the TeselaGen API, with synthetic records."""
+
+    def __init__(
+        self,
+        config: Optional[FakeServerConfig] = None,
+        host: str = DEFAULT_FAKE_SERVER_HOST,
+        port: int = 0,
+        api_token_name: str = 'x-tg-api-token',
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            config (Optional[FakeServerConfig]): Records, payloads, latencies and error rates. Defaults to \
+                `FakeServerConfig()`.
+
+            host (str): Host to listen on. Defaults to "127.0.0.1".
+
+            port (int): Port to listen on. 0 picks a free port. Defaults to 0.
+
+            api_token_name (str): Name of the header holding the token. Defaults to "x-tg-api-token".
+        """
+        self.config: FakeServerConfig = config if config is not None else FakeServerConfig()
+        self.api_token_name: str = api_token_name
+
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, str] = {}
+        self._task_ids = itertools.count(1)
+        self._task_polls: Dict[str, int] = {}
+        self._requests: Counter[str] = Counter()
+        self._errors: Counter[str] = Counter()
+        # `updatedAt` of the updated BUILD records, and indexes of the deleted ones, by collection.
+        self._updated_at: Dict[str, Dict[int, str]] = defaultdict(dict)
+        self._deleted: Dict[str, Set[int]] = defaultdict(set)
+
+        self._routes: Dict[Tuple[str, str], Handler] = {
+            ('PUT', 'public/auth'): self._create_token,
+            ('POST', 'login'): self._create_token,
+            ('GET', 'public/auth'): self._current_user,
+            ('GET', 'public/status'): lambda **_: (200, 'OK'),
+            ('GET', 'info'): lambda **_: (200, 'TeselaGen API (fake server)'),
+            ('GET', 'laboratories'): self._laboratories,
+            ('GET', 'assays'): self._assays,
+            ('GET', 'files'): self._files,
+            ('GET', 'assays/{}/results'): self._assay_results,
+            ('GET', 'assay-subjects'): self._assay_subjects,
+            ('GET', 'assay-subjects/{}'): self._assay_subject,
+            ('GET', 'metadata/*'): self._metadata,
+            ('GET', 'aliquots'): self._page_handler('aliquots', self.config.num_aliquots, self._aliquot),
+            ('GET', 'aliquots/{}'): self._record_handler('aliquots', self.config.num_aliquots, self._aliquot),
+            ('GET', 'samples'): self._page_handler('samples', self.config.num_samples, self._sample),
+            ('GET', 'samples/{}'): self._record_handler('samples', self.config.num_samples, self._sample),
+            ('GET', 'plates'): self._page_handler('plates', self.config.num_plates, self._plate),
+            ('GET', 'plates/{}'): self._record_handler('plates', self.config.num_plates, self._plate),
+            ('POST', 'get-model-datapoints'): self._model_datapoints,
+            ('POST', 'crispr-grnas'): self._submit_crispr_grnas,
+            ('GET', 'crispr-grnas/{}'): self._crispr_grnas_result,
+        }
+
+        self._httpd: Optional[_HTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._address: Tuple[str, int] = (host, port)
+
+    # Life cycle
+
+    @property
+    def host_url(self) -> str:
+        """URL to pass as `host_url` to `TeselaGenClient`."""
+        if self._httpd is None:
+            raise RuntimeError('The server is not started')
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> FakeTeselaGenServer:
+        """Starts serving in a background thread."""
+        if self._httpd is None:
+            self._httpd = _HTTPServer(self._address, _RequestHandler)
+            self._httpd.fake_server = self
+            self._thread = threading.Thread(target=self._httpd.serve_forever, name='teselagen-fake-server')
+            self._thread.daemon = True
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops serving, and releases the port."""
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> FakeTeselaGenServer:
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def serve_forever(self) -> None:
+        """Serves in the current thread, until interrupted."""
+        self.start()
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the number of requests, and of injected (500 and 429) errors, per endpoint (`<method> <endpoint \
+        template>`)."""
+        with self._lock:
+            return {'requests': dict(self._requests), 'errors': dict(self._errors)}
+
+    def reset_stats(self) -> None:
+        """Resets the request and error counters."""
+        with self._lock:
+            self._requests.clear()
+            self._errors.clear()
+
+    def update_record(
+        self,
+        collection: str,
+        index: int,
+        updated_at: Optional[str] = None,
+    ) -> None:
+        """Marks a BUILD record (of "aliquots", "samples" or "plates") as updated.
+
+        Args:
+            collection (str): Collection of the record.
+
+            index (int): Index (id) of the record.
+
+            updated_at (Optional[str]): New `updatedAt` of the record (ISO 8601). Defaults to the current time.
+        """
+        with self._lock:
+            self._updated_at[collection][index] = updated_at or (
+                datetime.now(tz=timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z'))
+
+    def delete_record(
+        self,
+        collection: str,
+        index: int,
+    ) -> None:
+        """Deletes a BUILD record (of "aliquots", "samples" or "plates")."""
+        with self._lock:
+            self._deleted[collection].add(index)
+
+    # Dispatch
+
+    def handle(
+        self,
+        method: str,
+        path: str,
+        headers: Dict[str, str],
+        body: bytes,
+    ) -> Tuple[int, Dict[str, str], bytes]:
+        """Answers a request.
+
+        Args:
+            method (str): HTTP method.
+
+            path (str): Path and query string of the request.
+
+            headers (Dict[str, str]): Headers of the request, with lower case names.
+
+            body (bytes): Body of the request.
+
+        Returns:
+            Tuple[int, Dict[str, str], bytes]: Status code, headers and body of the response.
+        """
+        url = urlsplit(path)
+        query: Dict[str, List[str]] = parse_qs(url.query)
+        segments: List[str] = [segment for segment in url.path.split('/') if segment]
+        if segments[:1] == ['tg-api']:
+            segments = segments[1:]
+        resource: str = '/'.join(segments)
+        template: str = endpoint_template(resource)
+        endpoint: str = f'{method} {template}'
+
+        handler: Optional[Handler] = self._routes.get((method, template))
+        if handler is None and len(segments) == 2:
+            handler = self._routes.get((method, f'{segments[0]}/*'))
+
+        latency, failure = self._sample_outcome(is_public=resource in _PUBLIC_ENDPOINTS)
+        with self._lock:
+            self._requests[endpoint] += 1
+            if failure is not None:
+                self._errors[endpoint] += 1
+        if latency > 0:
+            time.sleep(latency)
+
+        if failure == 429:
+            return _response(429, {'error': 'Too many requests'}, {'Retry-After': f'{self.config.retry_after:g}'})
+        if failure == 500:
+            return _response(500, {'error': 'Internal server error'})
+        if handler is None:
+            return _response(404, {'error': f'Cannot {method} /{resource}'})
+        if resource not in _PUBLIC_ENDPOINTS and headers.get(self.api_token_name.lower()) not in self._tokens:
+            return _response(401, 'unauthorized')
+
+        try:
+            payload: Any = serializers.loads(body) if body else None
+        except ValueError:
+            return _response(400, {'error': 'Invalid JSON body'})
+
+        status_code, content = handler(segments=segments, query=query, payload=payload)
+        return _response(status_code, content)
+
+    def _sample_outcome(self, is_public: bool) -> Tuple[float, Optional[int]]:
+        """Draws the latency of a response, and whether it fails (with a 429 or 500 status code)."""
+        config: FakeServerConfig = self.config
+        with self._lock:
+            latency: float = 0.0
+            if config.latency_median > 0:
+                latency = config.latency_median * math.exp(config.latency_sigma * self._random.gauss(0.0, 1.0))
+            draw: float = self._random.random()
+        if is_public:
+            return latency, None
+        if draw < config.rate_limit_rate:
+            return latency, 429
+        if draw < config.rate_limit_rate + config.error_rate:
+            return latency, 500
+        return latency, None
+
+    def _page_bounds(
+        self,
+        query: Dict[str, List[str]],
+        number_name: str = 'pageNumber',
+        size_name: str = 'pageSize',
+        default_size: int = 100,
+    ) -> Tuple[int, int]:
+        """Returns the (0-based) start and stop indexes of the requested page."""
+        page_number: int = max(1, int(query.get(number_name, ['1'])[0]))
+        page_size: int = max(0, int(query.get(size_name, [str(default_size)])[0]))
+        if self.config.max_page_size is not None:
+            page_size = min(page_size, self.config.max_page_size)
+        start: int = (page_number - 1) * page_size
+        return start, start + page_size
+
+    def _padding(self) -> Dict[str, str]:
+        return {'notes': 'x' * self.config.record_padding} if self.config.record_padding > 0 else {}
+
+    # Authentication
+
+    def _create_token(self, payload: Any, **_: Any) -> Tuple[int, Any]:
+        username: Optional[str] = (payload or {}).get('username') or (payload or {}).get('email')
+        if not username or not (payload or {}).get('password'):
+            return 401, {'error': 'Invalid credentials'}
+        expiration_date: datetime = datetime.now(timezone.utc) + parse_duration(payload.get('expiresIn') or '1w')
+        with self._lock:
+            token: str = f'fake-token-{len(self._tokens) + 1}'
+            self._tokens[token] = username
+        return 200, {'token': token, 'expirationDate': expiration_date.isoformat(timespec='milliseconds')}
+
+    def _current_user(self, **_: Any) -> Tuple[int, Any]:
+        return 200, {'id': '1', 'username': 'fake-user'}
+
+    def _laboratories(self, **_: Any) -> Tuple[int, Any]:
+        return 200, [{'id': str(i), 'name': _laboratory_name(i)} for i in range(1, self.config.num_laboratories + 1)]
+
+    # TEST
+
+    def _assays(self, **_: Any) -> Tuple[int, Any]:
+        return 200, [{'id': str(i), 'name': f'Assay {i}'} for i in range(1, self.config.num_assays + 1)]
+
+    def _files(self, query: Dict[str, List[str]], **_: Any) -> Tuple[int, Any]:
+        assay_ids: Sequence[str] = query.get('assayId') or [str(i) for i in range(1, self.config.num_assays + 1)]
+        files_per_assay: int = self.config.files_per_assay
+        return 200, [{
+            'id': str((int(assay_id) - 1) * files_per_assay + j + 1),
+            'name': f'File {j + 1} of Assay {assay_id}',
+            'assay': {
+                'id': assay_id,
+                'name': f'Assay {assay_id}',
+            },
+            'importStatus': 'FINISHED',
+        } for assay_id in assay_ids if 1 <= int(assay_id) <= self.config.num_assays for j in range(files_per_assay)]
+
+    def _assay_results(self, segments: List[str], query: Dict[str, List[str]], **_: Any) -> Tuple[int, Any]:
+        assay_id: int = int(segments[1])
+        if not 1 <= assay_id <= self.config.num_assays:
+            return 404, {'error': f'Assay {assay_id} not found'}
+        start, stop = self._page_bounds(query)
+        num_subjects: int = max(1, self.config.num_assay_subjects)
+        file_seed: int = int(query.get('fileId', ['1'])[0])
+        results: List[Dict[str, Any]] = [{
+            'assaySubjectId': str(i % num_subjects + 1),
+            'reference': {
+                'name': 'Time',
+                'value': i // num_subjects,
+                'unit': 'h',
+            },
+            'result': {
+                'name': 'OD600',
+                'value': round(((i + 1) * 7919 * file_seed % 1000) / 100, 2),
+                'unit': 'AU',
+            },
+            **self._padding(),
+        } for i in range(start, min(stop, self.config.results_per_file))]
+        return 200, {'name': f'Assay {assay_id}', 'results': results}
+
+    def _assay_subject_record(self, index: int) -> Dict[str, Any]:
+        return {
+            'id': str(index),
+            'name': f'Strain {index}',
+            'assaySubjectClass': {
+                'id': '1',
+                'name': 'Strain',
+            },
+            'descriptors': [{
+                'descriptorType': {
+                    'name': 'Promoter'
+                },
+                'value': f'P{index % 5}',
+            }, {
+                'descriptorType': {
+                    'name': 'Enzyme'
+                },
+                'value': f'E{index % 7}',
+            }],
+            **self._padding(),
+        }
+
+    def _assay_subjects(self, query: Dict[str, List[str]], **_: Any) -> Tuple[int, Any]:
+        ids: Sequence[str] = query.get('ids[]') or [str(i) for i in range(1, self.config.num_assay_subjects + 1)]
+        return 200, [
+            self._assay_subject_record(int(i)) for i in ids if 1 <= int(i) <= self.config.num_assay_subjects
+        ]
+
+    def _assay_subject(self, segments: List[str], **_: Any) -> Tuple[int, Any]:
+        index: int = int(segments[1])
+        if not 1 <= index <= self.config.num_assay_subjects:
+            return 404, {'error': f'Assay subject {index} not found'}
+        return 200, self._assay_subject_record(index)
+
+    def _metadata(self, segments: List[str], **_: Any) -> Tuple[int, Any]:
+        return 200, [{'id': str(i), 'name': f'{segments[1]} {i}'} for i in range(1, 11)]
+
+    # BUILD
+
+    def _aliquot(self, index: int) -> Dict[str, Any]:
+        return {
+            'id': str(index),
+            'user': {
+                'id': '1',
+                'username': 'fake-user',
+                '__typename': 'user',
+            },
+            'concentration': index % 100,
+            'concentrationUnitCode': 'ng_per_uL',
+            'volume': 10 + index % 90,
+            'volumetricUnitCode': 'uL',
+            'mass': None,
+            'massUnitCode': None,
+            'createdAt': _TIMESTAMP,
+            'updatedAt': _TIMESTAMP,
+            'sample': {
+                'id': str((index - 1) % max(1, self.config.num_samples) + 1),
+                'name': f'Sample {index}',
+                'material': {
+                    'id': str(index),
+                    'name': f'Material {index}',
+                    '__typename': 'material',
+                },
+                '__typename': 'sample',
+            },
+            'batch': None,
+            'lab': None,
+            'aliquotType': 'mixedAliquot',
+            'taggedItems': [],
+            '__typename': 'aliquot',
+            **self._padding(),
+        }
+
+    def _sample(self, index: int) -> Dict[str, Any]:
+        return {
+            'id': str(index),
+            'name': f'Sample {index}',
+            'status': None,
+            'sampleTypeCode': 'REGULAR_SAMPLE',
+            'sampleType': {
+                'code': 'REGULAR_SAMPLE',
+                'name': 'Regular Sample',
+                '__typename': 'sampleType',
+            },
+            'sampleFormulations': [],
+            'updatedAt': _TIMESTAMP,
+            'createdAt': _TIMESTAMP,
+            'taggedItems': [],
+            'material': {
+                'id': str(index),
+                'name': f'Material {index}',
+                '__typename': 'material',
+            },
+            'batch': None,
+            'lab': None,
+            'user': {
+                'id': '1',
+                'username': 'fake-user',
+                '__typename': 'user',
+            },
+            '__typename': 'sample',
+            **self._padding(),
+        }
+
+    def _plate(self, index: int) -> Dict[str, Any]:
+        wells_per_plate: int = self.config.wells_per_plate
+        return {
+            'id': str(index),
+            'name': f'Plate {index}',
+            'assigedPosition': None,
+            'createdAt': _TIMESTAMP,
+            'updatedAt': _TIMESTAMP,
+            'containerArrayType': {
+                'id': '1',
+                'name': f'{wells_per_plate} Well Plate',
+                'isPlate': True,
+                'maxWellVolume': 200,
+                'volumetricUnitCode': 'uL',
+                'containerFormatCode': f'{wells_per_plate}_WELL',
+                'aliquotContainerType': {
+                    'code': 'WELL'
+                },
+            },
+            'batch': None,
+            'lab': {
+                'id': '1',
+                'name': _laboratory_name(1),
+            },
+            'barcode': None,
+            'user': {
+                'id': '1',
+                'username': 'fake-user',
+            },
+            'aliquotContainers': [{
+                'id': f'{index}-{well}',
+                'name': f'Well {well + 1}',
+                'aliquotContainerType': {
+                    'code': 'WELL'
+                },
+                'barcode': None,
+                'additives': [],
+                'columnPosition': well % 12,
+                'rowPosition': well // 12,
+                'aliquot': self._aliquot((index - 1) * wells_per_plate + well + 1),
+            } for well in range(wells_per_plate)],
+            **self._padding(),
+        }
+
+    def _build_record(
+        self,
+        collection: str,
+        index: int,
+        make_record: Callable[[int], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """Returns a BUILD record, with its `updatedAt` if it has been updated."""
+        record: Dict[str, Any] = make_record(index)
+        updated_at: Optional[str] = self._updated_at[collection].get(index)
+        if updated_at is not None:
+            record['updatedAt'] = updated_at
+        return record
+
+    def _sorted_indexes(
+        self,
+        collection: str,
+        indexes: Iterable[int],
+        sort: str,
+    ) -> List[int]:
+        """Returns the indexes of the (not deleted) records, sorted by `updatedAt` if `sort` is "updatedAt" or \
+        "-updatedAt". Records never updated are the oldest ones, in the order of their indexes."""
+        with self._lock:
+            deleted: Set[int] = set(self._deleted[collection])
+            updated_at: Dict[int, str] = dict(self._updated_at[collection])
+        remaining: List[int] = [index for index in indexes if index not in deleted]
+        if sort.lstrip('-') != 'updatedAt' or not updated_at:
+            return remaining
+
+        updated: List[int] = sorted((index for index in remaining if index in updated_at),
+                                    key=lambda index: updated_at[index])
+        not_updated: List[int] = [index for index in remaining if index not in updated_at]
+        return list(reversed(updated)) + not_updated if sort.startswith('-') else not_updated + updated
+
+    def _page_handler(
+        self,
+        collection: str,
+        count: int,
+        make_record: Callable[[int], Dict[str, Any]],
+    ) -> Handler:
+        """Returns a handler of a paged endpoint, with records `1` to `count`."""
+
+        def handle_page(query: Dict[str, List[str]], **_: Any) -> Tuple[int, Any]:
+            start, stop = self._page_bounds(query)
+            sort: str = query.get('sort', [''])[0]
+            gql_filter: Any = serializers.loads(query['gqlFilter'][0]) if query.get('gqlFilter') else {}
+            if not gql_filter:
+                indexes: List[int] = self._sorted_indexes(collection, range(1, count + 1), sort=sort)
+                return 200, [self._build_record(collection, index, make_record) for index in indexes[start:stop]]
+
+            # Filter on top-level fields (e.g. `{"id": ["1", "10"]}`), paging over the matching records.
+            def matches(record: Dict[str, Any]) -> bool:
+                return all(
+                    str(record.get(key)) in ([str(v) for v in value] if isinstance(value, list) else [str(value)])
+                    for key, value in gql_filter.items())
+
+            if set(gql_filter) == {'id'}:
+                ids: List[Any] = gql_filter['id'] if isinstance(gql_filter['id'], list) else [gql_filter['id']]
+                candidates: Iterable[int] = (int(i) for i in sorted({int(i) for i in ids}) if 1 <= int(i) <= count)
+            else:
+                candidates = range(1, count + 1)
+            records = (
+                record for record in (self._build_record(collection, index, make_record)
+                                      for index in self._sorted_indexes(collection, candidates, sort=sort))
+                if matches(record))
+            return 200, list(itertools.islice(records, start, stop))
+
+        return handle_page
+
+    def _record_handler(
+        self,
+        collection: str,
+        count: int,
+        make_record: Callable[[int], Dict[str, Any]],
+    ) -> Handler:
+        """Returns a handler of the records `1` to `count` fetched by id."""
+
+        def handle_record(segments: List[str], **_: Any) -> Tuple[int, Any]:
+            index: int = int(segments[1])
+            if not 1 <= index <= count or index in self._deleted[collection]:
+                return 404, {'error': f'Record {index} not found'}
+            return 200, self._build_record(collection, index, make_record)
+
+        return handle_record
+
+    # DISCOVER
+
+    def _model_datapoints(self, payload: Any, **_: Any) -> Tuple[int, Any]:
+        batch_size: int = int(payload['batchSize'])
+        if self.config.max_page_size is not None:
+            batch_size = min(batch_size, self.config.max_page_size)
+        start: int = int(payload['batchNumber']) * batch_size
+        return 200, {
+            'message': 'Submission success.',
+            'data': [{
+                'datapoint': {
+                    'id': str(i + 1),
+                    'descriptor_1': f'A{i % 3}',
+                    'descriptor_2': f'B{i % 5}',
+                    'target': round((i * 7919 % 1000) / 10, 1),
+                    'set_tag': 'training',
+                    'PCA_1': 0.0,
+                    **self._padding(),
+                }
+            } for i in range(start, min(start + batch_size, self.config.num_datapoints))],
+        }
+
+    def _submit_crispr_grnas(self, **_: Any) -> Tuple[int, Any]:
+        task_id: str = str(next(self._task_ids))
+        with self._lock:
+            self._task_polls[task_id] = 0
+        return 200, {'taskId': task_id, 'message': 'Submission success.'}
+
+    def _crispr_grnas_result(self, segments: List[str], **_: Any) -> Tuple[int, Any]:
+        task_id: str = segments[1]
+        with self._lock:
+            if task_id not in self._task_polls:
+                return 404, {'error': f'Task {task_id} not found'}
+            self._task_polls[task_id] += 1
+            polls: int = self._task_polls[task_id]
+        if polls < self.config.crispr_polls:
+            return 200, {'status': 'in-progress'}
+        return 200, {
+            'status': _CRISPR_COMPLETED_STATUS,
+            'data': {
+                'guides': [{
+                    'sequence': 'ACGT' * 5,
+                    'start': 10 * i,
+                    'end': 10 * i + 20,
+                    'forward': True,
+                    'pam': 'AGG',
+                    'onTargetScore': 60.0 + i,
+                    'offTargetScore': 90.0 - i,
+                } for i in range(10)],
+                'target_indexes': [0, 200],
+            },
+        }
+
+
+def _laboratory_name(lab_id: int) -> str:
+    return _TEST_LABORATORY_NAME if lab_id == 1 else f'Lab {lab_id}'
+
+
+def _response(
+    status_code: int,
+    content: Any,
+    headers: Optional[Dict[str, str]] = None,
+) -> Tuple[int, Dict[str, str], bytes]:
+    """Encodes a response: strings as text, anything else as JSON."""
+    if isinstance(content, str):
+        return status_code, {'Content-Type': 'text/html; charset=utf-8', **(headers or {})}, content.encode('utf-8')
+    json_headers: Dict[str, str] = {'Content-Type': 'application/json; charset=utf-8', **(headers or {})}
+    return status_code, json_headers, serializers.dumps(content)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    fake_server: FakeTeselaGenServer
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive connections, as the platform (and connection pooling) would use.
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately: without this, Nagle's algorithm delays every response by ~40ms.
+    disable_nagle_algorithm = True
+    server: _HTTPServer
+
+    def _handle(self) -> None:
+        length: int = int(self.headers.get('Content-Length') or 0)
+        body: bytes = self.rfile.read(length) if length else b''
+        headers: Dict[str, str] = {name.lower(): value for name, value in self.headers.items()}
+        status_code, response_headers, content = self.server.fake_server.handle(
+            method=self.command,
+            path=self.path,
+            headers=headers,
+            body=body,
+        )
+        self.send_response(status_code)
+        for name, value in response_headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle  # noqa: N815
+
+    def log_message(self, format: str, *args: Any) -> None:  # pylint: disable=redefined-builtin
+        """Silences the per-request log lines."""
+
+
+def args_parser(args_in: Sequence[str] | None) -> argparse.Namespace:
+    """Parses arguments from the command line tool."""
+    parser = argparse.ArgumentParser(
+        prog='fake_server',
+        description='Local stand-in TeselaGen API server, for offline load testing and benchmarks.',
+    )
+    parser.add_argument('--host', default=DEFAULT_FAKE_SERVER_HOST, type=str, help='Host to listen on')
+    parser.add_argument('--port', default=8000, type=int, help='Port to listen on')
+    for name, value in asdict(FakeServerConfig()).items():
+        parser.add_argument(
+            f'--{name}',
+            default=value,
+            type=float if isinstance(value, float) else int,
+            help=f'See `FakeServerConfig` (default: {value})',
+        )
+    return parser.parse_args(args_in)
+
+
+# Command line tool, serves until interrupted.
+if __name__ == '__main__':
+    args = vars(args_parser(sys.argv[1:]))
+    server = FakeTeselaGenServer(host=args.pop('host'), port=args.pop('port'), config=FakeServerConfig(**args))
+    server.start()
+    print(f'Serving the TeselaGen API at {server.host_url}')
+    server.serve_forever()
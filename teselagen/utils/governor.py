@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Adaptive, rate-limit-aware concurrency control for the teselagen package.
+
+A `ConcurrencyGovernor` is shared by all the threads (and module clients) that send requests through the same
+`TeselaGenSession`. It:
+
+- bounds the number of requests in flight with an AIMD (additive increase, multiplicative decrease) limit, which \
+  grows slowly while the server answers and is halved when it answers 429 (Too Many Requests) or 503 (Service \
+  Unavailable),
+- optionally bounds the request rate with a token bucket,
+- honors the `Retry-After` header, pausing every request (not only the throttled one) for the requested time, and
+- retries idempotent requests (GET, HEAD, OPTIONS) that failed with a transient error, with jittered exponential \
+  backoff.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+import random
+import threading
+import time
+from typing import FrozenSet, Literal, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterator, Optional
+
+# CONSTANTS
+DEFAULT_INITIAL_LIMIT: Literal[8] = 8
+DEFAULT_MIN_LIMIT: Literal[1] = 1
+DEFAULT_MAX_LIMIT: Literal[64] = 64
+DEFAULT_MAX_RETRIES: Literal[5] = 5
+
+# Status codes after which (idempotent) requests are retried.
+RETRY_STATUS_CODES: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+# Status codes meaning the server is overloaded, after which the concurrency limit is decreased.
+BACKOFF_STATUS_CODES: FrozenSet[int] = frozenset({429, 503})
+IDEMPOTENT_METHODS: FrozenSet[str] = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses the value of a `Retry-After` header.
+
+    Args:
+        value (Optional[str]): Header value. Either a number of seconds or an HTTP date.
+
+    Returns:
+        Optional[float]: Number of seconds to wait, or `None` if the value is missing or invalid.
+    """
+    if value is None or value.strip() == '':
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_date: datetime = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_date - datetime.now(tz=timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Thread-safe token bucket rate limiter."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+    ) -> None:
+        """Initialize the bucket.
+
+        Args:
+            rate (float): Number of tokens added per second (the sustained request rate).
+
+            capacity (Optional[float]): Maximum number of tokens (the burst size). Defaults to `rate` (one second of \
+                requests).
+        """
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, got {rate}')
+
+        self.rate: float = float(rate)
+        self.capacity: float = float(rate if capacity is None else capacity)
+
+        self._tokens: float = self.capacity
+        self._updated_at: float = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Takes `tokens` from the bucket, blocking until they are available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+
+                wait_time: float = (tokens - self._tokens) / self.rate
+
+            time.sleep(wait_time)
+
+
+class ConcurrencyGovernor:
+    """Adaptive concurrency limit, rate limit and retry policy shared by every request of a session."""
+
+    def __init__(
+        self,
+        initial_limit: int = DEFAULT_INITIAL_LIMIT,
+        min_limit: int = DEFAULT_MIN_LIMIT,
+        max_limit: int = DEFAULT_MAX_LIMIT,
+        additive_increase: float = 1.0,
+        multiplicative_decrease: float = 0.5,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+    ) -> None:
+        """Initialize the governor.
+
+        Args:
+            initial_limit (int): Initial number of requests allowed in flight. Defaults to 8.
+
+            min_limit (int): Lower bound of the adaptive limit. Defaults to 1.
+
+            max_limit (int): Upper bound of the adaptive limit. Defaults to 64.
+
+            additive_increase (float): How much the limit grows after a full window (`limit` requests) of \
+                successful responses. Defaults to 1.
+
+            multiplicative_decrease (float): Factor applied to the limit after a 429 or 503 response. \
+                Defaults to 0.5.
+
+            rate (Optional[float]): Maximum sustained number of requests per second. Defaults to None (no rate \
+                limit).
+
+            burst (Optional[float]): Maximum burst of requests when `rate` is set. Defaults to `rate`.
+
+            max_retries (int): Maximum number of retries of an idempotent request. Use 0 to disable retries. \
+                Defaults to 5.
+
+            backoff_base (float): Base delay (in seconds) of the exponential backoff. Defaults to 0.5.
+
+            backoff_max (float): Maximum delay (in seconds) between two attempts. Defaults to 30.
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError('Limits must satisfy: 1 <= min_limit <= initial_limit <= max_limit')
+
+        self.min_limit: int = min_limit
+        self.max_limit: int = max_limit
+        self.additive_increase: float = additive_increase
+        self.multiplicative_decrease: float = multiplicative_decrease
+        self.max_retries: int = max_retries
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+
+        self._limit: float = float(initial_limit)
+        self._in_flight: int = 0
+        self._paused_until: float = 0.0
+        self._condition = threading.Condition()
+        self._bucket: Optional[TokenBucket] = None if rate is None else TokenBucket(rate=rate, capacity=burst)
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return max(self.min_limit, int(self._limit))
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the settings (and the current limit) are pickled: requests in flight belong to the pickling process.
+        return {
+            'initial_limit': self.limit,
+            'min_limit': self.min_limit,
+            'max_limit': self.max_limit,
+            'additive_increase': self.additive_increase,
+            'multiplicative_decrease': self.multiplicative_decrease,
+            'rate': self._bucket.rate if self._bucket is not None else None,
+            'burst': self._bucket.capacity if self._bucket is not None else None,
+            'max_retries': self.max_retries,
+            'backoff_base': self.backoff_base,
+            'backoff_max': self.backoff_max,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc] # pylint: disable=unnecessary-dunder-call
+
+    @property
+    def in_flight(self) -> int:
+        """Current number of requests in flight."""
+        return self._in_flight
+
+    def acquire(self) -> None:
+        """Blocks until a new request is allowed to be sent."""
+        with self._condition:
+            while True:
+                pause: float = self._paused_until - time.monotonic()
+                if pause > 0:
+                    self._condition.wait(timeout=pause)
+                elif self._in_flight >= self.limit:
+                    self._condition.wait()
+                else:
+                    break
+            self._in_flight += 1
+
+        if self._bucket is not None:
+            self._bucket.acquire()
+
+    def release(self) -> None:
+        """Signals that a request has finished."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self) -> Iterator[None]:
+        """Context manager that holds a request slot while its block runs."""
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def on_response(
+        self,
+        status_code: int,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Adapts the concurrency limit to a response.
+
+        Args:
+            status_code (int): Status code of the response.
+
+            retry_after (Optional[float]): Parsed `Retry-After` header (in seconds), if any. Every new request is \
+                paused until it elapses.
+        """
+        with self._condition:
+            if status_code in BACKOFF_STATUS_CODES:
+                self._limit = max(float(self.min_limit), self._limit * self.multiplicative_decrease)
+                if retry_after is not None:
+                    self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            elif status_code < 500:
+                self._limit = min(float(self.max_limit), self._limit + self.additive_increase / self._limit)
+            self._condition.notify_all()
+
+    def should_retry(
+        self,
+        method: str,
+        status_code: int,
+        attempt: int,
+    ) -> bool:
+        """Whether a request should be sent again.
+
+        Args:
+            method (str): HTTP method of the request.
+
+            status_code (int): Status code of the last response.
+
+            attempt (int): Number of retries already made.
+
+        Returns:
+            bool: `True` if the request is idempotent, failed with a transient error and has retries left.
+        """
+        return all((
+            method.upper() in IDEMPOTENT_METHODS,
+            status_code in RETRY_STATUS_CODES,
+            attempt < self.max_retries,
+        ))
+
+    def backoff(
+        self,
+        attempt: int,
+        retry_after: Optional[float] = None,
+    ) -> float:
+        """Returns the time (in seconds) to wait before the next attempt.
+
+        Args:
+            attempt (int): Number of retries already made.
+
+            retry_after (Optional[float]): Parsed `Retry-After` header (in seconds), if any. It takes precedence \
+                over the exponential backoff.
+
+        Returns:
+            float: `retry_after` if given, or an exponential backoff with full jitter otherwise.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))  # noqa: S311
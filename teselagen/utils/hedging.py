@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Hedged requests for the teselagen package.
+
+Tail latency is often dominated by a few slow server responses. With a `HedgingPolicy` attached to a session, a GET
+request that has not been answered after a delay (a percentile of the recent latencies of its endpoint) is sent a
+second time. The first response wins, and the other request is cancelled if it has not started yet, or its response is
+discarded as soon as it arrives.
+
+Hedges are capped by a budget: at most `budget` (e.g. 5%) extra requests, so hedging never adds more than a small
+fraction of load to the server.
+
+Example:
+    >>> client = TeselaGenClient(hedging=HedgingPolicy(percentile=95, budget=0.05))
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+import math
+import threading
+import time
+from typing import Literal, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+    from typing import Any, Callable, Deque, Dict, Optional, Tuple, TypeVar, Union
+
+    import requests
+
+    # Result of a hedged request: a response, or a response and its number of retries.
+    R = TypeVar('R', requests.Response, Tuple[requests.Response, int])
+
+# CONSTANTS
+DEFAULT_HEDGING_PERCENTILE: Literal[95] = 95
+DEFAULT_HEDGING_MAX_WORKERS: Literal[32] = 32
+
+
+class HedgingPolicy:
+    """Thread-safe hedging policy for idempotent requests."""
+
+    def __init__(
+        self,
+        percentile: float = DEFAULT_HEDGING_PERCENTILE,
+        budget: float = 0.05,
+        min_delay: float = 0.05,
+        initial_delay: float = 2.0,
+        min_samples: int = 20,
+        window: int = 200,
+        max_workers: int = DEFAULT_HEDGING_MAX_WORKERS,
+    ) -> None:
+        """Initialize the policy.
+
+        Args:
+            percentile (float): Percentile (0 to 100) of the recent latencies of an endpoint after which a hedge is \
+                sent. Defaults to 95.
+
+            budget (float): Maximum number of hedges, as a fraction of the number of requests. Defaults to 0.05.
+
+            min_delay (float): Minimum delay (in seconds) before sending a hedge. Defaults to 0.05.
+
+            initial_delay (float): Delay (in seconds) used until an endpoint has `min_samples` latencies. \
+                Defaults to 2.
+
+            min_samples (int): Number of latencies needed to compute the percentile of an endpoint. Defaults to 20.
+
+            window (int): Number of recent latencies kept per endpoint. Defaults to 200.
+
+            max_workers (int): Number of threads sending the requests and their hedges. Use at least twice the \
+                number of threads sharing the client. Defaults to 32.
+        """
+        if not 0 < percentile < 100:
+            raise ValueError(f'percentile must be between 0 and 100, got {percentile}')
+
+        self.percentile: float = percentile
+        self.budget: float = budget
+        self.min_delay: float = min_delay
+        self.initial_delay: float = initial_delay
+        self.min_samples: int = min_samples
+        self.window: int = window
+        self.max_workers: int = max_workers
+
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.window))
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._requests: int = 0
+        self._hedges: int = 0
+        self._hedge_wins: int = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the settings are pickled: the latencies, counters and worker threads belong to the pickling process.
+        return {
+            'percentile': self.percentile,
+            'budget': self.budget,
+            'min_delay': self.min_delay,
+            'initial_delay': self.initial_delay,
+            'min_samples': self.min_samples,
+            'window': self.window,
+            'max_workers': self.max_workers,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc] # pylint: disable=unnecessary-dunder-call
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Executor sending the requests and their hedges (created on first use)."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='teselagen-hedge')
+            return self._executor
+
+    def delay(self, endpoint: str) -> float:
+        """Returns the time (in seconds) to wait for a response of `endpoint` before sending a hedge."""
+        with self._lock:
+            latencies = sorted(self._latencies[endpoint])
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        index: int = min(len(latencies) - 1, math.ceil(self.percentile / 100 * len(latencies)) - 1)
+        return max(self.min_delay, latencies[index])
+
+    def observe(self, endpoint: str, latency: float) -> None:
+        """Records the latency (in seconds) of a response of `endpoint`."""
+        with self._lock:
+            self._latencies[endpoint].append(latency)
+
+    def _acquire_hedge(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self.budget * self._requests:
+                return False
+            self._hedges += 1
+            return True
+
+    def send(
+        self,
+        endpoint: str,
+        request: Callable[[], R],
+    ) -> R:
+        """Sends a request, hedging it if it is slower than the delay of its endpoint (and the budget allows it).
+
+        Args:
+            endpoint (str): Endpoint (template) of the request, whose latencies determine the hedging delay.
+
+            request (Callable[[], R]): Sends the request, and returns its response, or its response and number of \
+                retries (as `TeselaGenSession` does). It may be called twice, concurrently.
+
+        Returns:
+            R: The result of the first request to respond. The response of the other one is closed.
+        """
+        with self._lock:
+            self._requests += 1
+
+        start: float = time.perf_counter()
+        primary: Future[R] = self.executor.submit(request)
+        try:
+            response = primary.result(timeout=self.delay(endpoint))
+        except FutureTimeoutError:
+            pass
+        else:
+            self.observe(endpoint, time.perf_counter() - start)
+            return response
+
+        if not self._acquire_hedge():
+            response = primary.result()
+            self.observe(endpoint, time.perf_counter() - start)
+            return response
+
+        hedge: Future[R] = self.executor.submit(request)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in done if future.exception() is None), None)
+            if winner is not None or not pending:
+                break
+
+        for future in (primary, hedge):
+            if future is not winner:
+                _discard(future)
+
+        if winner is None:
+            # Both requests failed: raise the error of the original request.
+            return primary.result()
+
+        self.observe(endpoint, time.perf_counter() - start)
+        if winner is hedge:
+            with self._lock:
+                self._hedge_wins += 1
+        return winner.result()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of requests, hedges sent, and hedges that answered first."""
+        with self._lock:
+            return {'requests': self._requests, 'hedges': self._hedges, 'hedge_wins': self._hedge_wins}
+
+    def shutdown(self) -> None:
+        """Releases the threads of the executor."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+def _response_of(result: Union[requests.Response, Tuple[requests.Response, int]]) -> requests.Response:
+    """Returns the response of the result of a hedged request."""
+    return result[0] if isinstance(result, tuple) else result
+
+
+def _discard(future: Future[R]) -> None:
+    """Cancels a losing request if it has not started yet, or closes its response once it arrives."""
+    if future.cancel():
+        return
+
+    def close_response(done_future: Future[R]) -> None:
+        if not done_future.cancelled() and done_future.exception() is None:
+            _response_of(done_future.result()).close()
+
+    future.add_done_callback(close_response)
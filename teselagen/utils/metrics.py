@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Per-endpoint request metrics for the teselagen package.
+
+A `MetricsRegistry` is attached to the HTTP session of each `TeselaGenClient` (see `client.metrics`). Every request is
+recorded under its endpoint template, i.e. the URL path with the record ids replaced by `{}` (for example
+`GET assays/{}/results`), together with its latency, the bytes sent and received, the number of retries and
+whether it failed.
+
+The bytes received by the requests sent within a block of code (in the current thread or task) can also be counted,
+with `count_transfers`.
+
+Example:
+    >>> client.test.get_assay_results(assay_id='1')
+    >>> client.metrics.snapshot()['GET assays/{}/results']['count']
+    1
+    >>> print(client.metrics.to_prometheus())
+"""
+
+from __future__ import annotations
+
+import bisect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+import re
+import threading
+from typing import Tuple, TYPE_CHECKING
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterator, List, Optional
+
+    import requests
+
+# CONSTANTS
+# Upper bounds (in seconds) of the latency histogram buckets. An implicit `+Inf` bucket follows the last one.
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Path segments that identify a record: integers, UUIDs and long hexadecimal (e.g. Mongo) ids.
+_ID_SEGMENT_PATTERN = re.compile(
+    r'\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{16,}',
+    flags=re.IGNORECASE,
+)
+_API_PATH_PREFIX: str = '/tg-api/'
+
+
+def endpoint_template(url: str) -> str:
+    """Returns the endpoint template of a URL.
+
+    The scheme, host, query string and the `tg-api` prefix are dropped, and the record ids are replaced by `{}`.
+
+    Args:
+        url (str): The URL of a request.
+
+    Returns:
+        str: The endpoint template (for example `assays/{}/results`).
+    """
+    path: str = urlparse(url).path
+    if _API_PATH_PREFIX in path:
+        path = path.split(_API_PATH_PREFIX, 1)[1]
+    segments: List[str] = [
+        '{}' if _ID_SEGMENT_PATTERN.fullmatch(segment) else segment for segment in path.split('/') if segment
+    ]
+    return '/'.join(segments)
+
+
+@dataclass
+class EndpointMetrics:
+    """Metrics of one endpoint template (and HTTP method)."""
+
+    method: str
+    endpoint: str
+    buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS
+    count: int = 0
+    errors: int = 0
+    retries: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    latency_sum: float = 0.0
+    latency_max: float = 0.0
+    # Number of requests per latency bucket (not cumulative). The last item is the `+Inf` bucket.
+    latency_counts: List[int] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.latency_counts:
+            self.latency_counts = [0] * (len(self.buckets) + 1)
+
+    def observe(
+        self,
+        latency: float,
+        bytes_sent: int,
+        bytes_received: int,
+        retries: int,
+        error: bool,
+    ) -> None:
+        """Adds a request to the metrics."""
+        self.count += 1
+        self.errors += int(error)
+        self.retries += retries
+        self.bytes_sent += bytes_sent
+        self.bytes_received += bytes_received
+        self.latency_sum += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.latency_counts[bisect.bisect_left(self.buckets, latency)] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the metrics as a (JSON serializable) dictionary."""
+        return {
+            'method': self.method,
+            'endpoint': self.endpoint,
+            'count': self.count,
+            'errors': self.errors,
+            'retries': self.retries,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'latency_sum': self.latency_sum,
+            'latency_mean': self.latency_sum / self.count if self.count else 0.0,
+            'latency_max': self.latency_max,
+            'latency_histogram': {
+                **{str(bound): count for bound, count in zip(self.buckets, self.latency_counts)},
+                '+Inf': self.latency_counts[-1],
+            },
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe registry of per-endpoint request metrics."""
+
+    def __init__(
+        self,
+        buckets: Tuple[float, ...] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        """Initialize the registry.
+
+        Args:
+            buckets (Tuple[float, ...]): Sorted upper bounds (in seconds) of the latency histogram buckets. Defaults \
+                to `DEFAULT_LATENCY_BUCKETS`.
+        """
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the settings are pickled: each process records its own requests.
+        return {'buckets': self.buckets}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc] # pylint: disable=unnecessary-dunder-call
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        latency: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        retries: int = 0,
+        error: bool = False,
+    ) -> None:
+        """Records a request.
+
+        Args:
+            method (str): HTTP method of the request.
+
+            url (str): URL of the request. It is recorded under its endpoint template.
+
+            latency (float): Total duration (in seconds) of the request, including retries.
+
+            bytes_sent (int): Size (in bytes) of the request body.
+
+            bytes_received (int): Size (in bytes) of the response body.
+
+            retries (int): Number of times the request was retried.
+
+            error (bool): Whether the request failed (it raised, or its final response was not successful).
+        """
+        key: Tuple[str, str] = (method.upper(), endpoint_template(url))
+        with self._lock:
+            if key not in self._endpoints:
+                self._endpoints[key] = EndpointMetrics(method=key[0], endpoint=key[1], buckets=self.buckets)
+            self._endpoints[key].observe(
+                latency=latency,
+                bytes_sent=bytes_sent,
+                bytes_received=bytes_received,
+                retries=retries,
+                error=error,
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Returns a copy of the current metrics, keyed by `'<METHOD> <endpoint template>'`."""
+        with self._lock:
+            return self._snapshot()
+
+    def reset(self) -> Dict[str, Dict[str, Any]]:
+        """Clears the metrics.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: A snapshot of the metrics before they were cleared.
+        """
+        with self._lock:
+            snapshot = self._snapshot()
+            self._endpoints.clear()
+        return snapshot
+
+    def _snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {f'{method} {endpoint}': metrics.to_dict() for (method, endpoint), metrics in self._endpoints.items()}
+
+    def slowest(self, n: int = 10) -> List[Dict[str, Any]]:
+        """Returns the metrics of the `n` endpoints with the highest total latency."""
+        return sorted(self.snapshot().values(), key=lambda metrics: metrics['latency_sum'], reverse=True)[:n]
+
+    def to_prometheus(self, prefix: str = 'teselagen') -> str:
+        """Exports the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): Prefix of the metric names. Defaults to "teselagen".
+
+        Returns:
+            str: The metrics, ready to be served to (or pushed to) Prometheus.
+        """
+        with self._lock:
+            endpoints: List[EndpointMetrics] = list(self._endpoints.values())
+            counters: Dict[str, List[Tuple[str, int]]] = {
+                'requests_total': [],
+                'request_errors_total': [],
+                'request_retries_total': [],
+                'request_sent_bytes_total': [],
+                'request_received_bytes_total': [],
+            }
+            histogram: List[str] = []
+
+            for metrics in endpoints:
+                labels: str = f'method="{metrics.method}",endpoint="{metrics.endpoint}"'
+                counters['requests_total'].append((labels, metrics.count))
+                counters['request_errors_total'].append((labels, metrics.errors))
+                counters['request_retries_total'].append((labels, metrics.retries))
+                counters['request_sent_bytes_total'].append((labels, metrics.bytes_sent))
+                counters['request_received_bytes_total'].append((labels, metrics.bytes_received))
+
+                cumulative_count: int = 0
+                for bound, count in zip((*metrics.buckets, '+Inf'), metrics.latency_counts):
+                    cumulative_count += count
+                    histogram.append(
+                        f'{prefix}_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative_count}')
+                histogram.append(f'{prefix}_request_duration_seconds_sum{{{labels}}} {metrics.latency_sum}')
+                histogram.append(f'{prefix}_request_duration_seconds_count{{{labels}}} {metrics.count}')
+
+        lines: List[str] = []
+        for name, samples in counters.items():
+            lines.append(f'# TYPE {prefix}_{name} counter')
+            lines.extend(f'{prefix}_{name}{{{labels}}} {value}' for labels, value in samples)
+        lines.append(f'# TYPE {prefix}_request_duration_seconds histogram')
+        lines.extend(histogram)
+
+        return '\n'.join(lines) + '\n'
+
+
+def body_size(body: Optional[Any]) -> int:
+    """Returns the size (in bytes) of a prepared request body, or 0 if it is unknown (e.g. a stream)."""
+    if isinstance(body, bytes):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    return 0
+
+
+def response_size(
+    response: requests.Response,
+    stream: bool = False,
+) -> int:
+    """Returns the size (in bytes) of a response body. The body of streamed responses is not read, so only its \
+    declared length is returned."""
+    return int(response.headers.get('Content-Length', 0)) if stream else len(response.content)
+
+
+@dataclass
+class TransferCounter:
+    """Bytes received by the requests sent within `count_transfers`."""
+
+    bytes_received: int = 0
+
+
+# Counters of the (nested) `count_transfers` blocks of the current context.
+_transfer_counters: ContextVar[Tuple[TransferCounter, ...]] = ContextVar('teselagen_transfer_counters', default=())
+
+
+@contextmanager
+def count_transfers() -> Iterator[TransferCounter]:
+    """Counts the bytes received by the requests sent by the sessions within the block (in the current context). \
+    Blocks can be nested.
+
+    Example:
+        >>> with count_transfers() as counter:
+        ...     client.build.get_aliquots(pageSize=1000)
+        >>> counter.bytes_received
+    """
+    counter = TransferCounter()
+    token = _transfer_counters.set((*_transfer_counters.get(), counter))
+    try:
+        yield counter
+    finally:
+        _transfer_counters.reset(token)
+
+
+def record_transfer(bytes_received: int) -> None:
+    """Adds the bytes received by a request to the counters of the current context (if any)."""
+    for counter in _transfer_counters.get():
+        counter.bytes_received += bytes_received
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Adaptive page sizes for the paged endpoints of the teselagen package.
+
+Small pages waste round-trips, and large pages are slow to produce, transfer and parse, and may time out. An
+`AdaptivePageSize` picks the size of each page from the latency and payload size of the previous ones:
+
+- the page size is doubled while pages are returned in full, in less than half of `target_latency`, with less than \
+  half of `max_page_bytes`, and doubling it has not lowered the throughput (records per second) before,
+- it is halved when a page takes longer than `target_latency` or is larger than `max_page_bytes`, and
+- it is halved when a page fails (e.g. times out), and the page is requested again.
+
+Page sizes are the initial size multiplied or divided by powers of two, between `min_size` and `max_size`, and the
+size is only changed when the number of records already read is a multiple of the new size. So pages of different
+sizes never overlap nor skip records. The initial size must be served in full by the server: a page shorter than a
+larger (never fully served) size may come from a server capping the page size, so it is requested again with half the
+size.
+
+Example:
+    >>> page_sizer = AdaptivePageSize(min_size=50, max_size=5000, target_latency=1.0)
+    >>> for aliquot in client.build.iter_aliquots(page_sizer=page_sizer):
+    ...     ...
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Literal, TYPE_CHECKING
+
+from teselagen.utils.metrics import count_transfers
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, TypeVar
+
+    T = TypeVar('T')
+
+# CONSTANTS
+DEFAULT_INITIAL_PAGE_SIZE: Literal[100] = 100
+DEFAULT_MIN_PAGE_SIZE: Literal[25] = 25
+DEFAULT_MAX_PAGE_SIZE: Literal[3200] = 3200
+DEFAULT_TARGET_LATENCY: float = 2.0
+DEFAULT_MAX_PAGE_BYTES: int = 16 * 1024 * 1024
+
+
+class AdaptivePageSize:
+    """Thread-safe controller of the size of the pages requested from a paged endpoint."""
+
+    def __init__(
+        self,
+        initial_size: int = DEFAULT_INITIAL_PAGE_SIZE,
+        min_size: int = DEFAULT_MIN_PAGE_SIZE,
+        max_size: int = DEFAULT_MAX_PAGE_SIZE,
+        target_latency: float = DEFAULT_TARGET_LATENCY,
+        max_page_bytes: int = DEFAULT_MAX_PAGE_BYTES,
+        max_failures: int = 3,
+        smoothing: float = 0.5,
+    ) -> None:
+        """Initialize the controller.
+
+        Args:
+            initial_size (int): Size of the first page. The server must serve pages of this size in full. \
+                Defaults to 100.
+
+            min_size (int): Lower bound of the page size. Defaults to 25.
+
+            max_size (int): Upper bound of the page size. Defaults to 3200.
+
+            target_latency (float): Maximum time (in seconds) to get a page. Defaults to 2.
+
+            max_page_bytes (int): Maximum size (in bytes) of the response of a page. Defaults to 16 MiB.
+
+            max_failures (int): Number of consecutive failures of a page after which the error is raised. \
+                Defaults to 3.
+
+            smoothing (float): Weight (0 to 1) of the last page in the throughput of its page size (an exponential \
+                moving average). Defaults to 0.5.
+        """
+        if not 1 <= min_size <= initial_size <= max_size:
+            raise ValueError('Page sizes must satisfy: 1 <= min_size <= initial_size <= max_size')
+
+        self.initial_size: int = initial_size
+        self.min_size: int = min_size
+        self.max_size: int = max_size
+        self.target_latency: float = target_latency
+        self.max_page_bytes: int = max_page_bytes
+        self.max_failures: int = max_failures
+        self.smoothing: float = smoothing
+
+        self._size: int = initial_size
+        # Largest page size served in full, and largest page size allowed (lowered when the server caps it).
+        self._verified_size: int = initial_size
+        self._limit: int = max_size
+        # Throughput (records per second) by page size.
+        self._throughput: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the settings are pickled: the observed sizes and throughputs belong to the pickling process.
+        return {
+            'initial_size': self.initial_size,
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'target_latency': self.target_latency,
+            'max_page_bytes': self.max_page_bytes,
+            'max_failures': self.max_failures,
+            'smoothing': self.smoothing,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc] # pylint: disable=unnecessary-dunder-call
+
+    @property
+    def size(self) -> int:
+        """Size of the next page."""
+        return self._size
+
+    def is_verified(self, size: int) -> bool:
+        """Whether pages of `size` records have been served in full (so a shorter page is the last one)."""
+        return size <= self._verified_size
+
+    def can_shrink(self, size: int) -> bool:
+        """Whether pages smaller than `size` can be requested."""
+        return size % 2 == 0 and size // 2 >= self.min_size
+
+    def aligned_size(self, offset: int) -> int:
+        """Returns the size of the page starting at record `offset`: the current size, or a smaller one if `offset` \
+        is not a multiple of it."""
+        size: int = self._size
+        while offset % size != 0 and self.can_shrink(size):
+            size //= 2
+        return size
+
+    def observe(
+        self,
+        size: int,
+        records: int,
+        latency: float,
+        received_bytes: int = 0,
+    ) -> None:
+        """Records a page, and adapts the size of the next pages.
+
+        Args:
+            size (int): Requested page size.
+
+            records (int): Number of records of the page.
+
+            latency (float): Time (in seconds) taken to get the page.
+
+            received_bytes (int): Size (in bytes) of the response. Defaults to 0 (unknown).
+        """
+        with self._lock:
+            if records >= size:
+                self._verified_size = max(self._verified_size, size)
+            if records > 0 and latency > 0:
+                throughput: float = records / latency
+                previous: Optional[float] = self._throughput.get(size)
+                self._throughput[size] = throughput if previous is None else (
+                    self.smoothing * throughput + (1 - self.smoothing) * previous)
+
+            if latency > self.target_latency or received_bytes > self.max_page_bytes:
+                self._shrink(size)
+            elif records >= size and 2 * latency <= self.target_latency and 2 * received_bytes <= self.max_page_bytes:
+                self._grow(size)
+
+    def observe_failure(self, size: int) -> None:
+        """Records a failed page, halving the size of the next pages."""
+        with self._lock:
+            self._shrink(size)
+
+    def observe_cap(self, size: int) -> None:
+        """Records a page shorter than a never fully served `size`, so that the size is not requested again."""
+        with self._lock:
+            self._limit = min(self._limit, size - 1)
+            self._shrink(size)
+
+    def _grow(self, size: int) -> None:
+        larger: int = 2 * size
+        if larger > min(self.max_size, self._limit):
+            return
+        # Do not grow back to a size that has been slower than the current one.
+        if self._throughput.get(larger, float('inf')) < self._throughput.get(size, 0.0):
+            return
+        self._size = max(self._size, larger)
+
+    def _shrink(self, size: int) -> None:
+        if self.can_shrink(size):
+            self._size = min(self._size, size // 2)
+
+
+def iter_pages(
+    get_page: Callable[[int, int], Sequence[T]],
+    page_sizer: AdaptivePageSize,
+    first_page_number: int = 1,
+) -> Iterator[List[T]]:
+    """Yields the pages of a paged endpoint, with page sizes adapted by `page_sizer`, until a page is empty or \
+    shorter than a page size served in full before.
+
+    Args:
+        get_page (Callable[[int, int], Sequence[T]]): Returns a page, given its page number and page size.
+
+        page_sizer (AdaptivePageSize): Controller of the page sizes.
+
+        first_page_number (int): Number of the first page (e.g. 0 for 0-based pages). Defaults to 1.
+
+    Yields:
+        List[T]: The (non-empty) pages.
+    """
+    offset: int = 0
+    failures: int = 0
+    while True:
+        size: int = page_sizer.aligned_size(offset)
+        start: float = time.perf_counter()
+        try:
+            with count_transfers() as counter:
+                page: List[T] = list(get_page(offset // size + first_page_number, size))
+        except Exception:
+            failures += 1
+            if failures >= page_sizer.max_failures or not page_sizer.can_shrink(size):
+                raise
+            page_sizer.observe_failure(size)
+            continue
+        failures = 0
+
+        if 0 < len(page) < size and not page_sizer.is_verified(size):
+            # The server may cap the page size, so the records may not start at `offset`: request them again.
+            page_sizer.observe_cap(size)
+            continue
+
+        page_sizer.observe(
+            size=size,
+            records=len(page),
+            latency=time.perf_counter() - start,
+            received_bytes=counter.bytes_received,
+        )
+        if len(page) == 0:
+            return
+        yield page
+        if len(page) < size:
+            return
+        offset += len(page)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""JSON serializers for the teselagen package.
+
+Responses are decoded straight from their raw bytes, and request bodies are encoded straight to bytes, so large
+payloads are not copied into intermediate Python strings. When `orjson` is installed it is used by default; otherwise
+the standard library `json` module is used. A custom serializer can be plugged with `set_serializer`.
+
+NumPy and pandas values (scalars, arrays, series, dataframes and timestamps) can be encoded natively by both
+serializers.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from datetime import datetime
+import json
+import sys
+from typing import Any, TYPE_CHECKING
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if TYPE_CHECKING:
+    from typing import Optional, Union
+
+
+def default_encoder(obj: Any) -> Any:
+    """Converts objects not supported by JSON encoders (NumPy and pandas values, dates) into serializable values.
+
+    NOTE: NumPy and pandas are only checked if they have already been imported, so this never imports them.
+
+    Args:
+        obj (Any): The object to convert.
+
+    Returns:
+        Any: A JSON serializable version of `obj`.
+
+    Raises:
+        TypeError: If `obj` can't be converted.
+    """
+    pd = sys.modules.get('pandas')
+    if pd is not None:
+        if isinstance(obj, pd.DataFrame):
+            return obj.to_dict(orient='records')
+        if isinstance(obj, (pd.Series, pd.Index)):
+            return obj.tolist()
+        if obj is pd.NaT:
+            return None
+        if isinstance(obj, pd.Timestamp):
+            return obj.isoformat()
+
+    np = sys.modules.get('numpy')
+    if np is not None:
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        if isinstance(obj, np.generic):
+            return obj.item()
+
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+class JSONSerializer:
+    """Serializer based on the standard library `json` module."""
+
+    name: str = 'json'
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        """Deserializes a JSON document (given as bytes or str) to a Python object."""
+        return json.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serializes `obj` to a (UTF-8 encoded) JSON document."""
+        return json.dumps(obj, default=default_encoder).encode('utf-8')
+
+
+class OrjsonSerializer(JSONSerializer):
+    """Serializer based on `orjson`. It is used by default when `orjson` is installed."""
+
+    name: str = 'orjson'
+
+    def loads(self, data: Union[bytes, bytearray, str]) -> Any:
+        """Deserializes a JSON document (given as bytes or str) to a Python object."""
+        return orjson.loads(data)
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serializes `obj` to a (UTF-8 encoded) JSON document."""
+        # Non-str keys (e.g. column or row numbers) are converted to str, as `json.dumps` does.
+        return orjson.dumps(obj, default=default_encoder, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+_serializer: JSONSerializer = JSONSerializer() if orjson is None else OrjsonSerializer()
+
+
+def get_serializer() -> JSONSerializer:
+    """Returns the serializer currently used to encode request bodies and decode responses."""
+    return _serializer
+
+
+def set_serializer(serializer: Optional[JSONSerializer] = None) -> JSONSerializer:
+    """Sets the serializer used to encode request bodies and decode responses.
+
+    Args:
+        serializer (Optional[JSONSerializer]): Any object with `loads` and `dumps` methods. If None, the default \
+            serializer is restored (`orjson` if it is installed, `json` otherwise).
+
+    Returns:
+        JSONSerializer: The previous serializer.
+    """
+    global _serializer  # pylint: disable=global-statement
+    previous_serializer = _serializer
+    if serializer is None:
+        serializer = JSONSerializer() if orjson is None else OrjsonSerializer()
+    _serializer = serializer
+    return previous_serializer
+
+
+def loads(data: Union[bytes, bytearray, str]) -> Any:
+    """Deserializes a JSON document with the current serializer."""
+    return _serializer.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serializes `obj` to a JSON document with the current serializer."""
+    return _serializer.dumps(obj)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Request coalescing ("single-flight") for the teselagen package.
+
+When several threads send the same GET request at the same moment (same URL, query parameters and headers, so same
+laboratory), only the first one goes over the wire. The others wait for it and receive the same response (or
+exception). Streamed requests are never coalesced, as their content can only be read once. It is opt-in (see the
+`coalesce_requests` argument of `TeselaGenClient`).
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Hashable, Mapping, TYPE_CHECKING, TypeVar
+from urllib.parse import urlencode
+
+if TYPE_CHECKING:
+    from typing import Callable, Optional
+
+T = TypeVar('T')
+
+
+def request_key(
+    method: str,
+    url: str,
+    params: Optional[Any] = None,
+    headers: Optional[Mapping[str, str]] = None,
+) -> Hashable:
+    """Returns a key identifying a request by its method, URL, query parameters and headers."""
+    if params is not None and not isinstance(params, (str, bytes)):
+        params = urlencode(sorted(params.items()) if isinstance(params, Mapping) else list(params), doseq=True)
+    return (method.upper(), url, params, tuple(sorted((headers or {}).items())))
+
+
+class _Call:
+    """An in-flight call, and its outcome once it has finished."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread-safe deduplication of concurrent identical calls."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._coalesced: int = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Calls in flight belong to the pickling process.
+        return {}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc] # pylint: disable=unnecessary-dunder-call
+
+    def do(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Calls `func`, unless a call with the same key is already in flight, whose outcome is then shared.
+
+        Args:
+            key (Hashable): Identifies identical calls.
+
+            func (Callable[[], T]): The call.
+
+        Returns:
+            T: The result of `func` (or of the identical call in flight).
+
+        Raises:
+            BaseException: The exception raised by `func` (or by the identical call in flight).
+        """
+        with self._lock:
+            call: Optional[_Call] = self._calls.get(key)
+            is_leader: bool = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+            else:
+                self._coalesced += 1
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of calls in flight, and the number of calls that were coalesced into another one."""
+        with self._lock:
+            return {'in_flight': len(self._calls), 'coalesced': self._coalesced}
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Local mirror of the BUILD inventory (aliquots, samples and plates), synced incrementally, for the teselagen package.
+
+An `InventoryMirror` keeps the records of paged collections in a SQLite database, together with a high-water mark per
+collection (and host and laboratory): the latest `updatedAt` of its records. Syncing a collection (see
+`BUILDClient.sync_inventory`) reads its pages sorted by `-updatedAt` (most recently updated first), upserts the
+records, and stops at the first record older than the high-water mark, so only the records updated since the previous
+sync are fetched. Records updated up to `overlap` before the mark are fetched again, in case they were committed late.
+
+Deleted records cannot be seen by incremental syncs: they are removed by full syncs (reconciliation passes), which
+read the whole collection and drop the records they did not see. A full sync runs on the first sync of a collection,
+when the last one is older than `reconcile_every`, or on request.
+
+Example:
+    >>> mirror = InventoryMirror(path='~/.cache/teselagen/inventory.sqlite')
+    >>> client.build.sync_inventory(mirror)  # Full on the first run, incremental afterwards.
+    >>> mirror.get('aliquots', aliquot_id, host=client.host_url)
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Literal, TYPE_CHECKING, TypedDict
+
+from teselagen.utils import serializers
+from teselagen.utils.utils import parse_datetime
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
+
+# CONSTANTS
+DEFAULT_INVENTORY_MIRROR_PATH: Path = Path.home() / '.cache' / 'teselagen' / 'inventory.sqlite'
+# 7 days
+DEFAULT_RECONCILE_EVERY: Literal[604800] = 604800
+# 5 minutes
+DEFAULT_SYNC_OVERLAP: Literal[300] = 300
+# Number of records upserted per statement.
+_UPSERT_BATCH_SIZE: Literal[500] = 500
+
+_SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS records (
+    host TEXT NOT NULL,
+    lab TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    updated_at TEXT,
+    record BLOB NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (host, lab, collection, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    host TEXT NOT NULL,
+    lab TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    high_water_mark TEXT,
+    last_sync REAL NOT NULL,
+    last_full_sync REAL NOT NULL,
+    PRIMARY KEY (host, lab, collection)
+);
+'''
+
+
+class SyncState(TypedDict, total=True):  # noqa: H601
+    """Sync state of a collection `TypedDict`."""
+    high_water_mark: Optional[str]
+    last_sync: float
+    last_full_sync: float
+
+
+class SyncResult(TypedDict, total=True):  # noqa: H601
+    """Result of the sync of a collection `TypedDict`."""
+    collection: str
+    full: bool
+    fetched: int
+    deleted: int
+    high_water_mark: Optional[str]
+
+
+class InventoryMirror:
+    """SQLite mirror of paged collections, with a high-water mark per collection."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_INVENTORY_MIRROR_PATH,
+        reconcile_every: Optional[float] = DEFAULT_RECONCILE_EVERY,
+        overlap: float = DEFAULT_SYNC_OVERLAP,
+    ) -> None:
+        """Initialize the mirror.
+
+        Args:
+            path (Union[str, Path]): Path of the SQLite database. It is created if it does not exist. Defaults to \
+                `~/.cache/teselagen/inventory.sqlite`.
+
+            reconcile_every (Optional[float]): Time (in seconds) after which a sync is a full sync, which also drops \
+                the deleted records. None means full syncs only run on the first sync, or on request. Defaults to \
+                7 days.
+
+            overlap (float): Time (in seconds) before the high-water mark from which records are fetched again. \
+                Defaults to 5 minutes.
+        """
+        self.path: Path = Path(path).expanduser()
+        self.reconcile_every: Optional[float] = reconcile_every
+        self.overlap: float = overlap
+
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the settings are pickled: every process opens its own connection to the (shared) database.
+        return {'path': self.path, 'reconcile_every': self.reconcile_every, 'overlap': self.overlap}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc] # pylint: disable=unnecessary-dunder-call
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection to the database (opened on first use)."""
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.executescript(_SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        """Closes the connection to the database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def state(
+        self,
+        collection: str,
+        host: str = '',
+        lab: str = '',
+    ) -> Optional[SyncState]:
+        """Returns the sync state of a collection, or None if it has never been synced."""
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT high_water_mark, last_sync, last_full_sync FROM sync_state '
+                'WHERE host = ? AND lab = ? AND collection = ?',
+                (host, lab, collection),
+            ).fetchone()
+        if row is None:
+            return None
+        return SyncState(high_water_mark=row[0], last_sync=row[1], last_full_sync=row[2])
+
+    def needs_full_sync(
+        self,
+        collection: str,
+        host: str = '',
+        lab: str = '',
+    ) -> bool:
+        """Whether the next sync of a collection must be a full sync (a first sync, or a reconciliation pass)."""
+        state: Optional[SyncState] = self.state(collection, host=host, lab=lab)
+        if state is None or state['high_water_mark'] is None:
+            return True
+        return self.reconcile_every is not None and time.time() - state['last_full_sync'] >= self.reconcile_every
+
+    def sync(
+        self,
+        collection: str,
+        get_records: Callable[[], Iterator[Mapping[str, Any]]],
+        host: str = '',
+        lab: str = '',
+        full: Optional[bool] = None,
+    ) -> SyncResult:
+        """Syncs a collection.
+
+        Args:
+            collection (str): Name of the collection.
+
+            get_records (Callable[[], Iterator[Mapping[str, Any]]]): Returns an iterator of all the records of the \
+                collection, sorted by `-updatedAt`. It is closed as soon as the records older than the high-water \
+                mark are reached.
+
+            host (str): Host of the collection. Defaults to "".
+
+            lab (str): Laboratory of the collection. Defaults to "".
+
+            full (Optional[bool]): Whether to read the whole collection, and drop the records not found. Defaults to \
+                None (see `needs_full_sync`).
+
+        Returns:
+            SyncResult: The number of records fetched and deleted, and the new high-water mark.
+        """
+        is_full: bool = self.needs_full_sync(collection, host=host, lab=lab) if full is None else full
+        state: Optional[SyncState] = self.state(collection, host=host, lab=lab)
+        high_water_mark: Optional[str] = None if is_full or state is None else state['high_water_mark']
+        since: Optional[datetime] = None if high_water_mark is None else (
+            parse_datetime(high_water_mark) - timedelta(seconds=self.overlap))
+        started_at: float = time.time()
+
+        fetched: int = 0
+        rows: List[Tuple[Any, ...]] = []
+        records: Iterator[Mapping[str, Any]] = get_records()
+        try:
+            for record in records:
+                updated_at: Optional[str] = record.get('updatedAt')
+                if since is not None and updated_at is not None and parse_datetime(updated_at) < since:
+                    # Records are sorted by `-updatedAt`: the next ones are older too.
+                    break
+                fetched += 1
+                if updated_at is not None and (high_water_mark is None or
+                                               parse_datetime(updated_at) > parse_datetime(high_water_mark)):
+                    high_water_mark = updated_at
+                rows.append((host, lab, collection, str(record['id']), updated_at, serializers.dumps(record),
+                             started_at))
+                if len(rows) >= _UPSERT_BATCH_SIZE:
+                    self._upsert(rows)
+                    rows = []
+            self._upsert(rows)
+        finally:
+            close: Optional[Callable[[], None]] = getattr(records, 'close', None)
+            if close is not None:
+                close()
+
+        deleted: int = 0
+        with self._lock:
+            if is_full:
+                deleted = self.connection.execute(
+                    'DELETE FROM records WHERE host = ? AND lab = ? AND collection = ? AND synced_at < ?',
+                    (host, lab, collection, started_at),
+                ).rowcount
+            # The high-water mark is only moved once all the records updated since the previous one are stored.
+            self.connection.execute(
+                'INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?, ?, ?)',
+                (host, lab, collection, high_water_mark, started_at,
+                 started_at if is_full or state is None else state['last_full_sync']),
+            )
+
+        return SyncResult(
+            collection=collection,
+            full=is_full,
+            fetched=fetched,
+            deleted=deleted,
+            high_water_mark=high_water_mark,
+        )
+
+    def _upsert(self, rows: List[Tuple[Any, ...]]) -> None:
+        if rows:
+            with self._lock:
+                self.connection.executemany('INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def get(
+        self,
+        collection: str,
+        record_id: Union[str, int],
+        host: str = '',
+        lab: str = '',
+    ) -> Optional[Dict[str, Any]]:
+        """Returns a mirrored record, or None if it is not in the mirror."""
+        with self._lock:
+            row = self.connection.execute(
+                'SELECT record FROM records WHERE host = ? AND lab = ? AND collection = ? AND id = ?',
+                (host, lab, collection, str(record_id)),
+            ).fetchone()
+        return None if row is None else serializers.loads(row[0])
+
+    def records(
+        self,
+        collection: str,
+        host: str = '',
+        lab: str = '',
+    ) -> List[Dict[str, Any]]:
+        """Returns the mirrored records of a collection, most recently updated first."""
+        with self._lock:
+            rows = self.connection.execute(
+                'SELECT record FROM records WHERE host = ? AND lab = ? AND collection = ? '
+                'ORDER BY updated_at DESC, CAST(id AS INTEGER), id',
+                (host, lab, collection),
+            ).fetchall()
+        return [serializers.loads(row[0]) for row in rows]
+
+    def count(
+        self,
+        collection: str,
+        host: str = '',
+        lab: str = '',
+    ) -> int:
+        """Returns the number of mirrored records of a collection."""
+        with self._lock:
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM records WHERE host = ? AND lab = ? AND collection = ?',
+                (host, lab, collection),
+            ).fetchone()[0]
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+
+from __future__ import annotations
+
+import requests_mock
+
+from teselagen.utils.cache import ResponseCache
+from teselagen.utils.transport import TeselaGenSession
+from teselagen.utils.utils import get
+from teselagen.utils.utils import post
+
+
+class TestResponseCache:
+
+    def test_response_cache(self):
+        """Read endpoints are served from the cache (per lab), and writes invalidate the resource they modify."""
+        session = TeselaGenSession(cache=ResponseCache(ttl=60))
+        assays_url = 'https://tg.example.com/tg-api//assays'
+        models_url = 'https://tg.example.com/tg-api//get-models-by-type'
+        status_url = 'https://tg.example.com/tg-api//get-tasks/1'
+
+        with requests_mock.Mocker(session=session) as mocker:
+            mocker.get(assays_url, json=[{'id': '1'}])
+            mocker.post(assays_url, json={'id': '2'})
+            mocker.post(models_url, json={'data': []})
+            mocker.get(status_url, json={'status': 'running'})
+
+            for _ in range(3):
+                response = get(url=assays_url, headers={'tg-active-lab-id': '1'}, session=session, parse_json=True)
+                assert response['content'] == [{'id': '1'}]
+            get(url=assays_url, headers={'tg-active-lab-id': '2'}, session=session)
+            assert mocker.call_count == 2
+
+            post(url=models_url, json={'modelType': 'predictive'}, session=session)
+            post(url=models_url, json={'modelType': 'predictive'}, session=session)
+            post(url=models_url, json={'modelType': 'evolutive'}, session=session)
+            assert mocker.call_count == 4
+
+            get(url=status_url, session=session)
+            get(url=status_url, session=session)
+            assert mocker.call_count == 6
+
+            post(url=assays_url, json={'name': 'assay'}, session=session)
+            get(url=assays_url, headers={'tg-active-lab-id': '1'}, session=session)
+            assert mocker.call_count == 8
+
+        assert session.cache.stats() == {'hits': 3, 'misses': 5, 'size': 3}
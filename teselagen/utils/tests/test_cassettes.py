@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from teselagen.api import TeselaGenClient
+from teselagen.utils import cassettes
+from teselagen.utils.fake_server import FakeTeselaGenServer
+from teselagen.utils.utils import get
+from teselagen.utils.utils import wait_for_status
+
+
+class TestCassettes:
+
+    def test_cassettes_record_and_replay(self, tmp_path):
+        """Interactions are recorded without secrets, and replayed without a server nor waits between polls."""
+        cassette_path = tmp_path / 'cassette.json'
+
+        def workflow(host_url: str):
+            client = TeselaGenClient(host_url=host_url)
+            client.update_token(token=client.create_token('user', 'password', '1d'), save_to_storage=False)
+            client.select_laboratory(lab_id=1)
+            aliquots = client.build.get_aliquots(pageSize=5)
+            guides = client.discover.design_crispr_grnas(sequence='ACGT' * 50, target_indexes=(0, 20))
+            return aliquots, guides
+
+        with FakeTeselaGenServer() as server:
+            with cassettes.use_cassette(cassette_path) as cassette:
+                assert not cassette.is_replaying
+                recorded_aliquots, recorded_guides = workflow(server.host_url)
+
+        content = cassette_path.read_text()
+        assert 'fake-token' not in content and '"password"' in content and '"REDACTED"' in content
+
+        with cassettes.use_cassette(cassette_path) as cassette:
+            assert cassette.is_replaying and cassettes.is_replaying()
+            aliquots, guides = workflow('http://replay.invalid')
+
+            with pytest.raises(Exception, match='No recorded response'):
+                get(url='http://replay.invalid/tg-api/unknown')
+
+            polls = iter(['in-progress', 'in-progress', 'completed-successfully'])
+            start = time.perf_counter()
+            wait_for_status(method=lambda: next(polls), validate=lambda status: status == 'completed-successfully')
+            assert time.perf_counter() - start < 1
+
+        assert not cassettes.is_replaying()
+        assert (aliquots, guides) == (recorded_aliquots, recorded_guides)
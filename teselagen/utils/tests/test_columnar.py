@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+
+from __future__ import annotations
+
+from datetime import datetime
+from datetime import timezone
+
+import pytest
+
+from teselagen.utils.columnar import arrow_schema
+from teselagen.utils.columnar import Column
+from teselagen.utils.columnar import iter_record_batches
+from teselagen.utils.columnar import write_records
+
+COLUMNS = (
+    Column('id', ('id',)),
+    Column('sample_name', ('sample', 'name')),
+    Column('volume', ('sample', 'volume'), 'float64'),
+    Column('updated_at', ('updatedAt',), 'timestamp'),
+)
+
+
+class TestColumnar:
+
+    def test_iter_record_batches(self):
+        """Records are flattened into batches of a fixed schema, with nulls for the missing or null values."""
+        pa = pytest.importorskip('pyarrow')
+        records = [{'id': 1, 'sample': {'name': 'S1', 'volume': 2}, 'updatedAt': '2020-08-05T15:24:35.291Z'},
+                   {'id': '2', 'sample': None}, {'id': '3'}]
+
+        batches = list(iter_record_batches(iter(records), columns=COLUMNS, batch_size=2))
+        assert [batch.num_rows for batch in batches] == [2, 1]
+        assert all(batch.schema == arrow_schema(COLUMNS) for batch in batches)
+        assert pa.Table.from_batches(batches).to_pylist() == [
+            {'id': '1', 'sample_name': 'S1', 'volume': 2.0,
+             'updated_at': datetime(2020, 8, 5, 15, 24, 35, 291000, tzinfo=timezone.utc)},
+            {'id': '2', 'sample_name': None, 'volume': None, 'updated_at': None},
+            {'id': '3', 'sample_name': None, 'volume': None, 'updated_at': None},
+        ]
+        assert list(iter_record_batches([], columns=COLUMNS)) == []
+
+    @pytest.mark.parametrize('file_format', ['parquet', 'feather'])
+    def test_write_records(self, tmp_path, file_format: str):
+        """Records are written to Parquet or Feather files a batch at a time."""
+        pytest.importorskip('pyarrow')
+        pq = pytest.importorskip('pyarrow.parquet')
+        feather = pytest.importorskip('pyarrow.feather')
+        records = ({'id': i, 'sample': {'name': f'S{i}'}} for i in range(1, 251))
+
+        path = tmp_path / f'records.{file_format}'
+        assert write_records(records, path, columns=COLUMNS, file_format=file_format, batch_size=100) == 250
+        table = pq.read_table(path) if file_format == 'parquet' else feather.read_table(path)
+        assert table.schema == arrow_schema(COLUMNS) and table.num_rows == 250
+        assert table.column('sample_name').to_pylist()[-1] == 'S250'
+        if file_format == 'parquet':
+            assert pq.ParquetFile(path).metadata.num_row_groups == 3
+
+        with pytest.raises(ValueError, match='Unsupported file format'):
+            write_records([], tmp_path / 'records.csv', columns=COLUMNS, file_format='csv')
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+
+from __future__ import annotations
+
+import requests_mock
+
+from teselagen.utils.disk_cache import PersistentCache
+from teselagen.utils.transport import TeselaGenSession
+from teselagen.utils.utils import get
+
+
+class TestPersistentCache:
+
+    def test_persistent_cache(self, tmp_path):
+        """Records fetched by id are persisted on disk (per lab), revalidated with their ETag once stale, and dropped
+        on writes."""
+        path = tmp_path / 'records.sqlite'
+        url = 'https://tg.example.com/tg-api/designs/12'
+        lab_headers = {'tg-active-lab-id': '1'}
+
+        session = TeselaGenSession(persistent_cache=PersistentCache(path=path))
+        # Mutable records (plates) are not cached by default.
+        assert not session.persistent_cache.is_cacheable('GET', 'https://tg.example.com/tg-api/plates/12')
+        with requests_mock.Mocker(session=session) as mocker:
+            mocker.get(url, json={'id': '12', 'updatedAt': '2022-01-01'}, headers={'ETag': '"v1"'})
+            assert get(url=url, headers=lab_headers, session=session, parse_json=True)['content']['id'] == '12'
+        session.persistent_cache.close()
+
+        # A new session (e.g. a later notebook session) reads the record from disk.
+        session = TeselaGenSession(persistent_cache=PersistentCache(path=path))
+        with requests_mock.Mocker(session=session) as mocker:
+            mocker.get(url, status_code=500)
+            response = get(url=url, headers=lab_headers, session=session, parse_json=True)
+            assert response['content'] == {'id': '12', 'updatedAt': '2022-01-01'}
+            assert mocker.call_count == 0
+
+            # Stale entries are revalidated with a conditional request.
+            session.persistent_cache.max_age = 0
+            mocker.get(url, status_code=304)
+            assert get(url=url, headers=lab_headers, session=session, parse_json=True)['content']['id'] == '12'
+            assert mocker.last_request.headers['If-None-Match'] == '"v1"'
+
+            mocker.delete(url, status_code=204)
+            assert session.request('DELETE', url, headers=lab_headers).status_code == 204
+
+        assert session.persistent_cache.stats() == {'entries': 0, 'bytes': 0}
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+
+from __future__ import annotations
+
+import time
+
+import pytest
+import requests_mock
+
+from teselagen.api import TeselaGenClient
+from teselagen.utils.governor import ConcurrencyGovernor
+from teselagen.utils.governor import parse_retry_after
+from teselagen.utils.transport import TeselaGenSession
+from teselagen.utils.utils import get
+from teselagen.utils.utils import post
+
+
+class TestGovernor:
+
+    def test_governor_adapts_limit_to_rate_limiting(self):
+        """The concurrency limit is halved on 429/503 responses, and grows back slowly on successful ones."""
+        governor = ConcurrencyGovernor(initial_limit=8, min_limit=1, max_limit=9)
+
+        governor.on_response(status_code=429)
+        assert governor.limit == 4
+        governor.on_response(status_code=503)
+        governor.on_response(status_code=503)
+        governor.on_response(status_code=503)
+        assert governor.limit == 1
+
+        for _ in range(100):
+            governor.on_response(status_code=200)
+        assert governor.limit == 9
+
+        assert parse_retry_after('2') == 2.0
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+        assert parse_retry_after('soon') is None
+
+    def test_session_retries_idempotent_requests_through_governor(self):
+        """GETs failing with a transient error are retried (honoring Retry-After), while POSTs are not."""
+        session = TeselaGenSession(governor=ConcurrencyGovernor(backoff_base=0.01))
+        url = 'https://tg.example.com/tg-api/assays'
+
+        with requests_mock.Mocker(session=session) as mocker:
+            mocker.get(url, [
+                {'status_code': 429, 'headers': {'Retry-After': '0.05'}},
+                {'status_code': 503},
+                {'status_code': 200, 'json': [{'id': '1'}]},
+            ])
+            mocker.post(url, status_code=429, headers={'Retry-After': '0'})
+
+            start = time.monotonic()
+            response = get(url=url, session=session, parse_json=True)
+            assert time.monotonic() - start >= 0.05
+            assert response['content'] == [{'id': '1'}]
+            assert mocker.call_count == 3
+
+            with pytest.raises(Exception, match='Too many requests'):
+                post(url=url, json={}, session=session)
+            assert mocker.call_count == 4
+
+        assert session.governor.in_flight == 0
+        # The governor is opt-in.
+        assert TeselaGenClient(host_url='https://tg.example.com').http_session.governor is None
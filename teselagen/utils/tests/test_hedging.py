@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+
+from __future__ import annotations
+
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+import itertools
+import threading
+import time
+
+import pytest
+import requests
+
+from teselagen.utils.hedging import HedgingPolicy
+from teselagen.utils.metrics import MetricsRegistry
+from teselagen.utils.transport import TeselaGenSession
+
+
+class TestHedging:
+
+    @pytest.mark.parametrize('budget, expected_hedges', [
+        pytest.param(1.0, 1, id='within-budget'),
+        pytest.param(0.0, 0, id='no-budget'),
+    ])
+    def test_hedging_policy(self, budget: float, expected_hedges: int, monkeypatch, caplog):
+        """A slow GET is hedged (within the budget), the first response wins and the loser is closed."""
+        policy = HedgingPolicy(budget=budget, initial_delay=0.05, min_delay=0.01)
+        session = TeselaGenSession(hedging=policy, metrics=MetricsRegistry())
+        calls = itertools.count()
+
+        class SlowFirstHandler(BaseHTTPRequestHandler):
+
+            def do_GET(self):  # noqa: N802
+                body = b'fast'
+                if next(calls) == 0:
+                    time.sleep(0.5)
+                    body = b'slow'
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        closed = []
+        close = requests.Response.close
+
+        def record_close(response):
+            closed.append(response)
+            close(response)
+
+        monkeypatch.setattr(requests.Response, 'close', record_close)
+
+        with ThreadingHTTPServer(('127.0.0.1', 0), SlowFirstHandler) as server:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            url = f'http://127.0.0.1:{server.server_address[1]}/tg-api/aliquots'
+            start = time.perf_counter()
+            response = session.request('GET', url)
+            elapsed = time.perf_counter() - start
+            time.sleep(0.6)
+            server.shutdown()
+        policy.shutdown()
+
+        assert policy.stats() == {'requests': 1, 'hedges': expected_hedges, 'hedge_wins': expected_hedges}
+        if expected_hedges:
+            assert response.content == b'fast' and elapsed < 0.4
+            assert [losing_response.content for losing_response in closed] == [b'slow']
+        else:
+            assert response.content == b'slow' and closed == []
+        assert 'exception calling callback' not in caplog.text
+
+        for _ in range(policy.min_samples):
+            policy.observe('aliquots', 0.2)
+        assert policy.delay('aliquots') == pytest.approx(0.2)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+
+from __future__ import annotations
+
+import pickle
+
+import pytest
+
+from teselagen.utils.fake_server import FakeServerConfig
+from teselagen.utils.metrics import count_transfers
+from teselagen.utils.paging import AdaptivePageSize
+from teselagen.utils.paging import iter_pages
+
+
+class TestPaging:
+
+    def test_adaptive_page_size(self):
+        """Page sizes grow while pages are fast, shrink when they are slow, large or fail, and stay aligned."""
+        page_sizer = AdaptivePageSize(initial_size=100, min_size=25, max_size=800, target_latency=1.0,
+                                      max_page_bytes=1000)
+        page_sizer.observe(size=100, records=100, latency=0.1, received_bytes=100)
+        assert page_sizer.size == 200
+        page_sizer.observe(size=200, records=200, latency=0.9, received_bytes=100)
+        assert page_sizer.size == 200
+        page_sizer.observe(size=200, records=200, latency=0.1, received_bytes=600)
+        assert page_sizer.size == 200
+        page_sizer.observe(size=200, records=200, latency=1.5, received_bytes=100)
+        assert page_sizer.size == 100
+        assert page_sizer.aligned_size(offset=300) == 100 and page_sizer.aligned_size(offset=50) == 50
+        page_sizer.observe_failure(size=100)
+        page_sizer.observe_failure(size=50)
+        page_sizer.observe_failure(size=25)
+        assert page_sizer.size == 25
+        assert pickle.loads(pickle.dumps(page_sizer)).size == 100
+
+        # Fast pages of a server capping the page size at 300 records, and failing pages of more than 200 records.
+        records = list(range(1000))
+        requests = []
+
+        def get_page(page_number: int, page_size: int):
+            requests.append((page_number, page_size))
+            served_size = min(page_size, 300)
+            return records[(page_number - 1) * served_size:page_number * served_size]
+
+        pages = list(iter_pages(get_page, AdaptivePageSize(initial_size=50, min_size=25, max_size=1600)))
+        assert [record for page in pages for record in page] == records
+        assert requests[:3] == [(1, 50), (2, 50), (2, 100)]
+        assert max(size for _, size in requests) == 400 and len(requests) < 1000 // 50
+
+        def get_failing_page(page_number: int, page_size: int):
+            if page_size > 200:
+                raise TimeoutError('The page took too long')
+            return get_page(page_number, page_size)
+
+        requests.clear()
+        pages = list(iter_pages(get_failing_page, AdaptivePageSize(initial_size=200, max_size=1600)))
+        assert [record for page in pages for record in page] == records
+        with pytest.raises(TimeoutError):
+            list(iter_pages(get_failing_page, AdaptivePageSize(initial_size=400, min_size=400, max_size=1600)))
+
+    def test_adaptive_paging_of_endpoints(self, fake_teselagen_client):
+        """TEST assay results and DISCOVER datapoints can be fetched with adaptive page sizes."""
+        config = FakeServerConfig(results_per_file=700, num_datapoints=1500, max_page_size=1000)
+        server, client = fake_teselagen_client(config)
+
+        with count_transfers() as counter:
+            assay_results = client.test.get_assay_results(assay_id='1', file_ids=['1'], as_dataframe=False,
+                                                          with_subject_data=False, page_sizer=AdaptivePageSize())
+        assert len(assay_results[0]['data']) == 700
+        assert counter.bytes_received > 0
+
+        datapoints = list(client.discover.iter_model_datapoints(model_id=1, datapoint_type='input'))
+        assert [datapoint['id'] for datapoint in datapoints] == [str(i) for i in range(1, 1501)]
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+
+from __future__ import annotations
+
+import pickle
+
+from teselagen.utils.sync import InventoryMirror
+
+
+class TestSync:
+
+    def test_inventory_mirror(self, tmp_path):
+        """Syncs stop at the records older than the high-water mark, and full syncs drop the records not seen."""
+        records = [{'id': str(i), 'updatedAt': f'2020-01-{31 - i:02d}T00:00:00.000Z'} for i in range(1, 31)]
+        consumed = []
+
+        def get_records():
+            # Sorted by `-updatedAt`, as the paged endpoints return them.
+            try:
+                for record in records:
+                    consumed.append(record['id'])
+                    yield record
+            finally:
+                consumed.append('closed')
+
+        mirror = InventoryMirror(path=tmp_path / 'inventory.sqlite', reconcile_every=None, overlap=3600)
+        assert mirror.state('aliquots') is None and mirror.needs_full_sync('aliquots')
+
+        result = mirror.sync('aliquots', get_records)
+        assert (result['full'], result['fetched'], result['deleted']) == (True, 30, 0)
+        assert result['high_water_mark'] == '2020-01-30T00:00:00.000Z'
+        assert not mirror.needs_full_sync('aliquots') and mirror.count('aliquots') == 30
+
+        # Record 7 is updated, record 31 is added, and record 8 is deleted.
+        records = [{'id': '7', 'updatedAt': '2020-02-02T00:00:00.000Z'},
+                   {'id': '31', 'updatedAt': '2020-02-01T00:00:00.000Z'}] + \
+            [record for record in records if record['id'] not in ('7', '8')]
+        consumed.clear()
+        result = mirror.sync('aliquots', get_records)
+        # The new records, and the record at the previous high-water mark (within the overlap).
+        assert (result['full'], result['fetched'], result['deleted']) == (False, 3, 0)
+        assert result['high_water_mark'] == '2020-02-02T00:00:00.000Z'
+        assert consumed == ['7', '31', '1', '2', 'closed']
+        assert mirror.get('aliquots', 7)['updatedAt'] == '2020-02-02T00:00:00.000Z'
+        assert [record['id'] for record in mirror.records('aliquots')[:3]] == ['7', '31', '1']
+        assert mirror.get('aliquots', 1, host='other-host') is None
+
+        result = mirror.sync('aliquots', get_records, full=True)
+        assert (result['full'], result['fetched'], result['deleted']) == (True, 30, 1)
+        assert mirror.get('aliquots', 8) is None and mirror.count('aliquots') == 30
+        assert pickle.loads(pickle.dumps(mirror)).count('aliquots') == 30
+
+        mirror.reconcile_every = 0
+        assert mirror.needs_full_sync('aliquots')
+        mirror.close()
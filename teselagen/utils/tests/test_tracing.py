@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests_mock
+
+from teselagen.utils import tracing
+from teselagen.utils.transport import TeselaGenSession
+from teselagen.utils.utils import get
+
+
+class TestTracing:
+
+    def test_tracing_spans(self):
+        """Public methods open spans, with child spans for their HTTP requests and local processing phases."""
+        session = TeselaGenSession()
+        url = 'https://tg.example.com/tg-api/assays/1/results'
+
+        @tracing.trace_public_methods
+        class DummyClient:
+
+            def get_results(self):
+                response = get(url=url, session=session, parse_json=True)
+                with tracing.span('DummyClient.merge_results'):
+                    return self._sum(response['content'])
+
+            def _sum(self, values):
+                return sum(values)
+
+        recorder = tracing.LocalRecorder()
+        previous_tracer = tracing.set_tracer(recorder)
+        try:
+            with requests_mock.Mocker(session=session) as mocker:
+                mocker.get(url, json=[1, 2])
+                assert DummyClient().get_results() == 3
+        finally:
+            tracing.set_tracer(previous_tracer)
+
+        names = [line.split('ms  ')[-1] for line in recorder.format_timeline().splitlines()]
+        assert names == [
+            'DummyClient.get_results',
+            '  HTTP GET assays/{}/results',
+            '  DummyClient.merge_results',
+        ]
+
+        http_span = next(span for span in recorder.spans if span.name.startswith('HTTP'))
+        assert http_span.attributes == {'http.method': 'GET', 'http.url': url, 'http.status_code': 200}
+
+        assert {event['name'] for event in recorder.to_chrome_trace()['traceEvents']} == {
+            'DummyClient.get_results',
+            'HTTP GET assays/{}/results',
+            'DummyClient.merge_results',
+        }
+        assert 'DummyClient.get_results;HTTP GET assays/{}/results ' in recorder.to_folded_stacks()
+
+    def test_tracing_spans_of_generators(self):
+        """The span of a generator method stays open while it is consumed, with its HTTP requests nested under it."""
+        session = TeselaGenSession()
+        url = 'https://tg.example.com/tg-api/aliquots'
+
+        @tracing.trace_public_methods
+        class DummyClient:
+
+            def iter_pages(self, pages: int):
+                for _ in range(pages):
+                    yield get(url=url, session=session, parse_json=True)['content']
+                return pages
+
+        recorder = tracing.LocalRecorder()
+        previous_tracer = tracing.set_tracer(recorder)
+        try:
+            with requests_mock.Mocker(session=session) as mocker, ThreadPoolExecutor(max_workers=2) as executor:
+                mocker.get(url, json=[1, 2])
+                assert list(DummyClient().iter_pages(pages=2)) == [[1, 2], [1, 2]]
+
+                # Generators resumed from other threads (as by the asyncio client), or closed early.
+                pages = DummyClient().iter_pages(pages=3)
+                assert executor.submit(next, pages).result() == [1, 2]
+                assert next(pages) == [1, 2]
+                executor.submit(pages.close).result()
+        finally:
+            tracing.set_tracer(previous_tracer)
+
+        names = [line.split('ms  ')[-1] for line in recorder.format_timeline().splitlines()]
+        assert names == [
+            'DummyClient.iter_pages',
+            '  HTTP GET aliquots',
+            '  HTTP GET aliquots',
+            'DummyClient.iter_pages',
+            '  HTTP GET aliquots',
+            '  HTTP GET aliquots',
+        ]
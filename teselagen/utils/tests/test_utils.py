@@ -4,12 +4,33 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+import os
+import subprocess
+import sys
+import threading
 import time
 from typing import Literal
 
+import numpy as np
+import pandas as pd
 import pytest
+import requests_mock
 from tenacity import RetryError
 
+from teselagen.api import TeselaGenClient
+from teselagen.utils import benchmarks
+from teselagen.utils import serializers
+from teselagen.utils.fake_server import FakeServerConfig
+from teselagen.utils.governor import ConcurrencyGovernor
+from teselagen.utils.metrics import endpoint_template
+from teselagen.utils.metrics import MetricsRegistry
+from teselagen.utils.singleflight import SingleFlight
+from teselagen.utils.transport import TeselaGenSession
+from teselagen.utils.utils import get
+from teselagen.utils.utils import get_project_root
+from teselagen.utils.utils import is_instance
+from teselagen.utils.utils import post
 from teselagen.utils.utils import wait_for_status
 
 
@@ -53,3 +74,194 @@ class TestUtils:
                 timeout=1,
                 count_limit=counter_limit,
             )
+
+    def test_get_through_pooled_session(self):
+        """Requests made with a `session` go through its pooled adapters, and the handler/parser still apply."""
+        session = TeselaGenSession(pool_connections=2, pool_maxsize=4)
+        url = 'https://tg.example.com/tg-api/public/status'
+
+        assert session.adapters['https://']._pool_maxsize == 4  # pylint: disable=protected-access
+        assert session.headers['Connection'] == 'keep-alive'
+
+        with requests_mock.Mocker(session=session) as mocker:
+            mocker.get(url, text='TeselaGen API is operational.')
+            response = get(url=url, session=session)
+
+        assert mocker.call_count == 1
+        assert response == {'url': url, 'status': True, 'content': 'TeselaGen API is operational.'}
+
+    @pytest.mark.parametrize('serializer', [
+        serializers.JSONSerializer(),
+        pytest.param(
+            serializers.OrjsonSerializer(),
+            marks=pytest.mark.skipif(serializers.orjson is None, reason='orjson is not installed'),
+        ),
+    ])
+    def test_serializer_encodes_numpy_and_pandas_values(self, serializer: serializers.JSONSerializer):
+        """NumPy and pandas values and int keys are encoded natively, and documents are decoded straight from bytes."""
+        obj = {
+            'integer': np.int64(3),
+            'float': np.float32(0.5),
+            'array': np.arange(3),
+            'series': pd.Series([1, 2]),
+            'dataframe': pd.DataFrame({'a': [1, 2]}),
+            'timestamp': pd.Timestamp('2022-01-01'),
+            'wells': {1: 'A1', 2: 'A2'},
+        }
+        expected = {
+            'integer': 3,
+            'float': 0.5,
+            'array': [0, 1, 2],
+            'series': [1, 2],
+            'dataframe': [{'a': 1}, {'a': 2}],
+            'timestamp': '2022-01-01T00:00:00',
+            'wells': {'1': 'A1', '2': 'A2'},
+        }
+
+        encoded = serializer.dumps(obj)
+
+        assert isinstance(encoded, bytes)
+        assert serializer.loads(encoded) == expected
+
+    def test_parse_json_and_json_body(self):
+        """Bodies passed as `json` are encoded with the serializer, and `parse_json` decodes the response bytes."""
+        session = TeselaGenSession()
+        url = 'https://tg.example.com/tg-api/assays'
+
+        with requests_mock.Mocker(session=session) as mocker:
+            mocker.post(url, json=[{'id': '1'}])
+            response = post(url=url, json={'ids': np.array([1, 2])}, session=session, parse_json=True)
+
+        assert response['content'] == [{'id': '1'}]
+        assert mocker.last_request.json() == {'ids': [1, 2]}
+        assert mocker.last_request.headers['Content-Type'] == 'application/json'
+
+        previous_serializer = serializers.set_serializer(serializers.JSONSerializer())
+        try:
+            assert isinstance(serializers.get_serializer(), serializers.JSONSerializer)
+            assert serializers.loads(b'{"a": 1}') == {'a': 1}
+        finally:
+            serializers.set_serializer(previous_serializer)
+
+    @pytest.mark.parametrize('url, expected_template', [
+        ('https://tg.example.com/tg-api//assays/12/results?offset=0', 'assays/{}/results'),
+        ('https://tg.example.com/tg-api/metadata/assaySubjectClass', 'metadata/assaySubjectClass'),
+        ('https://tg.example.com/tg-api/files/3f2b9c2e-1d4a-4e8b-9f6a-2b1c3d4e5f60', 'files/{}'),
+    ])
+    def test_endpoint_template(self, url: str, expected_template: str):
+        """Record ids are replaced by `{}` so requests are grouped per endpoint."""
+        assert endpoint_template(url) == expected_template
+
+    def test_session_records_metrics(self):
+        """Every request of a session is recorded under its endpoint template, and can be exported and reset."""
+        metrics = MetricsRegistry()
+        session = TeselaGenSession(governor=ConcurrencyGovernor(backoff_base=0.01), metrics=metrics)
+        url = 'https://tg.example.com/tg-api/assays/{}/results'
+
+        with requests_mock.Mocker(session=session) as mocker:
+            mocker.get(url.format(1), [{'status_code': 503}, {'status_code': 200, 'content': b'[1, 2]'}])
+            mocker.get(url.format(2), status_code=200, content=b'[]')
+            mocker.post(url.format(3), status_code=404)
+
+            get(url=url.format(1), session=session)
+            get(url=url.format(2), session=session)
+            with pytest.raises(Exception):
+                post(url=url.format(3), json={'a': 1}, session=session)
+
+        snapshot = metrics.snapshot()
+        assert set(snapshot) == {'GET assays/{}/results', 'POST assays/{}/results'}
+        assert snapshot['GET assays/{}/results']['count'] == 2
+        assert snapshot['GET assays/{}/results']['retries'] == 1
+        assert snapshot['GET assays/{}/results']['errors'] == 0
+        assert snapshot['GET assays/{}/results']['bytes_received'] == 8
+        assert sum(snapshot['GET assays/{}/results']['latency_histogram'].values()) == 2
+        assert snapshot['POST assays/{}/results']['errors'] == 1
+        assert snapshot['POST assays/{}/results']['bytes_sent'] == len(serializers.dumps({'a': 1}))
+
+        prometheus = metrics.to_prometheus()
+        assert 'teselagen_requests_total{method="GET",endpoint="assays/{}/results"} 2' in prometheus
+        assert 'teselagen_request_duration_seconds_count{method="POST",endpoint="assays/{}/results"} 1' in prometheus
+
+        assert metrics.reset() == snapshot
+        assert metrics.snapshot() == {}
+
+    def test_single_flight_coalesces_identical_gets(self):
+        """Identical concurrent GETs share one HTTP call, while GETs for another lab, and streamed GETs, are sent \
+        separately."""
+        session = TeselaGenSession(single_flight=SingleFlight())
+        url = 'https://tg.example.com/tg-api/assay-subjects'
+        n_workers = 8
+        barrier = threading.Barrier(n_workers)
+
+        def slow_response(request, context):
+            time.sleep(0.3)
+            return b'[{"id": "1"}]'
+
+        def worker(lab_id: str):
+            barrier.wait()
+            return get(url=url, params={'ids[]': ['1']}, headers={'tg-active-lab-id': lab_id}, session=session)
+
+        with requests_mock.Mocker(session=session) as mocker:
+            mocker.get(url, content=slow_response)
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                responses = list(executor.map(worker, ['1'] * (n_workers - 1) + ['2']))
+
+            assert mocker.call_count == 2
+            assert all(response['content'] == '[{"id": "1"}]' for response in responses)
+            assert session.single_flight.stats() == {'in_flight': 0, 'coalesced': n_workers - 2}
+
+            def stream_worker(_):
+                barrier.wait()
+                with session.get(url, stream=True) as response:
+                    return response.content
+
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                assert set(executor.map(stream_worker, range(n_workers))) == {b'[{"id": "1"}]'}
+            assert mocker.call_count == 2 + n_workers
+
+        # Coalescing is opt-in.
+        assert TeselaGenClient(host_url='https://tg.example.com').http_session.single_flight is None
+
+    def test_client_against_fake_server(self, fake_teselagen_client):
+        """The clients page through the records of the fake server, and retry its injected 429 responses."""
+        config = FakeServerConfig(num_aliquots=250, results_per_file=120, num_assay_subjects=40, rate_limit_rate=0.2,
+                                  retry_after=0, seed=1)
+        server, client = fake_teselagen_client(config, governor=ConcurrencyGovernor(backoff_base=0.001))
+
+        page_lengths = [len(client.build.get_aliquots(pageNumber=n, pageSize=100)) for n in (1, 2, 3, 4)]
+        assert page_lengths == [100, 100, 50, 0]
+        assert client.build.get_aliquot(aliquot_id=7)['id'] == '7'
+        assay_results = client.test.get_assay_results(assay_id='1', page_size=200, page_number=1)
+        assert assay_results[0]['data'].shape[0] == 120
+
+        stats = server.stats()
+
+        assert stats['requests']['GET aliquots'] == 4 + stats['errors'].get('GET aliquots', 0)
+        assert sum(stats['errors'].values()) > 0
+
+    def test_benchmarks(self):
+        """Every benchmark runs (on tiny payloads), and slowdowns above the threshold are flagged."""
+        results = benchmarks.run_benchmarks(scale=0.01, repeat=2)
+
+        assert set(results['benchmarks']) == set(benchmarks.BENCHMARKS)
+        assert all(timings['min'] > 0 for timings in results['benchmarks'].values())
+
+        slower = {**results, 'benchmarks': {name: {**timings, 'min': 2 * timings['min']}
+                                            for name, timings in results['benchmarks'].items()}}
+        comparison = benchmarks.compare_results(baseline=results, current=slower, threshold=0.5)
+        assert all(row['regression'] and row['change'] == pytest.approx(1.0) for row in comparison)
+        assert not any(row['regression'] for row in benchmarks.compare_results(baseline=slower, current=results))
+
+    def test_import_does_not_load_heavy_dependencies(self):
+        """Importing the clients does not import pandas, NumPy, openpyxl nor the plotting libraries."""
+        heavy_modules = ('pandas', 'numpy', 'openpyxl', 'dna_features_viewer', 'IPython', 'SecretColors', 'matplotlib')
+        code = ('import sys; from teselagen.api import TeselaGenClient, AsyncTeselaGenClient; '
+                f'print(",".join(module for module in {heavy_modules!r} if module in sys.modules))')
+        env = {**os.environ, 'PYTHONPATH': str(get_project_root())}
+        output = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, check=True, text=True)
+        assert output.stdout.strip() == ''
+
+        assert is_instance(pd.DataFrame(), 'pandas', 'DataFrame')
+        assert is_instance(np.array([1]), 'numpy', 'ndarray')
+        assert not is_instance([1], 'numpy', 'ndarray')
+        assert not is_instance([1], 'not_imported_module', 'ndarray')
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""Tracing for the teselagen package.
+
+When a tracer is set (see `set_tracer`), every public method of the clients opens a span, with child spans for the
+HTTP requests it sends and for its local processing phases (such as formatting or merging dataframes). Nested client
+calls are nested spans, so a slow high-level call can be broken down.
+
+Two tracers are provided:
+
+- `LocalRecorder` keeps the spans in memory, and can dump them as a text timeline, as a Chrome trace (viewable as a \
+  flame graph in Perfetto, speedscope or `chrome://tracing`) or as folded stacks (for `flamegraph.pl`).
+- `OpenTelemetryTracer` forwards the spans to OpenTelemetry (`opentelemetry-api` must be installed).
+
+Tracing is disabled by default, and then costs a single check per call.
+
+Example:
+    >>> recorder = LocalRecorder()
+    >>> set_tracer(recorder)
+    >>> client.test.get_assay_results(assay_id='1')
+    >>> print(recorder.format_timeline())
+    >>> recorder.dump_chrome_trace('trace.json')
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+from contextlib import nullcontext
+import contextvars
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+import functools
+import inspect
+import itertools
+import json
+import threading
+import time
+from typing import Any, TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:
+    from typing import Callable, ContextManager, Dict, Generator, Iterator, List, Optional
+
+F = TypeVar('F', bound='Callable[..., Any]')
+C = TypeVar('C', bound=type)
+
+
+class Tracer:
+    """Base class of the tracers. Subclasses must implement `start_span`."""
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Dict[str, Any],
+    ) -> ContextManager[Any]:
+        """Returns a context manager that opens a span (as a child of the current one) while its block runs.
+
+        Args:
+            name (str): Name of the span.
+
+            attributes (Dict[str, Any]): Attributes of the span. Values are strings, numbers or booleans.
+
+        Returns:
+            ContextManager[Any]: Context manager yielding an object with a `set_attribute(key, value)` method.
+        """
+        raise NotImplementedError
+
+
+@dataclass
+class Span:
+    """A span recorded by a `LocalRecorder`. Times are `time.perf_counter` values, in seconds."""
+
+    span_id: int
+    name: str
+    start: float
+    parent_id: Optional[int] = None
+    thread_id: int = 0
+    end: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """Duration of the span (in seconds), or 0 if it has not finished yet."""
+        return 0.0 if self.end is None else self.end - self.start
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Sets an attribute of the span."""
+        self.attributes[key] = value
+
+
+class LocalRecorder(Tracer):
+    """Tracer keeping the spans in memory."""
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._current_span: ContextVar[Optional[Span]] = ContextVar(f'teselagen_span_{id(self)}', default=None)
+
+    @contextmanager
+    def start_span(
+        self,
+        name: str,
+        attributes: Dict[str, Any],
+    ) -> Iterator[Span]:
+        """Records a span (as a child of the current one) while the block runs."""
+        parent: Optional[Span] = self._current_span.get()
+        span = Span(
+            span_id=next(self._ids),
+            name=name,
+            start=time.perf_counter(),
+            parent_id=None if parent is None else parent.span_id,
+            thread_id=threading.get_ident(),
+            attributes=dict(attributes),
+        )
+        token = self._current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.error = f'{type(exc).__name__}: {exc}'
+            raise
+        finally:
+            span.end = time.perf_counter()
+            self._current_span.reset(token)
+            with self._lock:
+                self.spans.append(span)
+
+    def clear(self) -> None:
+        """Removes all the recorded spans."""
+        with self._lock:
+            self.spans.clear()
+
+    def _sorted_spans(self) -> List[Span]:
+        with self._lock:
+            return sorted(self.spans, key=lambda span: span.start)
+
+    def format_timeline(self, min_duration: float = 0.0) -> str:
+        """Formats the recorded spans as an indented text timeline.
+
+        Each line shows the start time (relative to the first span) and the duration of a span, in milliseconds, \
+        indented under its parent.
+
+        Args:
+            min_duration (float): Spans shorter than this (in seconds) are hidden, along with their children. \
+                Defaults to 0.
+
+        Returns:
+            str: The timeline.
+        """
+        spans: List[Span] = self._sorted_spans()
+        if not spans:
+            return ''
+
+        children: Dict[Optional[int], List[Span]] = defaultdict(list)
+        span_ids = {span.span_id for span in spans}
+        for span in spans:
+            children[span.parent_id if span.parent_id in span_ids else None].append(span)
+
+        origin: float = spans[0].start
+        lines: List[str] = []
+
+        def add_lines(span: Span, depth: int) -> None:
+            if span.duration < min_duration:
+                return
+            error: str = f'  [{span.error}]' if span.error else ''
+            start: str = f'{1000 * (span.start - origin):>10.1f}ms'
+            duration: str = f'{1000 * span.duration:>10.1f}ms'
+            lines.append(f"{start} {duration}  {'  ' * depth}{span.name}{error}")
+            for child in children[span.span_id]:
+                add_lines(child, depth + 1)
+
+        for root in children[None]:
+            add_lines(root, 0)
+
+        return '\n'.join(lines)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Returns the recorded spans in the Chrome trace event format (viewable as a flame graph in Perfetto, \
+        speedscope or `chrome://tracing`)."""
+        spans: List[Span] = self._sorted_spans()
+        origin: float = spans[0].start if spans else 0.0
+        return {
+            'traceEvents': [{
+                'name': span.name,
+                'ph': 'X',
+                'ts': 1e6 * (span.start - origin),
+                'dur': 1e6 * span.duration,
+                'pid': 0,
+                'tid': span.thread_id,
+                'args': {
+                    **span.attributes,
+                    **({
+                        'error': span.error
+                    } if span.error else {}),
+                },
+            } for span in spans],
+            'displayTimeUnit': 'ms',
+        }
+
+    def dump_chrome_trace(self, filepath: str) -> None:
+        """Writes the recorded spans to `filepath`, in the Chrome trace event format."""
+        with open(filepath, 'w') as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+
+    def to_folded_stacks(self) -> str:
+        """Returns the recorded spans as folded stacks (`root;child;grandchild <self time in microseconds>`), the \
+        input format of `flamegraph.pl` and speedscope."""
+        spans: List[Span] = self._sorted_spans()
+        by_id: Dict[int, Span] = {span.span_id: span for span in spans}
+        children_time: Dict[int, float] = defaultdict(float)
+        for span in spans:
+            if span.parent_id in by_id:
+                children_time[span.parent_id] += span.duration
+
+        stacks: Dict[str, int] = defaultdict(int)
+        for span in spans:
+            names: List[str] = [span.name]
+            parent: Optional[Span] = by_id.get(span.parent_id)  # type: ignore[arg-type]
+            while parent is not None:
+                names.append(parent.name)
+                parent = by_id.get(parent.parent_id)  # type: ignore[arg-type]
+            self_time: float = max(0.0, span.duration - children_time[span.span_id])
+            stacks[';'.join(reversed(names))] += int(1e6 * self_time)
+
+        return '\n'.join(f'{stack} {value}' for stack, value in stacks.items())
+
+
+class OpenTelemetryTracer(Tracer):
+    """Tracer forwarding the spans to OpenTelemetry."""
+
+    def __init__(self, tracer: Optional[Any] = None) -> None:
+        """Initialize the tracer.
+
+        Args:
+            tracer (Optional[Any]): An `opentelemetry.trace.Tracer`. Defaults to the "teselagen" tracer of the \
+                global tracer provider.
+        """
+        if tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError as exc:
+                raise ImportError('OpenTelemetryTracer requires `opentelemetry-api` to be installed') from exc
+            tracer = trace.get_tracer('teselagen')
+        self._tracer = tracer
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Dict[str, Any],
+    ) -> ContextManager[Any]:
+        """Opens an OpenTelemetry span (as a child of the current one) while the block runs."""
+        return self._tracer.start_as_current_span(name, attributes=attributes)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Returns the current tracer, or None if tracing is disabled."""
+    return _tracer
+
+
+def set_tracer(tracer: Optional[Tracer] = None) -> Optional[Tracer]:
+    """Sets the tracer used by the clients.
+
+    Args:
+        tracer (Optional[Tracer]): The tracer to use. If None, tracing is disabled.
+
+    Returns:
+        Optional[Tracer]: The previous tracer.
+    """
+    global _tracer  # pylint: disable=global-statement
+    previous_tracer = _tracer
+    _tracer = tracer
+    return previous_tracer
+
+
+def span(
+    name: str,
+    attributes: Optional[Dict[str, Any]] = None,
+) -> ContextManager[Any]:
+    """Opens a span with the current tracer while the block runs. Does nothing (and yields None) if tracing is \
+    disabled."""
+    if _tracer is None:
+        return nullcontext()
+    return _tracer.start_span(name=name, attributes=attributes or {})
+
+
+def traced(func: F, name: Optional[str] = None) -> F:
+    """Decorator opening a span while the function runs. The span of a generator function is open from its first \
+    item until it is exhausted or closed (see `_traced_generator`).
+
+    Args:
+        func (F): The function to trace.
+
+        name (Optional[str]): Name of the span. Defaults to the qualified name of the function.
+
+    Returns:
+        F: The traced function.
+    """
+    name = name or func.__qualname__
+    if inspect.isgeneratorfunction(func):
+        return _traced_generator(func, name=name)
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        if _tracer is None:
+            return func(*args, **kwargs)
+        with _tracer.start_span(name=name, attributes={}):
+            return func(*args, **kwargs)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _traced_generator(func: F, name: str) -> F:
+    """Traces a generator function. Its steps run in a context of their own, where its span is the current one, so \
+    the spans it opens are nested under it (whichever thread resumes it), while the code consuming its items is not."""
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Generator[Any, Any, Any]:
+        if _tracer is None:
+            return (yield from func(*args, **kwargs))
+
+        def traced_steps() -> Generator[Any, Any, Any]:
+            with span(name):
+                try:
+                    return (yield from func(*args, **kwargs))
+                except GeneratorExit:
+                    # Closing the generator before it is exhausted is not an error of its span.
+                    return None
+
+        steps: Generator[Any, Any, Any] = traced_steps()
+        context: contextvars.Context = contextvars.copy_context()
+        resume: Callable[[Any], Any] = steps.send
+        value: Any = None
+        try:
+            while True:
+                try:
+                    item: Any = context.run(resume, value)
+                except StopIteration as stop:
+                    return stop.value
+                try:
+                    value = yield item
+                    resume = steps.send
+                except GeneratorExit:
+                    raise
+                except BaseException as exc:  # pylint: disable=broad-except
+                    resume, value = steps.throw, exc
+        finally:
+            context.run(steps.close)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def trace_public_methods(cls: C) -> C:
+    """Class decorator applying `traced` to every public method defined in the class. Spans are named \
+    `<class name>.<method name>`."""
+    for attribute_name, attribute in list(vars(cls).items()):
+        if not attribute_name.startswith('_') and inspect.isfunction(attribute):
+            setattr(cls, attribute_name, traced(attribute, name=f'{cls.__name__}.{attribute_name}'))
+    return cls
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# Copyright (c) TeselaGen Biotechnology, Inc. and its affiliates. All Rights Reserved
+# License: MIT
+"""HTTP transport for the teselagen package.
+
+A `TeselaGenSession` is a pooled, keep-alive `requests.Session`. One instance is created by each `TeselaGenClient` and
+shared by all of its module clients (DESIGN, BUILD, TEST and DISCOVER), so consecutive API calls reuse the same
+TCP/TLS connections instead of opening a new one per call.
+
+When a `ConcurrencyGovernor` is attached to the session, every request goes through it: the number of requests in
+flight adapts to the server's rate limiting, and idempotent requests failing with a transient error are retried. When a
+`MetricsRegistry` is attached, every request is recorded in it under its endpoint template. When a tracer is set (see
+`teselagen.utils.tracing`), every request is traced as a child span of the client method that sent it. When a
+`ResponseCache` (in memory) or a `PersistentCache` (on disk) is attached, the responses it holds are served from it,
+and write requests invalidate them. When a `SingleFlight` is attached, identical concurrent GET requests share a
+single HTTP call. When a `HedgingPolicy` is attached, slow GET requests are hedged with a duplicate request. When a
+cassette is in use (see `teselagen.utils.cassettes`), requests are recorded, or answered from the cassette.
+
+Sessions are pickled by their settings (and those of their governor, caches and policies), without connections nor
+runtime state, and they get new connection pools in the child processes forked from the process that created them.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import functools
+import os
+import time
+from typing import FrozenSet, Literal, Tuple, TYPE_CHECKING
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from teselagen.utils import cassettes
+from teselagen.utils.governor import parse_retry_after
+from teselagen.utils import tracing
+from teselagen.utils.metrics import body_size
+from teselagen.utils.metrics import endpoint_template
+from teselagen.utils.metrics import record_transfer
+from teselagen.utils.metrics import response_size
+from teselagen.utils.singleflight import request_key
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Optional
+
+    from teselagen.utils.cache import ResponseCache
+    from teselagen.utils.disk_cache import PersistentCache
+    from teselagen.utils.governor import ConcurrencyGovernor
+    from teselagen.utils.hedging import HedgingPolicy
+    from teselagen.utils.metrics import MetricsRegistry
+    from teselagen.utils.singleflight import SingleFlight
+
+# CONSTANTS
+# Number of connection pools to cache (one pool per host).
+DEFAULT_POOL_CONNECTIONS: Literal[10] = 10
+# Maximum number of (keep-alive) connections to save in each pool.
+DEFAULT_POOL_MAXSIZE: Literal[10] = 10
+# Methods that never modify a resource.
+SAFE_METHODS: FrozenSet[str] = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class TeselaGenSession(requests.Session):
+    """Pooled, keep-alive HTTP session used by the TeselaGen clients."""
+
+    def __init__(
+        self,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        governor: Optional[ConcurrencyGovernor] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        cache: Optional[ResponseCache] = None,
+        persistent_cache: Optional[PersistentCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        hedging: Optional[HedgingPolicy] = None,
+    ) -> None:
+        """Initialize the session.
+
+        Args:
+            pool_connections (int): Number of connection pools to cache (one per host). Defaults to \
+                `DEFAULT_POOL_CONNECTIONS`.
+
+            pool_maxsize (int): Maximum number of connections to keep open in each pool. Use a value at least as big \
+                as the number of threads sharing the client. Defaults to `DEFAULT_POOL_MAXSIZE`.
+
+            pool_block (bool): Whether the pool should block waiting for a free connection when `pool_maxsize` is \
+                reached, instead of opening a throw-away connection. Defaults to `False`.
+
+            keep_alive (bool): Whether connections are kept open between requests. Defaults to `True`.
+
+            governor (Optional[ConcurrencyGovernor]): Adaptive concurrency, rate limit and retry policy applied to \
+                every request of the session. Defaults to None (requests are sent as they are).
+
+            metrics (Optional[MetricsRegistry]): Registry where every request of the session is recorded. Defaults \
+                to None (requests are not recorded).
+
+            cache (Optional[ResponseCache]): Cache of the responses of slow-changing read endpoints. Defaults to \
+                None (responses are not cached).
+
+            persistent_cache (Optional[PersistentCache]): On-disk cache of records fetched by id. Defaults to None \
+                (records are not persisted).
+
+            single_flight (Optional[SingleFlight]): Coalesces identical concurrent GET requests (same URL, query \
+                parameters and headers) into one. Defaults to None (every request is sent).
+
+            hedging (Optional[HedgingPolicy]): Sends a duplicate of slow GET requests, within a budget, and keeps \
+                the first response. Defaults to None (requests are not hedged).
+        """
+        super().__init__()
+
+        self.pool_connections: int = pool_connections
+        self.pool_maxsize: int = pool_maxsize
+        self.pool_block: bool = pool_block
+        self.keep_alive: bool = keep_alive
+        self.governor: Optional[ConcurrencyGovernor] = governor
+        self.metrics: Optional[MetricsRegistry] = metrics
+        self.cache: Optional[ResponseCache] = cache
+        self.persistent_cache: Optional[PersistentCache] = persistent_cache
+        self.single_flight: Optional[SingleFlight] = single_flight
+        self.hedging: Optional[HedgingPolicy] = hedging
+
+        self.mount_adapters()
+
+        self.headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+
+        _sessions.add(self)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only the settings are pickled: the unpickling process opens its own connections.
+        return {
+            'pool_connections': self.pool_connections,
+            'pool_maxsize': self.pool_maxsize,
+            'pool_block': self.pool_block,
+            'keep_alive': self.keep_alive,
+            'governor': self.governor,
+            'metrics': self.metrics,
+            'cache': self.cache,
+            'persistent_cache': self.persistent_cache,
+            'single_flight': self.single_flight,
+            'hedging': self.hedging,
+            'headers': dict(self.headers),
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        settings: Dict[str, Any] = {name: value for name, value in state.items() if name != 'headers'}
+        self.__init__(**settings)  # type: ignore[misc] # pylint: disable=unnecessary-dunder-call
+        self.headers.update(state['headers'])
+
+    def reinitialize(self) -> None:
+        """Replaces the connection pools of the session, and the runtime state (locks, requests in flight, worker \
+        threads, cached responses) of its governor, caches and policies, by new ones.
+
+        It is called in the child processes forked from the process that created the session: their inherited \
+        connections are still used by the parent process, and their inherited locks may be held by threads that do \
+        not exist in the child.
+        """
+        for component in (self.governor, self.metrics, self.cache, self.persistent_cache, self.single_flight,
+                          self.hedging):
+            if component is not None:
+                component.__setstate__(component.__getstate__())
+
+        # The inherited adapters are dropped, not closed, as their connections belong to the parent process.
+        self.adapters = OrderedDict()
+        self.mount_adapters()
+
+    def mount_adapters(self) -> None:
+        """Mount fresh pooled transport adapters for HTTP and HTTPS, closing the previous ones (if any)."""
+        for adapter in self.adapters.values():
+            adapter.close()
+
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+        )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(  # type: ignore[override]
+        self,
+        method: str,
+        url: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Sends a request, going through the session's single-flight, caches, governor, metrics and tracer (if \
+        any)."""
+        if args or kwargs.get('stream'):
+            return self._traced_request(method, url, *args, **kwargs)
+
+        if self.single_flight is not None and method.upper() == 'GET':
+            # Identical concurrent GETs share one request (and its response).
+            key = request_key(method=method, url=url, params=kwargs.get('params'), headers=kwargs.get('headers'))
+            return self.single_flight.do(key, functools.partial(self._cached_request, method, url, **kwargs))
+
+        return self._cached_request(method, url, **kwargs)
+
+    def _cached_request(
+        self,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Sends a request, unless its response is in one of the session's caches."""
+        resource: Optional[str] = None if self.cache is None else self.cache.resource_of(method=method, url=url)
+        if resource is None:
+            if method.upper() in SAFE_METHODS:
+                return self._persistently_cached_request(method, url, **kwargs)
+
+            # Write requests invalidate the cached responses of what they modify.
+            try:
+                return self._traced_request(method, url, **kwargs)
+            finally:
+                if self.cache is not None:
+                    self.cache.invalidate(*self.cache.modified_resources(url=url))
+                if self.persistent_cache is not None:
+                    self.persistent_cache.invalidate_url(url=url)
+
+        key = self.cache.make_key(
+            method=method,
+            url=url,
+            params=kwargs.get('params'),
+            data=kwargs.get('data'),
+            headers=kwargs.get('headers'),
+        )
+        response: Optional[requests.Response] = self.cache.get(key)
+        if response is None:
+            response = self._persistently_cached_request(method, url, **kwargs)
+            if response.ok:
+                self.cache.set(key=key, resource=resource, response=response)
+        return response
+
+    def _persistently_cached_request(
+        self,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Sends a request, unless its (fresh) response is in the session's persistent cache."""
+        if self.persistent_cache is None or not self.persistent_cache.is_cacheable(method=method, url=url):
+            return self._traced_request(method, url, **kwargs)
+
+        key: str = self.persistent_cache.make_key(url=url, params=kwargs.get('params'), headers=kwargs.get('headers'))
+        cached: Optional[Tuple[requests.Response, bool]] = self.persistent_cache.get(key)
+        if cached is not None:
+            cached_response, is_fresh = cached
+            if is_fresh:
+                return cached_response
+            kwargs['headers'] = {
+                **(kwargs.get('headers') or {}),
+                **self.persistent_cache.revalidation_headers(cached_response),
+            }
+
+        response: requests.Response = self._traced_request(method, url, **kwargs)
+
+        if cached is not None and response.status_code == 304:
+            # Not modified: the cached response is still valid.
+            self.persistent_cache.touch(key)
+            return cached[0]
+
+        if response.ok:
+            self.persistent_cache.set(key=key, response=response, headers=kwargs.get('headers'))
+        return response
+
+    def _traced_request(
+        self,
+        method: str,
+        url: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Sends a request, going through the session's governor, recording it in its metrics and tracing it (if \
+        any)."""
+        if tracing.get_tracer() is None:
+            return self._request_with_metrics(method, url, *args, **kwargs)
+
+        with tracing.span(
+                name=f'HTTP {method.upper()} {endpoint_template(url)}',
+                attributes={
+                    'http.method': method.upper(),
+                    'http.url': url,
+                },
+        ) as current_span:
+            response: requests.Response = self._request_with_metrics(method, url, *args, **kwargs)
+            current_span.set_attribute('http.status_code', response.status_code)
+            return response
+
+    def _request_with_metrics(
+        self,
+        method: str,
+        url: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Sends a request through the session's governor (if any), and records it in the session's metrics (if \
+        any)."""
+        stream: bool = bool(kwargs.get('stream'))
+        if self.metrics is None:
+            unrecorded_response: requests.Response = self._hedged_request(method, url, *args, **kwargs)[0]
+            record_transfer(bytes_received=response_size(unrecorded_response, stream=stream))
+            return unrecorded_response
+
+        start: float = time.perf_counter()
+        response: Optional[requests.Response] = None
+        retries: int = 0
+        try:
+            response, retries = self._hedged_request(method, url, *args, **kwargs)
+            record_transfer(bytes_received=response_size(response, stream=stream))
+            return response
+        finally:
+            self.metrics.record(
+                method=method,
+                url=url,
+                latency=time.perf_counter() - start,
+                bytes_sent=0 if response is None else body_size(response.request.body),
+                bytes_received=0 if response is None else response_size(response, stream=stream),
+                retries=retries,
+                error=response is None or not response.ok,
+            )
+
+    def _hedged_request(
+        self,
+        method: str,
+        url: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Tuple[requests.Response, int]:
+        """Sends a request, hedging it with the session's hedging policy (if any) when it is an idempotent GET."""
+        if self.hedging is None or method.upper() != 'GET' or args or kwargs.get('stream'):
+            return self._request_with_retries(method, url, *args, **kwargs)
+
+        return self.hedging.send(
+            endpoint=endpoint_template(url),
+            request=functools.partial(self._request_with_retries, method, url, **kwargs),
+        )
+
+    def _request_with_retries(
+        self,
+        method: str,
+        url: str,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Tuple[requests.Response, int]:
+        """Sends a request through the session's governor (if any), and returns its response and number of retries."""
+        if self.governor is None:
+            return super().request(method, url, *args, **kwargs), 0
+
+        attempt: int = 0
+        while True:
+            with self.governor.slot():
+                response: requests.Response = super().request(method, url, *args, **kwargs)
+
+            retry_after: Optional[float] = parse_retry_after(response.headers.get('Retry-After'))
+            self.governor.on_response(status_code=response.status_code, retry_after=retry_after)
+
+            if not self.governor.should_retry(method=method, status_code=response.status_code, attempt=attempt):
+                return response, attempt
+
+            response.close()
+            time.sleep(self.governor.backoff(attempt=attempt, retry_after=retry_after))
+            attempt += 1
+
+    def send(  # type: ignore[override]
+        self,
+        request: requests.PreparedRequest,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """Sends a prepared request, or records or replays it with the cassette in use (if any)."""
+        cassette: Optional[cassettes.Cassette] = cassettes.get_cassette()
+        if cassette is None:
+            return super().send(request, **kwargs)
+
+        if cassette.is_replaying:
+            return cassette.play(request)
+
+        response: requests.Response = super().send(request, **kwargs)
+        cassette.record(request=request, response=response)
+        return response
+
+
+# Sessions of this process, reinitialized in the child processes forked from it.
+_sessions: weakref.WeakSet[TeselaGenSession] = weakref.WeakSet()
+
+
+def _reinitialize_sessions() -> None:
+    for session in list(_sessions):
+        session.reinitialize()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reinitialize_sessions)
@@ -11,14 +11,18 @@ from datetime import date
 from datetime import datetime
 from datetime import time
 from datetime import timedelta
+from datetime import timezone
 import functools
 import getpass
 import json
 import math
+import os
 from pathlib import Path
+import re
+import sys
+import tempfile
 from typing import Any, cast, Literal, TYPE_CHECKING, TypedDict, TypeVar
 
-import pandas as pd
 import requests
 from tenacity import retry
 from tenacity.retry import retry_if_exception_type
@@ -26,10 +30,14 @@ from tenacity.stop import stop_after_delay
 from tenacity.wait import wait_fixed
 
 import teselagen
+from teselagen.utils import async_transport
+from teselagen.utils import cassettes
+from teselagen.utils import serializers
 
 if TYPE_CHECKING:
     from typing import Dict, List, Optional, Tuple, Union
 
+    import pandas as pd
     from typing_extensions import TypeAlias
 
     from teselagen.api import TeselaGenClient
@@ -44,6 +52,18 @@ DEFAULT_API_TOKEN_NAME: Literal['x-tg-api-token'] = 'x-tg-api-token'
 
 DEFAULT_MAX_DATAPOINTS: int = 100
 
+# Units of the zeit/ms duration format (e.g. "1d" or "30m"), in seconds.
+_DURATION_UNITS: Dict[str, float] = {
+    **dict.fromkeys(('ms', 'msec', 'msecs', 'millisecond', 'milliseconds'), 0.001),
+    **dict.fromkeys(('s', 'sec', 'secs', 'second', 'seconds'), 1),
+    **dict.fromkeys(('m', 'min', 'mins', 'minute', 'minutes'), 60),
+    **dict.fromkeys(('h', 'hr', 'hrs', 'hour', 'hours'), 3600),
+    **dict.fromkeys(('d', 'day', 'days'), 86400),
+    **dict.fromkeys(('w', 'week', 'weeks'), 604800),
+    **dict.fromkeys(('y', 'yr', 'yrs', 'year', 'years'), 31557600),
+}
+_DURATION_PATTERN = re.compile(r'^\s*(\d*\.?\d+)\s*([a-z]*)\s*$', re.IGNORECASE)
+
 # ANNOTATIONS
 TimeUnit: TypeAlias = Literal['milliseconds', 'seconds', 'minutes', 'hours', 'days']
 
@@ -52,16 +72,29 @@ F = TypeVar('F', bound=Callable[..., Any])
 
 
 class ParsedJSONResponse(TypedDict, total=True):  # noqa: H601
-    """Parsed JSON response."""
+    """Parsed JSON response.
+
+    NOTE: `content` is the decoded text of the response, or the deserialized JSON document if the request was made \
+        with `parse_json=True`.
+    """
     url: str
     status: bool
-    content: Optional[str]
+    content: Optional[Any]
 
 
 class Session(TypedDict, total=True):  # noqa: H601
-    """Parsed JSON response."""
+    """Stored session.
+
+    NOTE: `expiration_date` is the ISO 8601 expiration date of the token, or None if it is unknown (it is missing \
+        from the session files written by older versions).
+
+    NOTE: `expiration_time` is the expiration time requested for the token (in zeit/ms format, e.g. "1w"), or None \
+        if it is unknown (it is missing from the session files written by older versions).
+    """
     host_url: str
     token: str
+    expiration_date: Optional[str]
+    expiration_time: Optional[str]
 
 
 # https://docs.python.org/3/library/functools.html#functools.singledispatch
@@ -101,6 +134,35 @@ def _(func: functools.partial[Any]) -> str:
     # NOTE: partial function has no `__name__` attribute, so we need to get it from its `func` attribute instead.
     return get_func_name(func.func)
 
+
+def is_instance(obj: Any, module_name: str, class_name: str) -> bool:
+    """Whether `obj` is an instance of the class `class_name` of the module `module_name`, without importing the \
+    module (e.g. pandas or NumPy): if it has not been imported yet, `obj` cannot be one of its instances."""
+    module = sys.modules.get(module_name)
+    return module is not None and isinstance(obj, getattr(module, class_name))
+
+
+def parse_duration(duration: str) -> timedelta:
+    """Parses a duration in zeit/ms format, as used for token expiration times (e.g. "1w", "1d", "8h", "30m", "10s" \
+    or "500ms"). A number without unit is in milliseconds.
+
+    Raises:
+        ValueError: If the duration is not in zeit/ms format.
+    """
+    match = _DURATION_PATTERN.match(duration)
+    unit: str = match.group(2).lower() if match is not None else ''
+    if match is None or (unit and unit not in _DURATION_UNITS):
+        raise ValueError(f'Invalid duration: {duration!r}')
+    return timedelta(seconds=float(match.group(1)) * _DURATION_UNITS[unit or 'ms'])
+
+
+def parse_datetime(value: str) -> datetime:
+    """Parses an ISO 8601 date (e.g. "2099-01-01T00:00:00.000Z") as a timezone-aware datetime (in UTC if it has no \
+    offset)."""
+    parsed: datetime = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+
 def get_default_host_name()->str:
     cred_data = load_credentials_from_file()
     if cred_data is not None and cred_data.host_url is not None:
@@ -206,6 +268,8 @@ def xlsx_parser(
 
         sheet_names (Optional[List[str]]): Sheet names to process. If None is provided, all sheets will be processed.
     """
+    import pandas as pd
+
     sheets_data = {}
     reader = pd.ExcelFile(filepath, engine='openpyxl')
     for sheet_name in reader.sheet_names:
@@ -286,6 +350,11 @@ def get_credentials(
         username = file_credentials.username if username is None else username
         password = file_credentials.password if password is None else password
 
+    # Credentials are redacted from cassettes, so any value is accepted while replaying one.
+    if cassettes.is_replaying():
+        username = cassettes.REDACTED if username is None else username
+        password = cassettes.REDACTED if password is None else password
+
     # If credentials aren't defined, get them from user input
     try:
         username = input('Enter username: ') if username is None else username
@@ -318,8 +387,17 @@ def save_session_file(session_dict: Session, session_filepath: Optional[str] = N
     if session_filepath is None:
         session_filepath = str(get_session_path())
 
-    with open(session_filepath, 'w') as f:
-        json.dump(session_dict, f)
+    # NOTE: The session is written to a temporary file that replaces the session file, so a write interrupted (e.g.
+    #       by the exit of the process during a token refresh) never leaves a truncated session file.
+    session_path = Path(session_filepath)
+    with tempfile.NamedTemporaryFile('w', dir=session_path.parent, prefix=f'.{session_path.name}.', delete=False) as f:
+        try:
+            json.dump(session_dict, f)
+        except BaseException:
+            f.close()
+            Path(f.name).unlink()
+            raise
+    os.replace(f.name, session_filepath)
 
 
 def delete_session_file(session_filepath: Optional[str] = None) -> None:
@@ -370,7 +448,10 @@ def load_credentials_from_file(path_to_credentials_file: Optional[str] = None) -
 
 
 def handler(func: F) -> F:
-    """Decorator to handle the response from a request."""
+    """Decorator to handle the response from a request.
+
+    Error responses raise a `requests.HTTPError` (whose `response` is the error response).
+    """
 
     def wrapper(**kwargs: Any) -> requests.Response:
         if 'url' not in kwargs.keys():
@@ -378,6 +459,11 @@ def handler(func: F) -> F:
 
         url: str = kwargs.pop('url')
 
+        # JSON bodies are encoded (straight to bytes) with the current serializer.
+        if kwargs.get('json') is not None:
+            kwargs['data'] = serializers.dumps(kwargs.pop('json'))
+            kwargs['headers'] = {'Content-Type': 'application/json', **(kwargs.get('headers') or {})}
+
         try:
             response: requests.Response = func(url, **kwargs)
 
@@ -385,25 +471,32 @@ def handler(func: F) -> F:
                 return response
 
             elif response.status_code == 400:
-                resp = json.loads(response.content)
-                raise Exception(f"{response.reason}: {resp['error']}")
+                resp = serializers.loads(response.content)
+                raise requests.HTTPError(f"{response.reason}: {resp['error']}", response=response)
 
             elif response.status_code == 401:
-                raise Exception(f'URL : {url} access is unauthorized for  {kwargs}.')
+                raise requests.HTTPError(f'URL : {url} access is unauthorized for  {kwargs}.', response=response)
 
             elif response.status_code == 403:
-                raise Exception(f'URL : {url} access is unauthorized for  {kwargs}.')
+                raise requests.HTTPError(f'URL : {url} access is unauthorized for  {kwargs}.', response=response)
 
             elif response.status_code == 404:
-                raise Exception(f'URL : {url} cannot be found.')
+                raise requests.HTTPError(f'URL : {url} cannot be found.', response=response)
 
             elif response.status_code == 405:
-                raise Exception(f'Method not allowed. URL : {url}')
+                raise requests.HTTPError(f'Method not allowed. URL : {url}', response=response)
+
+            elif response.status_code == 429:
+                retry_after = response.headers.get('Retry-After')
+                raise requests.HTTPError(
+                    f'Too many requests. URL : {url}. Retry after : {retry_after or "unknown"} seconds.',
+                    response=response)
 
             # TODO : Add more exceptions.
 
             else:
-                raise Exception(f'Got code : {response.status_code}. Reason : {response.reason}')
+                raise requests.HTTPError(f'Got code : {response.status_code}. Reason : {response.reason}',
+                                         response=response)
 
         except Exception as _exc:  # noqa: F841
             raise
@@ -412,9 +505,13 @@ def handler(func: F) -> F:
 
 
 def parser(func: Callable[..., requests.Response]) -> Callable[..., ParsedJSONResponse | Dict[str, Any]]:
-    """Decorator to parse the response from a request."""
+    """Decorator to parse the response from a request.
 
-    def wrapper(**kwargs: Any) -> Union[ParsedJSONResponse, Dict[str, Any]]:
+    The decorated function accepts an extra `parse_json` keyword argument. If `True`, the response `content` is the \
+    deserialized JSON document instead of the decoded text.
+    """
+
+    def wrapper(parse_json: bool = False, **kwargs: Any) -> Union[ParsedJSONResponse, Dict[str, Any]]:
 
         if 'url' not in kwargs.keys():
             raise Exception('url MUST be specified as keyword argument')
@@ -428,15 +525,29 @@ def parser(func: Callable[..., requests.Response]) -> Callable[..., ParsedJSONRe
             print('Deletion successful.')
             return {}
 
+        content: Optional[Any] = None
+        if response.ok:
+            # NOTE: JSON documents are deserialized straight from the response bytes, skipping the decoded string.
+            content = serializers.loads(response.content) if parse_json else response.content.decode()
+
         return ParsedJSONResponse(
             url=url,
             status=response.ok,
-            content=response.content.decode() if response.ok else None,
+            content=content,
         )
 
     return wrapper
 
 
+def _requester(session: Optional[requests.Session] = None) -> Any:
+    """Returns the object used to send requests: the given (pooled) session, the session of the cassette in use (if \
+    any), or the `requests` module otherwise."""
+    if session is not None:
+        return session
+    cassette: Optional[cassettes.Cassette] = cassettes.get_cassette()
+    return requests if cassette is None else cassette.session
+
+
 def requires_login(func):
     """Decorator to perform login beforehand, if necessary.
 
@@ -456,10 +567,19 @@ def requires_login(func):
 
 @parser
 @handler
-def get(url: str, params: Dict[str, Any] = None, **kwargs: Any) -> requests.Response:
+def get(
+    url: str,
+    params: Dict[str, Any] = None,
+    session: Optional[requests.Session] = None,
+    **kwargs: Any,
+) -> requests.Response:
     """Same as `requests.get` but handles exceptions and returns a dictionary instead of a `requests.Response` object.
 
-    NOTE : url key MUST be passed in arguments.
+    NOTE : url key MUST be passed in arguments. If a `session` is passed, the request is sent through it (reusing its \
+        pooled connections).
+
+    NOTE : If `parse_json=True` is passed, "content" is the JSON document deserialized straight from the response \
+        bytes, instead of the response text.
 
     Returns:
         (Dict[str, Union[str, bool, None]]) : It returns a dictionary with the following keys and value types:
@@ -474,15 +594,15 @@ def get(url: str, params: Dict[str, Any] = None, **kwargs: Any) -> requests.Resp
     Raises:
         (Exception) : It raises an exception if something goes wrong.
     """
-    return requests.get(url, params=params, **kwargs)
+    return _requester(session).get(url, params=params, **kwargs)
 
 
 @parser
 @handler
-def post(url: str, **kwargs: Any) -> requests.Response:
+def post(url: str, session: Optional[requests.Session] = None, **kwargs: Any) -> requests.Response:
     """Same as `requests.post` but handles exceptions and returns a dictionary instead of a `requests.Response` object.
 
-    NOTE: `url` key MUST be passed in arguments.
+    NOTE: `url` key MUST be passed in arguments. If a `session` is passed, the request is sent through it.
 
     Example:
         >>> url = "https://www.some_url.com/"
@@ -505,42 +625,43 @@ def post(url: str, **kwargs: Any) -> requests.Response:
     Raises:
         (Exception) : It raises an exception if something goes wrong.
     """
-    return requests.post(url, **kwargs)
+    return _requester(session).post(url, **kwargs)
 
 
 @parser
 @handler
-def delete(url: str, **kwargs: Any) -> requests.Response:
+def delete(url: str, session: Optional[requests.Session] = None, **kwargs: Any) -> requests.Response:
     """Same as `requests.delete` but handles exceptions and returns a dictionary instead of a `requests.Response` \
     object.
 
-    NOTE: `url` key MUST be passed in arguments.
+    NOTE: `url` key MUST be passed in arguments. If a `session` is passed, the request is sent through it.
     """
-    return requests.delete(url, **kwargs)
+    return _requester(session).delete(url, **kwargs)
 
 
 @parser
 @handler
-def put(url: str, **kwargs: Any) -> requests.Response:
+def put(url: str, session: Optional[requests.Session] = None, **kwargs: Any) -> requests.Response:
     """Same as `requests.put` but handles exceptions and returns a dictionary instead of a `requests.Response` object.
 
-    NOTE: `url` key MUST be passed in arguments.
+    NOTE: `url` key MUST be passed in arguments. If a `session` is passed, the request is sent through it.
     """
-    return requests.put(url, **kwargs, timeout=None)
+    return _requester(session).put(url, **kwargs, timeout=None)
 
 
 def download_file(
     url: str,
     local_filename: str = None,
+    session: Optional[requests.Session] = None,
     **kwargs: Any,
 ) -> str:
-    """Downloads a file from the specified url."""
+    """Downloads a file from the specified url (through `session`, if given)."""
     if local_filename is None:
         local_filename = url.split('/')[-1]
 
     # NOTE: the stream=True parameter below
     chunk_size = None
-    with requests.get(url, stream=True, **kwargs) as r:
+    with _requester(session).get(url, stream=True, **kwargs) as r:
         r.raise_for_status()
         with open(local_filename, 'wb') as f:
             for chunk in r.iter_content(chunk_size=chunk_size):
@@ -570,18 +691,24 @@ def wait_for_status(
             It must receives the output of `method` as argument and returns `True` if it is ok and `False` if it is \
             invalid. Defaults to None, meaning no validation will be executed.
 
-        fixed_wait_time (float, optional): Time (in seconds) to wait between attempts. Defaults to 5.
+        fixed_wait_time (float, optional): Time (in seconds) to wait between attempts. Defaults to 5. There is no \
+            wait while a cassette is replayed (see `teselagen.utils.cassettes`).
 
         timeout (float, optional): Time (in seconds) after which no more attempts are made. Defaults to 300 (5 minutes).
 
     Returns:
         [Any]: The method's output
     """
+    if cassettes.is_replaying():
+        # Replayed responses come in the recorded order: waiting between polls is pointless.
+        fixed_wait_time = 0
 
     @retry(
         wait=wait_fixed(fixed_wait_time),
         stop=stop_after_delay(timeout),
         retry=retry_if_exception_type(AssertionError),
+        # NOTE: Calls of the asyncio client let the event loop run while they wait.
+        sleep=async_transport.sleep,
     )
     def _wait_for_status(
         method: Callable[..., T],